@@ -0,0 +1,74 @@
+"""
+Benchmark de los factores apilados (batched=True) frente a las listas por canal.
+
+Ambos modos hacen una SVD de LAPACK por canal, así que el tiempo de la SVD
+debe salir parecido; la columna de reconstrucción mide la diferencia de
+organización en memoria (una matmul apilada frente a una por canal).
+
+Uso:
+    python benchmarks/bench_batched_svd.py [--sizes 512x512 1024x768] [--repeat 3]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import argparse
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+
+from proyecto_svd.core.svd_processor import SVDImageProcessor
+
+
+def _time(func, repeat):
+    """Devuelve el mejor tiempo de `repeat` ejecuciones."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(sizes, channels_list, repeat, k):
+    """Ejecuta el benchmark e imprime una tabla de resultados."""
+    rng = np.random.default_rng(0)
+    print(f"{'tamaño':>12} {'canales':>8} {'modo':>10} {'svd (s)':>10} {'reconst (s)':>12}")
+    for width, height in sizes:
+        for channels in channels_list:
+            img_array = rng.integers(0, 256, (height, width, channels), dtype=np.uint8)
+            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+                Image.fromarray(img_array).save(f.name)
+            try:
+                results = {}
+                for batched in (False, True):
+                    processor = SVDImageProcessor(f.name, batched=batched, frame_cache_bytes=0)
+                    t_svd = _time(processor.compute_svd, repeat)
+                    t_rec = _time(lambda: processor.reconstruct_image(k), repeat)
+                    results[batched] = (t_svd, t_rec)
+                    mode = 'lotes' if batched else 'canal'
+                    size = f"{width}x{height}"
+                    print(f"{size:>12} {channels:>8} {mode:>10} {t_svd:>10.4f} {t_rec:>12.4f}")
+                ratio_svd = results[False][0] / results[True][0]
+                ratio_rec = results[False][1] / results[True][1]
+                print(f"{'':>12} {'':>8} {'canal/lotes':>10} {ratio_svd:>9.2f}x {ratio_rec:>11.2f}x")
+            finally:
+                os.unlink(f.name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', default=['512x512', '1024x768'],
+                        help="Tamaños ANCHOxALTO a medir")
+    parser.add_argument('--channels', nargs='+', type=int, default=[3, 4])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('-k', type=int, default=50, help="Rango de reconstrucción")
+    args = parser.parse_args()
+    sizes = [tuple(int(v) for v in s.lower().split('x')) for s in args.sizes]
+    run(sizes, args.channels, args.repeat, args.k)
+
+
+if __name__ == "__main__":
+    main()
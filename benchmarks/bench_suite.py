@@ -0,0 +1,176 @@
+"""
+Suite de benchmarks de las rutas críticas de SVDImageProcessor.
+
+Mide compute_svd, reconstruct_image, get_energy_retained y la vista previa
+de la interfaz (reconstruct_preview a 400x400) para cada combinación de
+tamaño, grises/RGB, float32/float64 y backend (gesdd, gesvd, numpy, qr,
+gram y auto; el tamaño 3000x300 cubre las imágenes muy rectangulares). Las
+imágenes son sintéticas con semilla fija, así que las ejecuciones son
+comparables entre máquinas y versiones.
+
+Los resultados se guardan en JSON. Con --baseline se comparan con una
+ejecución anterior y el script termina con código 1 si algún caso es más
+lento que la tolerancia indicada.
+
+Uso:
+    python benchmarks/bench_suite.py --output resultados.json
+    python benchmarks/bench_suite.py --baseline resultados.json --tolerance 0.2
+    python benchmarks/bench_suite.py --quick
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import argparse
+import json
+import platform
+import statistics
+import time
+import numpy as np
+import scipy
+
+from proyecto_svd.core.engines import BACKENDS
+from proyecto_svd.core.svd_processor import SVDImageProcessor
+
+
+def _measure(func, repeat, setup=None):
+    """Ejecuta `func` `repeat` veces y devuelve los tiempos en segundos."""
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _synthetic_image(width, height, channels, seed=0):
+    """Imagen de espectro decreciente, parecida a una foto, con ruido fijo."""
+    rng = np.random.default_rng(seed)
+    y = np.linspace(0, 1, height)[:, None]
+    x = np.linspace(0, 1, width)[None, :]
+    layers = []
+    for c in range(channels):
+        base = 128 + 80 * np.sin(6 * x + 2 * c) * np.cos(4 * y) + 30 * np.outer(y[:, 0], x[0])
+        layers.append(base + rng.normal(0, 8, (height, width)))
+    img = np.clip(np.stack(layers, axis=-1), 0, 255).astype(np.uint8)
+    return img[:, :, 0] if channels == 1 else img
+
+
+def _processor(img_array, backend, dtype):
+    processor = SVDImageProcessor(backend=backend, dtype=dtype, frame_cache_bytes=0)
+    processor.image_array = img_array
+    return processor
+
+
+def run(sizes, channels_list, dtypes, backends, repeat, k):
+    """
+    Ejecuta todos los casos.
+
+    Returns:
+        Diccionario {id del caso: {'min', 'median', 'mean'}} en segundos
+    """
+    results = {}
+    for width, height in sizes:
+        for channels in channels_list:
+            img_array = _synthetic_image(width, height, channels)
+            color = 'gray' if channels == 1 else 'rgb'
+            for dtype in dtypes:
+                for backend in backends:
+                    case = f"{width}x{height}/{color}/{dtype}/{backend}"
+                    processor = _processor(img_array, backend, dtype)
+                    timings = {
+                        'compute_svd': _measure(processor.compute_svd, repeat),
+                        'reconstruct_image': _measure(lambda: processor.reconstruct_image(k), repeat),
+                        'get_energy_retained': _measure(
+                            lambda: [processor.get_energy_retained(i) for i in range(1, 101)], repeat),
+                        # La vista previa se mide en frío: sin factores reducidos
+                        'preview': _measure(lambda: processor.reconstruct_preview(k, 400, 400), repeat,
+                                            setup=lambda: setattr(processor, '_preview', None)),
+                    }
+                    for name, times in timings.items():
+                        key = f"{name}/{case}"
+                        results[key] = {
+                            'min': min(times),
+                            'median': statistics.median(times),
+                            'mean': statistics.fmean(times),
+                        }
+                        print(f"{key:<50} {min(times) * 1000:>10.3f} ms", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compara con una ejecución anterior usando el tiempo mínimo.
+
+    Returns:
+        Lista de (caso, base, actual, cambio relativo) de los casos más lentos
+        que la tolerancia
+    """
+    regressions = []
+    print(f"\n{'caso':<50} {'base (ms)':>10} {'actual (ms)':>12} {'cambio':>8}")
+    for key, current in results.items():
+        if key not in baseline:
+            continue
+        base = baseline[key]['min']
+        change = (current['min'] - base) / base if base > 0 else 0.0
+        flag = '  <-- regresión' if change > tolerance else ''
+        print(f"{key:<50} {base * 1000:>10.3f} {current['min'] * 1000:>12.3f} {change:>+7.1%}{flag}")
+        if change > tolerance:
+            regressions.append((key, base, current['min'], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', default=['256x256', '512x512', '1024x768', '3000x300'],
+                        help="Tamaños ANCHOxALTO a medir")
+    parser.add_argument('--channels', nargs='+', type=int, default=[1, 3])
+    parser.add_argument('--dtypes', nargs='+', default=['float32', 'float64'],
+                        choices=['float32', 'float64'])
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('-k', type=int, default=50, help="Rango de reconstrucción")
+    parser.add_argument('--quick', action='store_true',
+                        help="Solo 256x256 y 2 repeticiones (comprobación rápida)")
+    parser.add_argument('--output', help="Archivo JSON de resultados")
+    parser.add_argument('--baseline', help="JSON de una ejecución anterior para comparar")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="Empeoramiento relativo permitido (0.15 = 15%%)")
+    args = parser.parse_args()
+    if args.quick:
+        args.sizes, args.repeat = ['256x256'], 2
+    sizes = [tuple(int(v) for v in s.lower().split('x')) for s in args.sizes]
+
+    results = run(sizes, args.channels, args.dtypes, args.backends, args.repeat, args.k)
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpus': os.cpu_count(),
+            'repeat': args.repeat,
+            'k': args.k,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} casos más lentos que la tolerancia ({args.tolerance:.0%})")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
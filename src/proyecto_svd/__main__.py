@@ -0,0 +1,105 @@
+"""
+Línea de comandos del paquete.
+
+    python -m proyecto_svd              # interfaz gráfica
+    python -m proyecto_svd batch ...    # compresión por lotes sin interfaz
+    python -m proyecto_svd serve ...    # servicio HTTP de compresión
+"""
+
+import argparse
+import sys
+
+
+def _batch(args) -> int:
+    from .utils.batch import run_batch
+
+    def progress(done, total, rows):
+        status = rows[0].get('status') if rows else ''
+        name = rows[0].get('file') if rows else ''
+        print(f"[{done}/{total}] {name} {status}", flush=True)
+
+    rows = run_batch(args.inputs, args.output, ks=args.k, energies=args.energy,
+                     workers=args.workers, blas_threads=args.blas_threads,
+                     fmt=args.format, engine=args.engine, resume=not args.no_resume,
+                     progress=progress, psnrs=args.psnr,
+                     max_bytes=[int(kb * 1024) for kb in args.max_kb],
+                     progressive=args.progressive)
+    errors = sum(1 for row in rows if row.get('status') != 'ok')
+    print(f"Informe: {args.output}/report.csv ({len(rows)} filas, {errors} errores)")
+    return 1 if errors else 0
+
+
+def _serve(args) -> int:
+    from .utils.service import serve
+
+    serve(args.host, args.port, cache_dir=args.cache_dir, workers=args.workers,
+          max_queue=args.queue, cache_bytes=int(args.cache_mb * 1024 ** 2),
+          upload_bytes=int(args.upload_mb * 1024 ** 2), max_connections=args.max_connections,
+          engine=args.engine, blas_threads=args.blas_threads)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m proyecto_svd',
+                                     description="Compresión de imágenes con SVD")
+    commands = parser.add_subparsers(dest='command')
+
+    commands.add_parser('gui', help="Interfaz gráfica (por defecto)")
+
+    batch = commands.add_parser('batch', help="Comprime un directorio de imágenes")
+    batch.add_argument('inputs', nargs='+', help="Imágenes o directorios")
+    batch.add_argument('-o', '--output', required=True, help="Directorio de salida")
+    batch.add_argument('-k', type=int, nargs='+', default=[],
+                       help="Valores de k a reconstruir")
+    batch.add_argument('-e', '--energy', type=float, nargs='+', default=[],
+                       help="Porcentajes de energía objetivo (p. ej. 90 99)")
+    batch.add_argument('--psnr', type=float, nargs='+', default=[],
+                       help="PSNR mínimos en dB (elige el menor k que los cumple)")
+    batch.add_argument('--max-kb', type=float, nargs='+', default=[],
+                       help="Tamaños máximos del .svdz en KB (elige el mayor k que cabe)")
+    batch.add_argument('-j', '--workers', type=int, default=None,
+                       help="Procesos (por defecto núcleos / hilos de BLAS)")
+    batch.add_argument('--blas-threads', type=int, default=1,
+                       help="Hilos de BLAS por proceso (por defecto 1)")
+    batch.add_argument('-f', '--format', default='png',
+                       help="Formato de salida: png, jpg, ... o svdz")
+    batch.add_argument('--engine', default='full', choices=('full', 'randomized'))
+    batch.add_argument('--progressive', action='store_true',
+                       help="Guarda los .svdz ordenados por valor singular para decodificarlos en streaming")
+    batch.add_argument('--no-resume', action='store_true',
+                       help="Ignora el diario de una ejecución anterior")
+
+    service = commands.add_parser('serve', help="Servicio HTTP de compresión")
+    service.add_argument('--host', default='127.0.0.1', help="Dirección de escucha")
+    service.add_argument('--port', type=int, default=8080, help="Puerto (por defecto 8080)")
+    service.add_argument('-j', '--workers', type=int, default=None,
+                         help="Procesos (por defecto núcleos / hilos de BLAS)")
+    service.add_argument('--queue', type=int, default=32,
+                         help="Peticiones en espera antes de responder 503 (por defecto 32)")
+    service.add_argument('--cache-dir', default=None,
+                         help="Directorio de la caché de factores (por defecto uno temporal)")
+    service.add_argument('--cache-mb', type=float, default=2048,
+                         help="Tamaño máximo de la caché de factores en MB")
+    service.add_argument('--upload-mb', type=float, default=1024,
+                         help="Tamaño máximo de las imágenes subidas en MB")
+    service.add_argument('--max-connections', type=int, default=256,
+                         help="Conexiones abiertas a la vez antes de responder 503 (por defecto 256)")
+    service.add_argument('--blas-threads', type=int, default=1,
+                         help="Hilos de BLAS por proceso (por defecto 1)")
+    service.add_argument('--engine', default='full', choices=('full', 'randomized'))
+
+    args = parser.parse_args(argv)
+    if args.command == 'batch':
+        if not (args.k or args.energy or args.psnr or args.max_kb):
+            parser.error("indica -k, --energy, --psnr o --max-kb")
+        return _batch(args)
+    if args.command == 'serve':
+        return _serve(args)
+
+    from .main import main as gui_main
+    gui_main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
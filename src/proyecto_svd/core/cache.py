@@ -0,0 +1,265 @@
+"""
+Cachés de factores SVD y de imágenes reconstruidas.
+
+FactorCache es una caché persistente direccionada por contenido: cada
+entrada se identifica por un hash de los píxeles de la imagen y de la
+configuración del motor, y guarda U, s, VT y la energía precalculada como
+archivos .npy que se cargan mapeados en memoria. El tamaño total está
+limitado y se expulsan primero las entradas usadas hace más tiempo (LRU).
+
+FrameCache guarda en memoria las reconstrucciones recientes por rango y
+tamaño de salida, también con expulsión LRU.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+_META_FILE = 'meta.json'
+
+
+def hash_pixels(image_array: np.ndarray, settings: Optional[Dict] = None) -> str:
+    """
+    Calcula la clave de caché de una imagen.
+
+    Los píxeles se recorren por bloques de filas, de modo que las fuentes
+    mapeadas en memoria no se copian completas.
+
+    Args:
+        image_array: Array de la imagen
+        settings: Configuración del motor que afecta a los factores
+
+    Returns:
+        Clave hexadecimal
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr((image_array.shape, image_array.dtype.str)).encode('ascii'))
+    digest.update(json.dumps(settings or {}, sort_keys=True, default=str).encode('utf-8'))
+    row_bytes = max(1, image_array[0].nbytes)
+    rows = max(1, (16 * 1024 ** 2) // row_bytes)
+    for start in range(0, image_array.shape[0], rows):
+        digest.update(np.ascontiguousarray(image_array[start:start + rows]).data)
+    return digest.hexdigest()
+
+
+class FactorCache:
+    """Caché en disco de factores SVD con límite de tamaño y expulsión LRU."""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024 ** 3):
+        """
+        Inicializa la caché.
+
+        Args:
+            cache_dir: Directorio de la caché (se crea si no existe)
+            max_bytes: Tamaño máximo total de las entradas en bytes
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key: str) -> Optional[Dict]:
+        """
+        Carga una entrada mapeada en memoria.
+
+        Args:
+            key: Clave de la entrada
+
+        Returns:
+            Diccionario con 'components' (U, s, VT), 'energy_totals' y
+            'energy_cumsums', o None si la entrada no existe
+        """
+        entry = self._entry_dir(key)
+        try:
+            with open(os.path.join(entry, _META_FILE), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+            def _load(name):
+                return np.load(os.path.join(entry, name + '.npy'), mmap_mode='r')
+
+            if meta['layout'] == 'stacked':
+                components = tuple(_load(name) for name in ('U', 's', 'VT'))
+                cumsums = _load('cumsums')
+            else:
+                components = tuple([_load(f"{name}_{i}") for i in range(meta['channels'])]
+                                   for name in ('U', 's', 'VT'))
+                cumsums = [_load(f"cumsums_{i}") for i in range(meta['channels'])]
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # Marca de uso para la expulsión LRU
+        os.utime(entry)
+        return {
+            'components': components,
+            'energy_totals': meta['energy_totals'],
+            'energy_cumsums': cumsums,
+        }
+
+    def store(self, key: str, components, energy_totals, energy_cumsums) -> bool:
+        """
+        Guarda una entrada y expulsa las menos usadas si se supera el límite.
+
+        Args:
+            key: Clave de la entrada
+            components: Tupla (U, s, VT), apilada o en listas por canal
+            energy_totals: Energía total por canal
+            energy_cumsums: Energía acumulada por canal
+
+        Returns:
+            True si la entrada quedó guardada
+        """
+        U, s, VT = components
+        stacked = isinstance(U, np.ndarray)
+        size = sum(np.asarray(a).nbytes for part in (U, s, VT, energy_cumsums)
+                   for a in ([part] if stacked else part))
+        if size > self.max_bytes:
+            return False
+
+        entry = self._entry_dir(key)
+        if os.path.isdir(entry):
+            os.utime(entry)
+            return True
+
+        # Escritura en un directorio temporal y renombrado atómico
+        tmp = tempfile.mkdtemp(prefix=f".{key}.", dir=self.cache_dir)
+        try:
+            if stacked:
+                arrays = {'U': U, 's': s, 'VT': VT, 'cumsums': energy_cumsums}
+            else:
+                arrays = {}
+                for name, parts in (('U', U), ('s', s), ('VT', VT), ('cumsums', energy_cumsums)):
+                    arrays.update({f"{name}_{i}": part for i, part in enumerate(parts)})
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp, name + '.npy'), np.asarray(array))
+            meta = {
+                'layout': 'stacked' if stacked else 'channels',
+                'channels': len(s),
+                'energy_totals': [float(v) for v in energy_totals],
+            }
+            with open(os.path.join(tmp, _META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.rename(tmp, entry)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return os.path.isdir(entry)
+
+        self.evict()
+        return True
+
+    def _entries(self):
+        """Devuelve (último uso, tamaño, ruta) de cada entrada."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith('.') or not os.path.isdir(path):
+                continue
+            size = sum(f.stat().st_size for f in os.scandir(path) if f.is_file())
+            entries.append((os.stat(path).st_mtime_ns, size, path))
+        return entries
+
+    def size(self) -> int:
+        """Tamaño total de las entradas en bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self) -> None:
+        """Expulsa las entradas menos usadas hasta respetar max_bytes."""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self) -> None:
+        """Elimina todas las entradas."""
+        for _, _, path in self._entries():
+            shutil.rmtree(path, ignore_errors=True)
+
+
+class FrameCache:
+    """
+    Caché LRU en memoria de imágenes reconstruidas con límite de bytes.
+
+    Los arrays que recibe put se marcan como de solo lectura, se guarden o
+    no, para que quien los recibe no pueda modificar la copia compartida y
+    el tipo devuelto no dependa de su tamaño ni del presupuesto.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 ** 2):
+        """
+        Inicializa la caché.
+
+        Args:
+            max_bytes: Presupuesto total en bytes (0 la desactiva)
+        """
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Devuelve el valor guardado o None, actualizando su uso."""
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value[0]
+
+    def put(self, key, value, nbytes: int = None):
+        """
+        Guarda un valor y expulsa los menos usados si se supera el presupuesto.
+
+        Args:
+            key: Clave
+            value: Array u objeto a guardar
+            nbytes: Tamaño contabilizado (por defecto value.nbytes)
+
+        Returns:
+            El valor (de solo lectura si es un array), aunque no quepa
+        """
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+        if nbytes is None:
+            nbytes = value.nbytes
+        if nbytes > self.max_bytes:
+            return value
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, nbytes)
+        self.current_bytes += nbytes
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted
+            self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        """Vacía la caché (los contadores se conservan)."""
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict:
+        """Contadores de uso para ajustar el presupuesto."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,199 @@
+"""
+Descomposición en luminancia y crominancia.
+
+En fotografías la mayor parte del detalle está en la luminancia; los dos
+canales de crominancia son suaves y de rango muy bajo. Transformar RGB a
+YCbCr (o YCoCg) permite descomponer la luminancia a resolución completa y
+la crominancia submuestreada, con menos componentes. La reconstrucción
+calcula los tres planos por bloques de filas, amplía la crominancia por
+repetición y vuelve a RGB en la misma pasada, escribiendo directamente en
+el buffer uint8.
+
+Los planos de crominancia se centran en 0 (sin el desplazamiento de 128 de
+JPEG), así que una crominancia constante no gasta un componente.
+"""
+
+import numpy as np
+from typing import Iterator, Sequence, Tuple
+
+from .reconstruct import BLOCK_BYTES, to_pixels
+
+
+COLOR_SPACES = ('rgb', 'ycbcr', 'ycocg')
+
+# Matrices RGB -> (luminancia, crominancia 1, crominancia 2)
+_FORWARD = {
+    # YCbCr de rango completo (JPEG / BT.601)
+    'ycbcr': np.array([[0.299, 0.587, 0.114],
+                       [-0.168736, -0.331264, 0.5],
+                       [0.5, -0.418688, -0.081312]]),
+    'ycocg': np.array([[0.25, 0.5, 0.25],
+                       [0.5, 0.0, -0.5],
+                       [-0.25, 0.5, -0.25]]),
+}
+_INVERSE = {space: np.linalg.inv(matrix) for space, matrix in _FORWARD.items()}
+
+
+def _check_space(space: str) -> None:
+    if space not in _FORWARD:
+        raise ValueError(f"Espacio de color desconocido: {space}. Opciones: {', '.join(COLOR_SPACES)}")
+
+
+def chroma_shape(height: int, width: int, subsampling: int) -> Tuple[int, int]:
+    """
+    Calcula el tamaño de los planos de crominancia.
+
+    Args:
+        height: Alto de la imagen
+        width: Ancho de la imagen
+        subsampling: Factor de submuestreo en cada eje (1 = sin submuestreo)
+
+    Returns:
+        Tupla (alto, ancho) redondeada hacia arriba
+    """
+    return -(-height // subsampling), -(-width // subsampling)
+
+
+def plane_weights(space: str, subsampling: int = 1) -> np.ndarray:
+    """
+    Peso de cada plano en el error cuadrático RGB.
+
+    Un error e en el plano c aparece en RGB multiplicado por la columna c de
+    la matriz inversa, y cada muestra de crominancia cubre subsampling²
+    píxeles. Suponiendo errores independientes entre planos, el error RGB es
+    la suma de los errores de cada plano por su peso.
+
+    Args:
+        space: 'ycbcr' o 'ycocg'
+        subsampling: Factor de submuestreo de la crominancia
+
+    Returns:
+        Array con el peso de la luminancia y de las dos crominancias
+    """
+    _check_space(space)
+    weights = np.sum(_INVERSE[space] ** 2, axis=0)
+    weights[1:] *= subsampling ** 2
+    return weights
+
+
+def _box_subsample(plane: np.ndarray, factor: int) -> np.ndarray:
+    """Promedia bloques factor x factor; los bordes incompletos se rellenan repitiendo."""
+    if factor == 1:
+        return plane
+    height, width = chroma_shape(plane.shape[0], plane.shape[1], factor)
+    padded = np.pad(plane, ((0, height * factor - plane.shape[0]), (0, width * factor - plane.shape[1])),
+                    mode='edge')
+    return padded.reshape(height, factor, width, factor).mean(axis=(1, 3), dtype=plane.dtype)
+
+
+def iter_planes(image: np.ndarray, space: str, subsampling: int = 1,
+                dtype=np.float32) -> Iterator[np.ndarray]:
+    """
+    Convierte una imagen RGB en planos de luminancia y crominancia.
+
+    Los planos se generan de uno en uno, así que solo conviven la imagen y
+    el plano actual (importante con fuentes mapeadas en memoria).
+
+    Args:
+        image: Imagen (alto, ancho, 3)
+        space: 'ycbcr' o 'ycocg'
+        subsampling: Factor de submuestreo de la crominancia
+        dtype: Tipo de los planos
+
+    Yields:
+        Luminancia (alto, ancho) y las dos crominancias (ver chroma_shape)
+    """
+    _check_space(space)
+    scalar = np.dtype(dtype).type
+    for c, row in enumerate(_FORWARD[space]):
+        plane = np.zeros(image.shape[:2], dtype=dtype)
+        for i, weight in enumerate(row):
+            if weight:
+                plane += scalar(weight) * image[:, :, i]
+        yield plane if c == 0 else _box_subsample(plane, subsampling)
+
+
+def upsample_index(size: int, source_size: int) -> np.ndarray:
+    """
+    Índice del plano reducido que corresponde a cada fila (o columna) de salida.
+
+    Args:
+        size: Tamaño de salida
+        source_size: Tamaño del plano reducido
+
+    Returns:
+        Array de índices crecientes
+    """
+    return np.minimum(np.arange(size) * source_size // size, source_size - 1)
+
+
+class LumaChromaReconstructor:
+    """
+    Reconstrucción RGB desde factores de luminancia y crominancia.
+
+    Tiene la misma interfaz que IncrementalReconstructor (reconstruct(k)),
+    pero no guarda acumuladores: cada llamada recalcula los planos por
+    bloques de filas, amplía la crominancia y aplica la matriz inversa en
+    una sola pasada sobre el buffer uint8.
+    """
+
+    def __init__(self, components, shape, space: str, subsampling: int = 1):
+        """
+        Inicializa el reconstructor.
+
+        Args:
+            components: Tupla (U, s, VT) con luminancia y dos crominancias
+            shape: Forma (alto, ancho, 3) de la salida
+            space: 'ycbcr' o 'ycocg'
+            subsampling: Factor de submuestreo de la crominancia; si la
+                salida es más pequeña que los factores (vista previa), la
+                correspondencia de filas y columnas es proporcional
+        """
+        _check_space(space)
+        U_channels, s_channels, VT_channels = components
+        self._channels = list(zip(U_channels, s_channels, VT_channels))
+        self.shape = tuple(shape)
+        self.inverse = _INVERSE[space].astype(np.float32)
+        height, width = self.shape[:2]
+        chroma_rows, chroma_cols = U_channels[1].shape[0], VT_channels[1].shape[1]
+        if (chroma_rows, chroma_cols) == chroma_shape(height, width, subsampling):
+            self._rows = np.arange(height) // subsampling
+            self._cols = np.arange(width) // subsampling
+        else:
+            self._rows = upsample_index(height, chroma_rows)
+            self._cols = upsample_index(width, chroma_cols)
+
+    def reconstruct(self, k: Sequence[int], out: np.ndarray = None) -> np.ndarray:
+        """
+        Reconstruye la imagen RGB.
+
+        Args:
+            k: Rango de cada plano (luminancia, crominancia, crominancia)
+            out: Buffer uint8 (alto, ancho, 3) de salida (opcional)
+
+        Returns:
+            Imagen uint8 reconstruida
+        """
+        if out is None:
+            out = np.empty(self.shape, dtype=np.uint8)
+        height, width = self.shape[:2]
+        factors = [(np.asarray(U[:, :r], dtype=np.float32) * s[:r], VT[:r, :])
+                   for (U, s, VT), r in zip(self._channels, k)]
+        # Temporales por bloque: tres planos y un canal de salida en float32
+        rows = max(1, BLOCK_BYTES // (16 * width))
+        for start in range(0, height, rows):
+            stop = min(start + rows, height)
+            Us, VT = factors[0]
+            planes = [Us[start:stop] @ VT]
+            index = self._rows[start:stop]
+            low = index[0]
+            for Us, VT in factors[1:]:
+                # Solo las filas reducidas que cubre el bloque
+                chroma = Us[low:index[-1] + 1] @ VT
+                planes.append(chroma[index - low][:, self._cols])
+            for c, weights in enumerate(self.inverse):
+                block = weights[0] * planes[0]
+                block += weights[1] * planes[1]
+                block += weights[2] * planes[2]
+                out[start:stop, :, c] = to_pixels(block)
+        return out
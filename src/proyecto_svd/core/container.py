@@ -0,0 +1,470 @@
+"""
+Formato contenedor .svdz con los factores SVD truncados y cuantizados.
+
+Estructura (little-endian):
+    cabecera   magic b'SVDZ', versión, códec, cuantización, canales,
+               alto y ancho
+    rangos     un uint32 por canal
+    carga      por canal: s (float32), U (m, k) y VT (k, n) cuantizados y,
+               en int8, la escala float32 de cada columna de U y fila de VT;
+               opcionalmente comprimida con zlib o lzma
+
+La versión 2 (progresiva) tiene la misma cabecera y rangos, pero la carga
+es una serie de paquetes con los componentes de todos los canales
+ordenados por valor singular:
+    paquete    bytes de la carga (uint32) y componentes (uint16)
+    carga      canal de cada componente (uint8), s, escalas (en int8),
+               columnas de U y filas de VT; comprimida por paquete
+Cada paquete se puede decodificar en cuanto llega (ver ProgressiveDecoder),
+así que un cliente lento ve una imagen aproximada con los primeros
+componentes sin esperar al resto.
+"""
+
+import lzma
+import struct
+import zlib
+import numpy as np
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .quantization import QUANTIZATIONS, dequantize, quantize
+from .reconstruct import reconstruct_into, to_pixels
+
+
+MAGIC = b'SVDZ'
+VERSION = 1
+PROGRESSIVE_VERSION = 2
+CODECS = ('none', 'zlib', 'lzma')
+
+_HEADER = struct.Struct('<4sBBBBII')
+_PACKET = struct.Struct('<IH')
+# El número de componentes de un paquete se guarda como uint16
+MAX_PACKET_COMPONENTS = 0xFFFF
+
+
+def _compress(payload: bytes, codec: str) -> bytes:
+    if codec == 'zlib':
+        return zlib.compress(payload, 9)
+    if codec == 'lzma':
+        return lzma.compress(payload, preset=6)
+    return payload
+
+
+def _decompress(payload: bytes, codec: str) -> bytes:
+    if codec == 'zlib':
+        return zlib.decompress(payload)
+    if codec == 'lzma':
+        return lzma.decompress(payload)
+    return payload
+
+
+def svdz_size(shape: Tuple[int, ...], k: Union[int, Sequence[int]],
+              quantization: str = 'int8') -> int:
+    """
+    Tamaño en bytes de un contenedor .svdz sin códec.
+
+    Con zlib o lzma el tamaño real es menor o igual (salvo unos bytes de
+    cabecera del códec), así que sirve como cota para un presupuesto.
+
+    Args:
+        shape: Forma de la imagen original
+        k: Rango común o un rango por canal
+        quantization: 'float32', 'float16' o 'int8'
+
+    Returns:
+        Número de bytes
+    """
+    height, width = shape[:2]
+    channels = 1 if len(shape) == 2 else shape[2]
+    ranks = [k] * channels if np.isscalar(k) else list(k)
+    # s en float32, U y VT cuantizados y, en int8, dos escalas float32
+    per_rank = 4 + (height + width) * np.dtype(quantization).itemsize
+    if quantization == 'int8':
+        per_rank += 8
+    return _HEADER.size + 4 * channels + per_rank * int(sum(ranks))
+
+
+def _check_ranks(s_channels, k: Union[int, Sequence[int]], quantization: str, codec: str) -> List[int]:
+    """Valida las opciones y limita el rango de cada canal a los componentes disponibles."""
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Cuantización desconocida: {quantization}. Opciones: {', '.join(QUANTIZATIONS)}")
+    if codec not in CODECS:
+        raise ValueError(f"Códec desconocido: {codec}. Opciones: {', '.join(CODECS)}")
+    channels = len(s_channels)
+    ranks = [k] * channels if np.isscalar(k) else list(k)
+    if len(ranks) != channels:
+        raise ValueError("Se necesita un rango por canal")
+    return [max(0, min(int(r), len(s))) for r, s in zip(ranks, s_channels)]
+
+
+def _header(version: int, codec: str, quantization: str, shape: Tuple[int, ...], ranks: List[int]) -> bytes:
+    height, width = shape[:2]
+    return (_HEADER.pack(MAGIC, version, CODECS.index(codec), QUANTIZATIONS.index(quantization),
+                         len(ranks), height, width)
+            + np.asarray(ranks, dtype='<u4').tobytes())
+
+
+def encode_svdz(components, shape: Tuple[int, ...], k: Union[int, Sequence[int]],
+                quantization: str = 'int8', codec: str = 'zlib', progressive: bool = False) -> bytes:
+    """
+    Codifica factores SVD truncados en el formato .svdz.
+
+    Args:
+        components: Tupla (U, s, VT) por canal, apilada o en listas
+        shape: Forma de la imagen original
+        k: Rango común o un rango por canal
+        quantization: 'float32', 'float16' o 'int8'
+        codec: Compresión sin pérdida de la carga ('none', 'zlib' o 'lzma')
+        progressive: Usar la disposición progresiva (versión 2)
+
+    Returns:
+        Bytes del contenedor
+    """
+    if progressive:
+        return b''.join(iter_svdz_progressive(components, shape, k, quantization, codec))
+    U_channels, s_channels, VT_channels = components
+    ranks = _check_ranks(s_channels, k, quantization, codec)
+
+    qdtype = np.dtype(quantization).newbyteorder('<')
+    parts = []
+    for U, s, VT, r in zip(U_channels, s_channels, VT_channels, ranks):
+        U_q, U_scales = quantize(U[:, :r], quantization, axis=0)
+        VT_q, VT_scales = quantize(VT[:r, :], quantization, axis=1)
+        parts.extend([np.asarray(s[:r], dtype='<f4').tobytes(),
+                      U_scales.astype('<f4').tobytes(), VT_scales.astype('<f4').tobytes(),
+                      U_q.astype(qdtype).tobytes(), VT_q.astype(qdtype).tobytes()])
+
+    return _header(VERSION, codec, quantization, shape, ranks) + _compress(b''.join(parts), codec)
+
+
+def iter_svdz_progressive(components, shape: Tuple[int, ...], k: Union[int, Sequence[int]],
+                          quantization: str = 'int8', codec: str = 'zlib',
+                          batch_size: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Genera un contenedor .svdz progresivo trozo a trozo.
+
+    El primer trozo es la cabecera; cada uno de los siguientes es un paquete
+    con `batch_size` componentes de rango 1, en orden decreciente de valor
+    singular entre todos los canales. Concatenar los trozos da un archivo
+    .svdz válido (versión 2). Cuantizar cada vector por separado da los
+    mismos valores que la disposición por canales.
+
+    Args:
+        components: Tupla (U, s, VT) por canal, apilada o en listas
+        shape: Forma de la imagen original
+        k: Rango común o un rango por canal
+        quantization: 'float32', 'float16' o 'int8'
+        codec: Compresión sin pérdida de cada paquete
+        batch_size: Componentes por paquete (por defecto uno por canal; como
+            mucho MAX_PACKET_COMPONENTS)
+
+    Yields:
+        Bytes de la cabecera y de cada paquete
+    """
+    U_channels, s_channels, VT_channels = components
+    ranks = _check_ranks(s_channels, k, quantization, codec)
+    yield _header(PROGRESSIVE_VERSION, codec, quantization, shape, ranks)
+
+    qdtype = np.dtype(quantization).newbyteorder('<')
+    quantized = []
+    for U, s, VT, r in zip(U_channels, s_channels, VT_channels, ranks):
+        U_q, U_scales = quantize(U[:, :r], quantization, axis=0)
+        VT_q, VT_scales = quantize(VT[:r, :], quantization, axis=1)
+        quantized.append((np.asarray(s[:r], dtype='<f4'), U_scales.astype('<f4'), VT_scales.astype('<f4'),
+                          np.ascontiguousarray(U_q.T).astype(qdtype), VT_q.astype(qdtype)))
+
+    # Orden global por valor singular; el orden estable conserva el de cada canal
+    channel_ids = np.concatenate([np.full(r, c, dtype=np.uint8) for c, r in enumerate(ranks)])
+    fields = [np.concatenate(field) for field in zip(*quantized)]
+    if quantization != 'int8':
+        del fields[1:3]
+    order = np.argsort(-fields[0].astype(np.float64), kind='stable')
+    batch_size = min(max(1, int(batch_size or len(ranks))), MAX_PACKET_COMPONENTS)
+    for start in range(0, len(order), batch_size):
+        batch = order[start:start + batch_size]
+        payload = _compress(b''.join([channel_ids[batch].tobytes()]
+                                     + [field[batch].tobytes() for field in fields]), codec)
+        yield _PACKET.pack(len(payload), len(batch)) + payload
+
+
+def _read_header(data) -> Optional[dict]:
+    """Cabecera y rangos de un contenedor (None si aún no han llegado todos los bytes)."""
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, codec_id, quant_id, channels, height, width = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("No es un archivo .svdz")
+    if version not in (VERSION, PROGRESSIVE_VERSION):
+        raise ValueError(f"Versión de .svdz no soportada: {version}")
+    size = _HEADER.size + 4 * channels
+    if len(data) < size:
+        return None
+    ranks = np.frombuffer(data, dtype='<u4', count=channels, offset=_HEADER.size).astype(int)
+    return {
+        'shape': (height, width) if channels == 1 else (height, width, channels),
+        'ranks': [int(r) for r in ranks],
+        'quantization': QUANTIZATIONS[quant_id],
+        'codec': CODECS[codec_id],
+        'progressive': version == PROGRESSIVE_VERSION,
+        'size': size,
+    }
+
+
+def _parse_packet(payload: bytes, count: int, height: int, width: int, quantization: str):
+    """Componentes de un paquete progresivo: canales, s, columnas de U y filas de VT en float32."""
+    qdtype = np.dtype(quantization).newbyteorder('<')
+    pos = 0
+
+    def _take(dtype, items, shape=None):
+        nonlocal pos
+        array = np.frombuffer(payload, dtype=dtype, count=items, offset=pos)
+        pos += items * np.dtype(dtype).itemsize
+        return array.reshape(shape) if shape else array
+
+    channels = _take(np.uint8, count)
+    s = _take('<f4', count)
+    scales = quantization == 'int8'
+    U_scales = _take('<f4', count if scales else 0)
+    VT_scales = _take('<f4', count if scales else 0)
+    U_rows = dequantize(_take(qdtype, count * height, (count, height)), U_scales, axis=1)
+    VT_rows = dequantize(_take(qdtype, count * width, (count, width)), VT_scales, axis=1)
+    return channels, s, U_rows, VT_rows
+
+
+def _iter_packets(data, offset: int) -> Iterator[Tuple[int, bytes, int]]:
+    """Paquetes completos a partir de offset: (componentes, carga comprimida, fin)."""
+    while len(data) - offset >= _PACKET.size:
+        size, count = _PACKET.unpack_from(data, offset)
+        end = offset + _PACKET.size + size
+        if len(data) < end:
+            return
+        yield count, bytes(data[offset + _PACKET.size:end]), end
+        offset = end
+
+
+def read_svdz(data: bytes) -> dict:
+    """
+    Lee la cabecera y los factores descuantizados de un contenedor .svdz.
+
+    Args:
+        data: Bytes del contenedor
+
+    Returns:
+        Diccionario con 'shape', 'ranks', 'quantization', 'codec',
+        'progressive' y 'components' (listas de U, s y VT en float32)
+    """
+    info = _read_header(data)
+    if info is None:
+        raise ValueError("Contenedor .svdz truncado")
+    codec, quantization, ranks = info['codec'], info['quantization'], info['ranks']
+    height, width = info['shape'][:2]
+    if info['progressive']:
+        s_parts, U_parts, VT_parts = ([[] for _ in ranks] for _ in range(3))
+        end = info['size']
+        for count, payload, end in _iter_packets(data, info['size']):
+            channels, s, U_rows, VT_rows = _parse_packet(_decompress(payload, codec), count,
+                                                         height, width, quantization)
+            for c in np.unique(channels):
+                selected = channels == c
+                s_parts[c].append(s[selected])
+                U_parts[c].append(U_rows[selected])
+                VT_parts[c].append(VT_rows[selected])
+        if end != len(data) or [sum(len(s) for s in part) for part in s_parts] != ranks:
+            raise ValueError("Contenedor .svdz truncado")
+
+        def _join(parts, length):
+            return np.concatenate(parts) if parts else np.empty((0, length), dtype=np.float32)
+
+        info.pop('size')
+        info['components'] = ([_join(part, height).T for part in U_parts],
+                              [_join(part, 0).reshape(-1) for part in s_parts],
+                              [_join(part, width) for part in VT_parts])
+        return info
+    payload = _decompress(data[info['size']:], codec)
+
+    qdtype = np.dtype(quantization).newbyteorder('<')
+    has_scales = quantization == 'int8'
+    pos = 0
+
+    def _take(dtype, count, shape=None):
+        nonlocal pos
+        array = np.frombuffer(payload, dtype=dtype, count=count, offset=pos)
+        pos += count * np.dtype(dtype).itemsize
+        return array.reshape(shape) if shape else array
+
+    U_channels, s_channels, VT_channels = [], [], []
+    for r in ranks:
+        s = _take('<f4', r)
+        U_scales = _take('<f4', r if has_scales else 0)
+        VT_scales = _take('<f4', r if has_scales else 0)
+        U_q = _take(qdtype, height * r, (height, r))
+        VT_q = _take(qdtype, r * width, (r, width))
+        U_channels.append(dequantize(U_q, U_scales, axis=0))
+        s_channels.append(s)
+        VT_channels.append(dequantize(VT_q, VT_scales, axis=1))
+
+    info.pop('size')
+    info['components'] = (U_channels, s_channels, VT_channels)
+    return info
+
+
+def decode_svdz(data: bytes, out: np.ndarray = None) -> np.ndarray:
+    """
+    Decodifica un contenedor .svdz a una imagen uint8.
+
+    Args:
+        data: Bytes del contenedor
+        out: Buffer uint8 preasignado con la forma de la imagen (opcional)
+
+    Returns:
+        Imagen reconstruida
+    """
+    info = read_svdz(data)
+    if out is None:
+        out = np.empty(info['shape'], dtype=np.uint8)
+    elif out.shape != info['shape'] or out.dtype != np.uint8:
+        raise ValueError(f"El buffer de salida debe ser uint8 con forma {info['shape']}")
+    for i, (U, s, VT) in enumerate(zip(*info['components'])):
+        target = out if out.ndim == 2 else out[:, :, i]
+        reconstruct_into(U, s, VT, target)
+    return out
+
+
+def load_svdz(path: str) -> np.ndarray:
+    """
+    Lee un archivo .svdz y lo decodifica.
+
+    Args:
+        path: Ruta del archivo
+
+    Returns:
+        Imagen uint8 reconstruida
+    """
+    with open(path, 'rb') as f:
+        return decode_svdz(f.read())
+
+
+class ProgressiveDecoder:
+    """
+    Decodificador incremental de un contenedor .svdz progresivo.
+
+    Recibe el flujo en trozos de cualquier tamaño (feed). Los componentes
+    recibidos se guardan y se suman a un acumulador float32 por canal solo
+    al generar una imagen, con una matmul por canal: muchos paquetes
+    pequeños no suponen muchas pasadas por la imagen.
+    """
+
+    def __init__(self, milestones: Sequence[int] = (1, 2, 4, 8, 16, 32, 64, 128, 256)):
+        """
+        Inicializa el decodificador.
+
+        Args:
+            milestones: Rangos en los que se genera una imagen; el rango k
+                se alcanza con k componentes por canal en total (los canales
+                con más energía reciben antes los suyos). Al terminar el
+                flujo siempre se genera la imagen final
+        """
+        self.milestones = sorted({int(k) for k in milestones if int(k) > 0})
+        self.info = None
+        self.received = 0
+        self._buffer = bytearray()
+        self._accumulator = None
+        self._pending = []
+        self._emitted = 0
+
+    @property
+    def done(self) -> bool:
+        """Indica si ya han llegado todos los componentes."""
+        return self.info is not None and self.received == sum(self.info['ranks'])
+
+    def feed(self, chunk: bytes) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Añade bytes del flujo y genera las imágenes de los hitos alcanzados.
+
+        Args:
+            chunk: Siguiente trozo del flujo
+
+        Yields:
+            Tuplas (rango, imagen uint8) por cada hito alcanzado y al final
+        """
+        self._buffer += chunk
+        if self.info is None:
+            self.info = _read_header(self._buffer)
+            if self.info is None:
+                return
+            if not self.info['progressive']:
+                raise ValueError("El contenedor .svdz no es progresivo")
+            height, width = self.info['shape'][:2]
+            self._accumulator = np.zeros((len(self.info['ranks']), height, width), dtype=np.float32)
+            del self._buffer[:self.info.pop('size')]
+
+        height, width = self.info['shape'][:2]
+        channels = len(self.info['ranks'])
+        consumed = 0
+        for count, payload, consumed in _iter_packets(self._buffer, 0):
+            chans, s, U_rows, VT_rows = _parse_packet(_decompress(payload, self.info['codec']), count,
+                                                      height, width, self.info['quantization'])
+            start = 0
+            while start < count:
+                # Se parte el paquete en los hitos para que cada imagen sea exacta
+                pending = [k * channels for k in self.milestones if k * channels > self.received]
+                stop = min(count, start + pending[0] - self.received) if pending else count
+                self._pending.append((chans[start:stop], s[start:stop], U_rows[start:stop], VT_rows[start:stop]))
+                self.received += stop - start
+                start = stop
+                if pending and self.received == pending[0]:
+                    yield self._emit(pending[0] // channels)
+        del self._buffer[:consumed]
+        if self.done and self._emitted < self.received:
+            yield self._emit(max(self.info['ranks']))
+
+    def _accumulate(self) -> None:
+        """Suma al acumulador los componentes recibidos desde la última imagen."""
+        if not self._pending:
+            return
+        channels, s, U_rows, VT_rows = (np.concatenate(part) for part in zip(*self._pending))
+        self._pending = []
+        for c in np.unique(channels):
+            selected = channels == c
+            self._accumulator[c] += (U_rows[selected].T * s[selected]) @ VT_rows[selected]
+
+    def _emit(self, k: int) -> Tuple[int, np.ndarray]:
+        self._emitted = self.received
+        return k, self.frame()
+
+    def frame(self) -> np.ndarray:
+        """
+        Imagen uint8 con los componentes recibidos hasta ahora.
+
+        Returns:
+            Imagen con la forma de la original
+        """
+        self._accumulate()
+        out = np.empty(self.info['shape'], dtype=np.uint8)
+        buffer = np.empty(self._accumulator.shape[1:], dtype=np.float32)
+        for c, plane in enumerate(self._accumulator):
+            buffer[...] = plane
+            to_pixels(buffer)
+            if out.ndim == 2:
+                out[...] = buffer
+            else:
+                out[:, :, c] = buffer
+        return out
+
+
+def decode_progressive(chunks: Iterable[bytes],
+                       milestones: Sequence[int] = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+                       ) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Decodifica un flujo .svdz progresivo generando imágenes cada vez más finas.
+
+    Args:
+        chunks: Trozos del flujo (p. ej. los de iter_svdz_progressive o los
+            leídos de un socket)
+        milestones: Rangos en los que se genera una imagen (ver ProgressiveDecoder)
+
+    Yields:
+        Tuplas (rango, imagen uint8)
+    """
+    decoder = ProgressiveDecoder(milestones)
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
@@ -0,0 +1,278 @@
+"""
+Motores de descomposición SVD usados por SVDImageProcessor.
+
+Incluye la SVD completa (LAPACK) y una SVD truncada aleatorizada
+(range finder con sobremuestreo e iteraciones de potencia) que solo
+calcula los primeros `rank` componentes. La SVD completa admite estos
+backends: los drivers de LAPACK `gesdd` (divide y vencerás, el más rápido)
+y `gesvd` (QR, más lento pero más robusto) a través de SciPy, la SVD de
+NumPy (gesdd de la LAPACK con la que se compiló NumPy) y dos rutas para
+matrices muy rectangulares (panorámicas, line-scan):
+
+- `qr`: QR económica de la matriz (m x n, m >> n) y SVD del factor R, de
+  tamaño n x n.
+- `gram`: autodescomposición de la matriz de Gram AᵀA (n x n), acumulada
+  en float64 por bloques de filas; U = A V / s. Es la más rápida, pero
+  eleva al cuadrado el número de condición, así que los valores singulares
+  muy pequeños frente al mayor pierden precisión relativa.
+
+`auto` elige según la relación de aspecto (ver choose_backend).
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+try:
+    from scipy.linalg import qr as scipy_qr, svd as scipy_svd, svdvals as scipy_svdvals
+except Exception:
+    scipy_qr = None
+    scipy_svd = None
+    scipy_svdvals = None
+
+
+ENGINES = ('full', 'randomized')
+BACKENDS = ('gesdd', 'gesvd', 'numpy', 'qr', 'gram', 'auto')
+
+# Relación de aspecto (lado largo / lado corto) a partir de la cual 'auto'
+# usa cada ruta. Medido con float32: por debajo de 2 gesdd es tan rápido
+# como QR + SVD, y a partir de 8 la matriz de Gram es 1,5-3 veces más rápida
+QR_ASPECT = 2.0
+GRAM_ASPECT = 8.0
+
+# Tamaño objetivo del bloque de filas en float64 al acumular la matriz de Gram
+_GRAM_BLOCK_BYTES = 4 * 1024 ** 2
+
+
+def choose_backend(m: int, n: int) -> str:
+    """
+    Elige el backend de la SVD completa según la forma de la matriz.
+
+    Args:
+        m: Filas
+        n: Columnas
+
+    Returns:
+        'gram' si la matriz es muy rectangular, 'qr' si es moderadamente
+        rectangular y 'gesdd' en otro caso
+    """
+    aspect = max(m, n) / max(1, min(m, n))
+    if aspect >= GRAM_ASPECT:
+        return 'gram'
+    if aspect >= QR_ASPECT:
+        return 'qr'
+    return 'gesdd'
+
+
+def _transposed(svd_func, mat: np.ndarray, *args):
+    """Aplica una SVD pensada para matrices altas a una matriz ancha: A = (Aᵀ)ᵀ."""
+    U, s, VT = svd_func(np.swapaxes(mat, -1, -2), *args)
+    return np.swapaxes(VT, -1, -2), s, np.swapaxes(U, -1, -2)
+
+
+def gram_svd(mat: np.ndarray, accumulate: str = 'float64') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    SVD delgada a partir de la autodescomposición de la matriz de Gram.
+
+    Para A (m x n) con m >= n se forma AᵀA (n x n), se calculan sus
+    autovalores (s²) y autovectores (V) y se recupera U = A V / s. Con una
+    matriz ancha se trabaja sobre la traspuesta. Acepta una matriz o una
+    pila (c, m, n). Las columnas de U con s por debajo del umbral de
+    rango quedan a cero: s < s₀ · max(m · eps del tipo de `mat`,
+    √(n · eps de la acumulación)). El primer término es la tolerancia de
+    rango habitual para la precisión de la entrada (U = A V / s se calcula
+    en ese tipo); el segundo, el ruido de los autovalores de AᵀA. Así las
+    columnas que quedan son ortonormales aunque la matriz no tenga rango
+    completo.
+
+    Args:
+        mat: Matriz o pila de matrices a descomponer
+        accumulate: Precisión de la matriz de Gram y de la
+            autodescomposición ('float64' o 'float32'); float64 conserva la
+            precisión de los valores singulares pequeños
+
+    Returns:
+        Tupla (U, s, VT) en el tipo de `mat`
+    """
+    m, n = mat.shape[-2:]
+    if m < n:
+        return _transposed(gram_svd, mat, accumulate)
+    acc = np.dtype(accumulate)
+    dtype = mat.dtype if mat.dtype in (np.float32, np.float64) else np.float64
+    mat_t = np.swapaxes(mat, -1, -2)
+    if acc == mat.dtype:
+        gram = mat_t @ mat
+    else:
+        # Por bloques de filas: el único temporal en float64 es un bloque
+        gram = np.zeros(mat.shape[:-2] + (n, n), dtype=acc)
+        rows = max(1, _GRAM_BLOCK_BYTES // (acc.itemsize * n))
+        for start in range(0, m, rows):
+            block = mat[..., start:start + rows, :].astype(acc)
+            gram += np.swapaxes(block, -1, -2) @ block
+
+    eigvals, V = np.linalg.eigh(gram)
+    # eigh los devuelve en orden ascendente
+    eigvals = eigvals[..., ::-1]
+    V = V[..., ::-1]
+    s = np.sqrt(np.maximum(eigvals, 0))
+    tol = s[..., :1] * max(m * np.finfo(dtype).eps, np.sqrt(n * np.finfo(acc).eps))
+    inv_s = np.divide(1.0, s, out=np.zeros_like(s), where=s > tol)
+    V = V.astype(dtype, copy=False)
+    U = (mat @ V) * inv_s[..., np.newaxis, :].astype(dtype)
+    return U, s.astype(dtype), np.swapaxes(V, -1, -2)
+
+
+def qr_svd(mat: np.ndarray, backend: str = 'gesdd') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    SVD delgada precedida de una QR económica.
+
+    Para A (m x n) con m >= n: A = Q R y R = Ur S Vᵀ, así que U = Q Ur. La
+    SVD se hace sobre R (n x n). Acepta una matriz o una pila (c, m, n).
+
+    Args:
+        mat: Matriz o pila de matrices a descomponer
+        backend: Driver de LAPACK para la SVD de R ('gesdd' o 'gesvd')
+
+    Returns:
+        Tupla (U, s, VT)
+    """
+    m, n = mat.shape[-2:]
+    if m < n:
+        return _transposed(qr_svd, mat, backend)
+    if mat.ndim == 3:
+        parts = [qr_svd(channel, backend) for channel in mat]
+        return tuple(np.stack(factor) for factor in zip(*parts))
+    if scipy_qr is None:
+        Q, R = np.linalg.qr(mat)
+        Ur, s, VT = np.linalg.svd(R)
+    else:
+        Q, R = scipy_qr(mat, mode='economic', check_finite=False)
+        Ur, s, VT = scipy_svd(R, full_matrices=False, lapack_driver=backend,
+                              overwrite_a=True, check_finite=False)
+    return Q @ Ur, s, VT
+
+
+def full_svd(mat: np.ndarray, backend: str = 'gesdd',
+             accumulate: str = 'float64') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    SVD delgada completa de una matriz 2D.
+
+    Args:
+        mat: Matriz a descomponer
+        backend: Uno de BACKENDS (sin SciPy gesdd y gesvd usan NumPy)
+        accumulate: Precisión de la matriz de Gram (backend 'gram')
+
+    Returns:
+        Tupla (U, s, VT)
+    """
+    if backend == 'auto':
+        backend = choose_backend(*mat.shape)
+    if backend == 'gram':
+        return gram_svd(mat, accumulate)
+    if backend == 'qr':
+        return qr_svd(mat)
+    if scipy_svd is not None and backend != 'numpy':
+        return scipy_svd(mat, full_matrices=False, lapack_driver=backend)
+    return np.linalg.svd(mat, full_matrices=False)
+
+
+def batched_svd(stack: np.ndarray, overwrite: bool = False, backend: str = 'gesdd',
+                accumulate: str = 'float64') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    SVD delgada de una pila contigua (c, m, n) de canales.
+
+    Los factores se escriben en arrays 3D contiguos preasignados. Con
+    gesdd y gesvd sigue habiendo una llamada a LAPACK por canal: cada una
+    recibe la traspuesta de una rebanada contigua de la pila, que ya está
+    en orden Fortran, así que no hay copias intermedias, pero el coste de
+    la SVD es el mismo que canal a canal. La gufunc apilada de NumPy
+    (backend 'numpy', o sin SciPy) es una sola llamada, aunque internamente
+    también recorre los canales y resulta más lenta que sgesdd de SciPy. La
+    ruta 'gram' sí procesa toda la pila con matmul y eigh apilados.
+
+    Args:
+        stack: Pila contigua de matrices
+        overwrite: Permite a LAPACK usar la pila como espacio de trabajo
+        backend: Uno de BACKENDS
+        accumulate: Precisión de la matriz de Gram (backend 'gram')
+
+    Returns:
+        Tupla (U, s, VT) con formas (c, m, r), (c, r) y (c, r, n)
+    """
+    if backend == 'auto':
+        backend = choose_backend(*stack.shape[-2:])
+    if backend == 'gram':
+        return gram_svd(stack, accumulate)
+    if backend == 'qr':
+        return qr_svd(stack)
+    if scipy_svd is None or backend == 'numpy':
+        return np.linalg.svd(stack, full_matrices=False)
+
+    c, m, n = stack.shape
+    r = min(m, n)
+    U = np.empty((c, m, r), dtype=stack.dtype)
+    s = np.empty((c, r), dtype=stack.dtype)
+    VT = np.empty((c, r, n), dtype=stack.dtype)
+    for i in range(c):
+        # A^T = U' S V'^T  =>  A = V' S U'^T
+        Ut, s[i], VTt = scipy_svd(stack[i].T, full_matrices=False, lapack_driver=backend,
+                                  overwrite_a=overwrite, check_finite=False)
+        U[i] = VTt.T
+        VT[i] = Ut.T
+    return U, s, VT
+
+
+def singular_values(mat: np.ndarray) -> np.ndarray:
+    """
+    Calcula solo los valores singulares de una matriz 2D.
+
+    Args:
+        mat: Matriz
+
+    Returns:
+        Array con los valores singulares en orden descendente
+    """
+    if scipy_svdvals is not None:
+        return scipy_svdvals(mat)
+    return np.linalg.svd(mat, compute_uv=False)
+
+
+def randomized_svd(mat: np.ndarray, rank: int, oversampling: int = 10,
+                   power_iterations: int = 2,
+                   random_state: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    SVD truncada aleatorizada (Halko, Martinsson y Tropp).
+
+    Acepta una matriz (m, n) o una pila (c, m, n); en el segundo caso
+    todos los canales se procesan con las mismas llamadas apiladas.
+
+    Args:
+        mat: Matriz o pila de matrices a descomponer
+        rank: Número de componentes a calcular
+        oversampling: Columnas extra del bosquejo aleatorio
+        power_iterations: Iteraciones de potencia (mejoran la precisión
+            cuando el espectro decae lentamente)
+        random_state: Semilla del generador aleatorio
+
+    Returns:
+        Tupla (U, s, VT) truncada a `rank` componentes
+    """
+    m, n = mat.shape[-2:]
+    rank = max(1, min(int(rank), m, n))
+    sketch = min(rank + max(0, int(oversampling)), m, n)
+    dtype = mat.dtype if mat.dtype in (np.float32, np.float64) else np.float64
+    mat_t = np.swapaxes(mat, -1, -2)
+
+    rng = np.random.default_rng(random_state)
+    omega = rng.standard_normal((n, sketch)).astype(dtype, copy=False)
+
+    # Base ortonormal aproximada del rango de la matriz
+    Q, _ = np.linalg.qr(mat @ omega)
+    for _ in range(max(0, int(power_iterations))):
+        # Reortogonalizar en cada paso evita perder los componentes pequeños
+        Z, _ = np.linalg.qr(mat_t @ Q)
+        Q, _ = np.linalg.qr(mat @ Z)
+
+    # SVD del problema proyectado, de tamaño (sketch, n)
+    B = np.swapaxes(Q, -1, -2) @ mat
+    Ub, s, VT = np.linalg.svd(B, full_matrices=False)
+    U = Q @ Ub[..., :rank]
+    return U, s[..., :rank], VT[..., :rank, :]
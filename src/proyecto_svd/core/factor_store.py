@@ -0,0 +1,186 @@
+"""
+Almacén compacto de factores SVD en memoria.
+
+Con float32 los factores completos de una foto cuadrada ocupan unas tres
+veces la imagen uint8 original. CompactFactors trunca a un rango máximo y
+guarda U y VT en float16 o en int8 con una escala por bloque (ver
+quantization.quantize_int8_blocks); s se guarda en float32.
+
+Las matrices cuantizadas se indexan como arrays (U[:, :k], VT[start:stop, :],
+U[filas, :k]) y devuelven solo el trozo pedido ya en float32, así que la
+reconstrucción descuantiza sobre la marcha sin materializar los factores
+completos. CompactFactors se desempaqueta como la tupla (U, s, VT) por canal
+que usa el resto del código.
+
+Al construirlo se mide el error de cuantización de cada vector, con lo que
+error_bound(k) da una cota rigurosa del error de Frobenius añadido.
+"""
+
+import numpy as np
+from typing import List, Optional, Sequence, Union
+
+from .quantization import quantize_int8_blocks
+
+
+STORAGES = ('float32', 'float16', 'int8')
+
+
+class QuantizedMatrix:
+    """Matriz de factores cuantizada que se descuantiza al indexarla."""
+
+    __slots__ = ('values', 'scales', 'axis', 'block')
+
+    def __init__(self, mat: np.ndarray, storage: str, axis: int, block: int = 64):
+        """
+        Cuantiza una matriz de factores.
+
+        Args:
+            mat: Matriz float (U o VT)
+            storage: 'float32', 'float16' o 'int8'
+            axis: Eje que recorre cada vector (0 para U, 1 para VT)
+            block: Elementos por escala en int8
+        """
+        if storage not in STORAGES:
+            raise ValueError(f"Almacenamiento desconocido: {storage}. Opciones: {', '.join(STORAGES)}")
+        self.axis = axis
+        self.block = block
+        if storage == 'int8':
+            self.values, self.scales = quantize_int8_blocks(mat, axis, block)
+        else:
+            self.values = np.ascontiguousarray(mat, dtype=storage)
+            self.scales = None
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def dtype(self):
+        """Tipo de los datos descuantizados."""
+        return np.dtype(np.float32)
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    def __getitem__(self, key) -> np.ndarray:
+        """Descuantiza solo la selección pedida (cortes o arrays de índices por eje)."""
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        out = self.values[key].astype(np.float32)
+        if self.scales is None:
+            return out
+        along_key, vector_key = (key[0], key[1]) if self.axis == 0 else (key[1], key[0])
+        scales = self.scales[:, np.arange(self.scales.shape[1])[vector_key]]
+        length = self.values.shape[self.axis]
+        if isinstance(along_key, slice) and along_key == slice(None):
+            # Vector completo: se multiplica por bloques sin expandir las escalas
+            view = out if self.axis == 0 else out.T
+            full = length // self.block * self.block
+            if full:
+                view[:full].reshape(-1, self.block, view.shape[1])[...] *= scales[:full // self.block, np.newaxis, :]
+            if full < length:
+                view[full:] *= scales[-1]
+            return out
+        rows = np.arange(length)[along_key] // self.block
+        expanded = scales[rows]
+        out *= expanded if self.axis == 0 else expanded.T
+        return out
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        out = self[:, :]
+        return out if dtype is None else out.astype(dtype, copy=False)
+
+
+class CompactFactors:
+    """
+    Factores de todos los canales truncados y cuantizados.
+
+    Se desempaqueta como (U, s, VT): listas por canal de QuantizedMatrix y
+    arrays float32 de valores singulares.
+    """
+
+    __slots__ = ('U', 's', 'VT', 'storage', 'max_rank', 'block', '_U_errors', '_VT_errors')
+
+    def __init__(self, components, storage: str = 'int8', max_rank: Optional[int] = None,
+                 block: int = 64):
+        """
+        Construye el almacén a partir de factores en float.
+
+        Args:
+            components: Tupla (U, s, VT) por canal, apilada o en listas
+            storage: 'float32', 'float16' o 'int8'
+            max_rank: Componentes que se conservan por canal (None = todos)
+            block: Elementos por escala en int8
+        """
+        U_channels, s_channels, VT_channels = components
+        self.storage = storage
+        self.max_rank = max_rank
+        self.block = block
+        self.U, self.s, self.VT = [], [], []
+        self._U_errors, self._VT_errors = [], []
+        for U, s, VT in zip(U_channels, s_channels, VT_channels):
+            r = len(s) if max_rank is None else min(int(max_rank), len(s))
+            U_q = QuantizedMatrix(U[:, :r], storage, axis=0, block=block)
+            VT_q = QuantizedMatrix(VT[:r, :], storage, axis=1, block=block)
+            self.U.append(U_q)
+            self.s.append(np.ascontiguousarray(s[:r], dtype=np.float32))
+            self.VT.append(VT_q)
+            # Norma del error de cuantización de cada vector
+            self._U_errors.append(np.linalg.norm(U_q[:, :] - U[:, :r], axis=0))
+            self._VT_errors.append(np.linalg.norm(VT_q[:, :] - VT[:r, :], axis=1))
+
+    def __iter__(self):
+        return iter((self.U, self.s, self.VT))
+
+    def __getitem__(self, index: int):
+        return (self.U, self.s, self.VT)[index]
+
+    def __len__(self) -> int:
+        return 3
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes ocupados por los factores (valores, escalas y s)."""
+        return sum(U.nbytes + s.nbytes + VT.nbytes for U, s, VT in zip(self.U, self.s, self.VT))
+
+    def error_bound(self, k: Union[int, Sequence[int]]) -> List[float]:
+        """
+        Cota del error de Frobenius que añade la cuantización, por canal.
+
+        Con u, v unitarios y errores du, dv de cada componente:
+        ||s (u + du)(v + dv)ᵀ - s u vᵀ|| <= s (|du| + |dv| + |du| |dv|),
+        y la cota del canal es la suma sobre los k componentes.
+
+        Args:
+            k: Rango común o uno por canal
+
+        Returns:
+            Cota por canal (misma escala que los píxeles, 0-255)
+        """
+        ranks = [k] * len(self.s) if np.isscalar(k) else list(k)
+        bounds = []
+        for s, du, dv, r in zip(self.s, self._U_errors, self._VT_errors, ranks):
+            r = max(0, min(int(r), len(s)))
+            s64 = s[:r].astype(np.float64)
+            bounds.append(float(np.sum(s64 * (du[:r] + dv[:r] + du[:r] * dv[:r]))))
+        return bounds
+
+
+def factors_nbytes(components) -> int:
+    """
+    Bytes que ocupan unos factores, compactos o en arrays.
+
+    Args:
+        components: CompactFactors o tupla (U, s, VT) apilada o en listas
+
+    Returns:
+        Tamaño en bytes
+    """
+    if isinstance(components, CompactFactors):
+        return components.nbytes
+    return int(sum(part.nbytes if isinstance(part, np.ndarray) else sum(a.nbytes for a in part)
+                   for part in components))
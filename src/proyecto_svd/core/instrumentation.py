@@ -0,0 +1,211 @@
+"""
+Instrumentación opcional por etapas.
+
+Instrumentation mide el tiempo de reloj, el tiempo de CPU y el pico de
+memoria asignada (con tracemalloc) de cada etapa del procesamiento, p. ej.
+la decodificación en load_image, la conversión a float, LAPACK, las copias
+astype, el precómputo de energía o el recorte a uint8. Cada medición se
+envía a uno o varios sumideros: MemorySink (en memoria), JsonLinesSink
+(archivo JSON lines) o LoggingSink (módulo logging).
+
+Sin instrumentación el procesador usa un contexto nulo compartido, de modo
+que el coste es una comprobación de atributo por etapa.
+"""
+
+import contextlib
+import json
+import logging
+import time
+import tracemalloc
+from collections import deque
+from typing import Dict, IO, List, Optional, Union
+
+# Contexto reutilizado cuando la instrumentación está desactivada
+NULL_STAGE = contextlib.nullcontext()
+
+
+class MemorySink:
+    """Guarda las mediciones recientes en memoria."""
+
+    def __init__(self, maxlen: Optional[int] = 10000):
+        """
+        Inicializa el sumidero.
+
+        Args:
+            maxlen: Número máximo de mediciones guardadas (None sin límite)
+        """
+        self.records = deque(maxlen=maxlen)
+
+    def emit(self, record: Dict) -> None:
+        self.records.append(record)
+
+    def clear(self) -> None:
+        self.records.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Agrega las mediciones por etapa.
+
+        Returns:
+            Diccionario {etapa: {'count', 'wall_s', 'cpu_s', 'peak_bytes'}}
+            con tiempos sumados y el mayor pico de memoria
+        """
+        totals = {}
+        for record in self.records:
+            entry = totals.setdefault(record['stage'], {'count': 0, 'wall_s': 0.0,
+                                                        'cpu_s': 0.0, 'peak_bytes': 0})
+            entry['count'] += 1
+            entry['wall_s'] += record['wall_s']
+            entry['cpu_s'] += record['cpu_s']
+            entry['peak_bytes'] = max(entry['peak_bytes'], record['peak_bytes'] or 0)
+        return totals
+
+
+class JsonLinesSink:
+    """Escribe cada medición como una línea JSON."""
+
+    def __init__(self, target: Union[str, IO[str]]):
+        """
+        Inicializa el sumidero.
+
+        Args:
+            target: Ruta del archivo (se abre en modo añadir) o archivo abierto
+        """
+        self._owns = isinstance(target, str)
+        self._file = open(target, 'a', encoding='utf-8') if self._owns else target
+
+    def emit(self, record: Dict) -> None:
+        self._file.write(json.dumps(record, default=str) + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._owns:
+            self._file.close()
+
+
+class LoggingSink:
+    """Envía cada medición al módulo logging."""
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.INFO):
+        """
+        Inicializa el sumidero.
+
+        Args:
+            logger: Logger de destino (por defecto 'proyecto_svd.instrumentation')
+            level: Nivel de los mensajes
+        """
+        self.logger = logger or logging.getLogger('proyecto_svd.instrumentation')
+        self.level = level
+
+    def emit(self, record: Dict) -> None:
+        if not self.logger.isEnabledFor(self.level):
+            return
+        channel = '' if record['channel'] is None else f" canal={record['channel']}"
+        peak = '' if record['peak_bytes'] is None else f" pico={record['peak_bytes'] / 1024 ** 2:.1f}MB"
+        self.logger.log(self.level, "%s%s: %.2f ms (CPU %.2f ms)%s", record['stage'], channel,
+                        record['wall_s'] * 1000, record['cpu_s'] * 1000, peak)
+
+
+class _Stage:
+    """Contexto de una etapa medida."""
+
+    __slots__ = ('_owner', '_record', '_wall', '_cpu', '_start_bytes', '_max_peak')
+
+    def __init__(self, owner: 'Instrumentation', record: Dict):
+        self._owner = owner
+        self._record = record
+
+    def __enter__(self):
+        owner = self._owner
+        if owner.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if owner._stack:
+                # El pico alcanzado hasta ahora pertenece a la etapa padre
+                parent = owner._stack[-1]
+                parent._max_peak = max(parent._max_peak, peak)
+            tracemalloc.reset_peak()
+            self._start_bytes = current
+            self._max_peak = current
+        owner._stack.append(self)
+        self._cpu = time.process_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        owner = self._owner
+        owner._stack.pop()
+        record = self._record
+        record['wall_s'] = wall
+        record['cpu_s'] = cpu
+        record['peak_bytes'] = None
+        if owner.trace_memory:
+            peak = max(self._max_peak, tracemalloc.get_traced_memory()[1])
+            record['peak_bytes'] = peak - self._start_bytes
+            if owner._stack:
+                parent = owner._stack[-1]
+                parent._max_peak = max(parent._max_peak, peak)
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        owner._emit(record)
+        return False
+
+
+class Instrumentation:
+    """Mide etapas y envía las mediciones a los sumideros."""
+
+    def __init__(self, sinks: Optional[List] = None, trace_memory: bool = True):
+        """
+        Inicializa la instrumentación.
+
+        Args:
+            sinks: Objetos con emit(record); por defecto un MemorySink
+            trace_memory: Mide el pico de memoria con tracemalloc (lo inicia
+                si no está activo; ralentiza las asignaciones de Python)
+        """
+        self.sinks = list(sinks) if sinks is not None else [MemorySink()]
+        self.trace_memory = trace_memory
+        self._stack = []
+        self._started_tracing = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stage(self, name: str, channel: Optional[int] = None, **meta) -> _Stage:
+        """
+        Devuelve un contexto que mide una etapa.
+
+        Args:
+            name: Nombre de la etapa
+            channel: Canal procesado (None si la etapa abarca todos)
+            **meta: Datos adicionales que se copian en la medición
+
+        Returns:
+            Context manager
+        """
+        record = {'stage': name, 'channel': channel}
+        if meta:
+            record.update(meta)
+        return _Stage(self, record)
+
+    def _emit(self, record: Dict) -> None:
+        for sink in self.sinks:
+            sink.emit(record)
+
+    @property
+    def memory(self) -> Optional[MemorySink]:
+        """Primer MemorySink configurado, si lo hay."""
+        for sink in self.sinks:
+            if isinstance(sink, MemorySink):
+                return sink
+        return None
+
+    def close(self) -> None:
+        """Detiene tracemalloc si lo inició esta instancia y cierra los sumideros."""
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+        for sink in self.sinks:
+            if hasattr(sink, 'close'):
+                sink.close()
@@ -0,0 +1,121 @@
+"""
+Cuantización de factores SVD.
+
+Los vectores singulares se guardan en float16 o en int8 con una escala
+float32 por vector (columna de U o fila de VT). El error por elemento en
+int8 está acotado por la mitad de la escala de su vector. La variante por
+bloques (quantize_int8_blocks) usa una escala por cada tramo de `block`
+elementos del vector, lo que reduce el error cuando el vector tiene zonas
+de amplitud muy distinta.
+"""
+
+import numpy as np
+from typing import Tuple
+
+
+QUANTIZATIONS = ('float32', 'float16', 'int8')
+
+
+def quantize_int8(mat: np.ndarray, axis: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cuantiza a int8 con una escala por vector.
+
+    Args:
+        mat: Matriz a cuantizar
+        axis: Eje que recorre cada vector (0 para columnas, 1 para filas)
+
+    Returns:
+        Tupla (valores int8, escalas float32 de cada vector)
+    """
+    max_abs = np.max(np.abs(mat), axis=axis, keepdims=True).astype(np.float32)
+    scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+    quantized = np.rint(mat / scales)
+    np.clip(quantized, -127, 127, out=quantized)
+    return quantized.astype(np.int8), scales.reshape(-1)
+
+
+def dequantize_int8(quantized: np.ndarray, scales: np.ndarray, axis: int) -> np.ndarray:
+    """
+    Reconstruye una matriz float32 cuantizada con quantize_int8.
+
+    Args:
+        quantized: Valores int8
+        scales: Escala de cada vector
+        axis: Eje usado al cuantizar
+
+    Returns:
+        Matriz float32
+    """
+    shape = (1, -1) if axis == 0 else (-1, 1)
+    return quantized.astype(np.float32) * scales.reshape(shape)
+
+
+def quantize_int8_blocks(mat: np.ndarray, axis: int, block: int = 64) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cuantiza a int8 con una escala por bloque de cada vector.
+
+    Args:
+        mat: Matriz a cuantizar
+        axis: Eje que recorre cada vector (0 para columnas, 1 para filas)
+        block: Elementos consecutivos del vector que comparten escala
+
+    Returns:
+        Tupla (valores int8 con la forma de mat, escalas float32 de forma
+        (bloques, vectores))
+    """
+    # Se trabaja con los vectores como columnas
+    work = np.asarray(mat if axis == 0 else mat.T, dtype=np.float32)
+    length, vectors = work.shape
+    blocks = -(-length // block)
+    padded = np.zeros((blocks * block, vectors), dtype=np.float32)
+    padded[:length] = work
+    max_abs = np.max(np.abs(padded.reshape(blocks, block, vectors)), axis=1)
+    scales = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+    quantized = np.rint(padded.reshape(blocks, block, vectors) / scales[:, np.newaxis, :])
+    np.clip(quantized, -127, 127, out=quantized)
+    quantized = quantized.reshape(blocks * block, vectors)[:length].astype(np.int8)
+    return (quantized if axis == 0 else np.ascontiguousarray(quantized.T)), scales
+
+
+def dequantize_int8_blocks(quantized: np.ndarray, scales: np.ndarray, axis: int,
+                           block: int = 64) -> np.ndarray:
+    """
+    Reconstruye una matriz float32 cuantizada con quantize_int8_blocks.
+
+    Args:
+        quantized: Valores int8
+        scales: Escalas (bloques, vectores)
+        axis: Eje usado al cuantizar
+        block: Tamaño de bloque usado al cuantizar
+
+    Returns:
+        Matriz float32
+    """
+    expanded = np.repeat(scales, block, axis=0)[:quantized.shape[axis]]
+    return quantized.astype(np.float32) * (expanded if axis == 0 else expanded.T)
+
+
+def quantize(mat: np.ndarray, mode: str, axis: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cuantiza una matriz según el modo indicado.
+
+    Args:
+        mat: Matriz a cuantizar
+        mode: 'float32', 'float16' o 'int8'
+        axis: Eje de cada vector (solo para int8)
+
+    Returns:
+        Tupla (valores, escalas); las escalas están vacías salvo en int8
+    """
+    if mode == 'int8':
+        return quantize_int8(mat, axis)
+    if mode in ('float32', 'float16'):
+        return np.ascontiguousarray(mat, dtype=mode), np.empty(0, dtype=np.float32)
+    raise ValueError(f"Cuantización desconocida: {mode}. Opciones: {', '.join(QUANTIZATIONS)}")
+
+
+def dequantize(values: np.ndarray, scales: np.ndarray, axis: int) -> np.ndarray:
+    """Inverso de quantize(); devuelve float32."""
+    if values.dtype == np.int8:
+        return dequantize_int8(values, scales, axis)
+    return values.astype(np.float32, copy=False)
@@ -0,0 +1,178 @@
+"""
+Selección automática del rango k.
+
+A partir de la energía acumulada de cada canal (la que compute_svd ya
+precalcula) se obtiene directamente, sin reconstrucciones de prueba:
+
+    energía retenida(k) = acumulado[k - 1] / total
+    error de Frobenius²(k) = total - acumulado[k - 1]
+    PSNR(k) = 10 log10(255² / (error² / píxeles))
+
+Ese es el error de la aproximación float de rango k. Recortar a [0, 255]
+solo puede reducirlo, pero guardar en uint8 añade el redondeo, hasta 0,5
+por píxel (ver reconstruct.to_pixels). Por la desigualdad triangular el
+RMSE de la imagen uint8 es como mucho RMSE(k) + 0,5, así que los objetivos
+de PSNR y RMSE se aplican a la salida real reservando ese margen
+(QUANTIZATION_RMSE). Si el objetivo no deja margen solo lo cumple el rango
+máximo. Todas las búsquedas son vectorizadas sobre la matriz (canales, k)
+de acumulados.
+"""
+
+import numpy as np
+from typing import List, Optional, Sequence, Tuple, Union
+
+from .container import svdz_size
+
+
+# Error máximo por píxel del redondeo a uint8 de la reconstrucción
+QUANTIZATION_RMSE = 0.5
+
+
+def padded_cumsums(cumsums: Sequence[np.ndarray], max_k: int) -> np.ndarray:
+    """
+    Apila los acumulados de energía en una matriz (canales, max_k) en float64.
+
+    Un canal con menos valores singulares se completa con su último valor
+    (sus componentes adicionales no aportan energía).
+
+    Args:
+        cumsums: Energía acumulada por canal
+        max_k: Número de columnas
+
+    Returns:
+        Matriz de acumulados
+    """
+    out = np.zeros((len(cumsums), max_k))
+    for i, csum in enumerate(cumsums):
+        csum = np.asarray(csum[:max_k], dtype=np.float64)
+        if csum.size:
+            out[i, :csum.size] = csum
+            out[i, csum.size:] = csum[-1]
+    return out
+
+
+def _first_reaching(values: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+    """Primer índice (por fila) en que values >= threshold; el último si no se alcanza."""
+    reached = values >= threshold[..., np.newaxis]
+    first = np.argmax(reached, axis=-1)
+    return np.where(reached.any(axis=-1), first, values.shape[-1] - 1)
+
+
+def select_rank(cumsums: Sequence[np.ndarray], totals: Sequence[float], shape: Tuple[int, ...],
+                max_k: int, energy: Optional[float] = None, psnr: Optional[float] = None,
+                rmse: Optional[float] = None, max_bytes: Optional[int] = None,
+                per_channel: bool = False,
+                quantization: str = 'int8') -> Union[int, List[int]]:
+    """
+    Elige el menor k que cumple los objetivos de calidad y cabe en el presupuesto.
+
+    Los objetivos de energía, PSNR y RMSE fijan un k mínimo (PSNR y RMSE
+    medidos sobre la imagen uint8 reconstruida); max_bytes fija
+    un máximo (el tamaño de un .svdz sin códec, ver svdz_size). Si ambos
+    chocan prevalece el presupuesto de bytes. Con solo max_bytes se devuelve
+    el mayor k que cabe.
+
+    Args:
+        cumsums: Energía acumulada por canal
+        totals: Energía total por canal
+        shape: Forma de la imagen
+        max_k: Rango máximo disponible
+        energy: Porcentaje mínimo de energía retenida (0-100)
+        psnr: PSNR mínimo en dB
+        rmse: Error cuadrático medio máximo por píxel (escala 0-255)
+        max_bytes: Tamaño máximo del contenedor en bytes
+        per_channel: Si es True, cada canal cumple el objetivo por separado
+            y se devuelve un k por canal
+        quantization: Cuantización usada para estimar los bytes
+
+    Returns:
+        k común, o lista con un k por canal si per_channel=True
+    """
+    if energy is None and psnr is None and rmse is None and max_bytes is None:
+        raise ValueError("Indica al menos un objetivo: energy, psnr, rmse o max_bytes")
+    max_k = max(1, int(max_k))
+    channels = len(cumsums)
+    csums = padded_cumsums(cumsums, max_k)
+    totals = np.asarray(totals, dtype=np.float64)
+    pixels = float(shape[0] * shape[1])
+    if not per_channel:
+        # Un solo canal equivalente con la energía de todos
+        csums = csums.sum(axis=0, keepdims=True)
+        totals = totals.sum(keepdims=True)
+        pixels *= channels
+
+    quality = energy is not None or psnr is not None or rmse is not None
+    # Sin objetivo de calidad se busca el mayor k que cabe en el presupuesto
+    k = np.full(len(totals), 1 if quality else max_k, dtype=np.int64)
+    if energy is not None:
+        # Pequeña holgura para que el k exacto no se pierda por redondeo
+        threshold = totals * (energy / 100.0) * (1 - 1e-12)
+        k = np.maximum(k, _first_reaching(csums, threshold) + 1)
+    if psnr is not None:
+        rmse_bound = 255.0 / 10 ** (psnr / 20.0)
+        rmse = rmse_bound if rmse is None else min(rmse, rmse_bound)
+    if rmse is not None:
+        # error² <= píxeles · rmse_f²  <=>  acumulado >= total - píxeles · rmse_f²,
+        # con rmse_f el margen que deja el redondeo a uint8
+        float_rmse = max(float(rmse) - QUANTIZATION_RMSE, 0.0)
+        threshold = totals - pixels * float_rmse ** 2
+        k = np.maximum(k, _first_reaching(csums, threshold) + 1)
+
+    if max_bytes is not None:
+        # El tamaño crece linealmente con la suma de los rangos
+        base = svdz_size(shape, 0, quantization)
+        per_rank = (svdz_size(shape, 1, quantization) - base) // channels
+        budget = max(len(k), int((max_bytes - base) // per_rank))
+        if not per_channel:
+            k = np.minimum(k, budget // channels)
+        elif k.sum() > budget:
+            # Se recortan primero los canales de mayor k: nivel común L con
+            # sum(min(k, L)) <= presupuesto y el sobrante a los recortados
+            levels = np.arange(max_k + 1)
+            used = np.minimum(k[np.newaxis, :], levels[:, np.newaxis]).sum(axis=1)
+            level = int(np.searchsorted(used, budget, side='right')) - 1
+            capped = k > level
+            k = np.minimum(k, level)
+            extra = budget - int(k.sum())
+            k[np.flatnonzero(capped)[:extra]] += 1
+
+    k = np.clip(k, 1, max_k)
+    if per_channel:
+        return [int(v) for v in k]
+    return int(k[0])
+
+
+def water_fill_ranks(spectra: Sequence[np.ndarray], costs: Sequence[float],
+                     budget: float) -> List[int]:
+    """
+    Reparte un presupuesto de parámetros entre canales por ganancia de energía.
+
+    Cada componente i del canal c aporta s[c][i]² de energía y cuesta
+    costs[c] parámetros (m + n + 1 para un canal m x n). El reparto voraz
+    toma siempre el componente con mayor energía por parámetro; como los
+    valores singulares de cada canal están ordenados, equivale a ordenar de
+    una vez todas las ganancias y quedarse con el prefijo que cabe.
+
+    Args:
+        spectra: Valores singulares de cada canal (descendentes)
+        costs: Parámetros por componente de cada canal
+        budget: Parámetros totales disponibles
+
+    Returns:
+        Rango de cada canal (al menos 1)
+    """
+    channels = len(spectra)
+    costs = np.asarray(costs, dtype=np.float64)
+    # Un componente por canal como mínimo
+    ranks = np.ones(channels, dtype=np.int64)
+    remaining = budget - costs.sum()
+    if remaining > 0:
+        owner = np.concatenate([np.full(max(len(s) - 1, 0), c) for c, s in enumerate(spectra)])
+        gains = np.concatenate([np.square(np.asarray(s[1:], dtype=np.float64)) / costs[c]
+                                for c, s in enumerate(spectra)])
+        # Orden estable: a igual ganancia se respeta el orden dentro del canal
+        order = np.argsort(-gains, kind='stable')
+        spent = np.cumsum(costs[owner[order]])
+        taken = order[:int(np.searchsorted(spent, remaining, side='right'))]
+        ranks += np.bincount(owner[taken], minlength=channels)
+    return [int(r) for r in ranks]
@@ -0,0 +1,267 @@
+"""
+Núcleos de reconstrucción de imágenes a partir de factores SVD.
+
+Todos los núcleos recortan a [0, 255] y redondean al entero más cercano
+antes de escribir en uint8 (la conversión directa trunca), así que la
+cuantización añade como mucho 0,5 por píxel al error de la aproximación.
+"""
+
+import numpy as np
+try:
+    from scipy.linalg import blas as scipy_blas
+except Exception:
+    scipy_blas = None
+
+
+# Tamaño objetivo del bloque temporal (cabe en la caché L2)
+BLOCK_BYTES = 256 * 1024
+
+
+def to_pixels(block: np.ndarray) -> np.ndarray:
+    """Recorta un bloque float a [0, 255] y lo redondea en sitio, listo para uint8."""
+    np.clip(block, 0, 255, out=block)
+    return np.rint(block, out=block)
+
+
+def reconstruct_into(U: np.ndarray, s: np.ndarray, VT: np.ndarray, out: np.ndarray,
+                     block_rows: int = None) -> np.ndarray:
+    """
+    Reconstruye (U * s) @ VT directamente en un buffer uint8.
+
+    Se procesa por bloques de filas, así que el único temporal float32 es
+    un bloque pequeño; recortar y convertir a uint8 se hace al escribir.
+
+    Args:
+        U: Vectores singulares izquierdos (m, k)
+        s: Valores singulares (k,)
+        VT: Vectores singulares derechos (k, n)
+        out: Buffer uint8 (m, n) de salida; puede ser una vista de un canal
+        block_rows: Filas por bloque (por defecto según BLOCK_BYTES)
+
+    Returns:
+        El buffer de salida
+    """
+    m, n = out.shape
+    Us = U * s
+    dtype = np.result_type(Us.dtype, VT.dtype)
+    rows = block_rows or _block_rows(n, dtype)
+    buffer = np.empty((min(rows, m), n), dtype=dtype)
+    for start in range(0, m, rows):
+        block = buffer[:min(rows, m - start)]
+        np.matmul(Us[start:start + rows], VT, out=block)
+        to_pixels(block)
+        out[start:start + rows] = block
+    return out
+
+
+def reconstruct_stacked_into(U: np.ndarray, s: np.ndarray, VT: np.ndarray, ranks, out: np.ndarray,
+                             block_rows: int = None) -> np.ndarray:
+    """
+    Reconstruye todos los canales apilados directamente en un buffer uint8.
+
+    Por cada bloque de filas se hace una sola matmul por lotes de los C
+    canales, se recorta en sitio y se escribe (convirtiendo a uint8) en las
+    filas correspondientes de la salida intercalada. El único temporal
+    float es el bloque (C, filas, n), de BLOCK_BYTES por canal.
+
+    Args:
+        U: Vectores singulares izquierdos (C, m, r)
+        s: Valores singulares (C, r)
+        VT: Vectores singulares derechos (C, r, n)
+        ranks: Rango de cada canal
+        out: Buffer uint8 (m, n, C), o (m, n) si C = 1
+        block_rows: Filas por bloque (por defecto según BLOCK_BYTES)
+
+    Returns:
+        El buffer de salida
+    """
+    channels, m = U.shape[:2]
+    n = VT.shape[2]
+    k = max(ranks)
+    s_k = s[:, :k]
+    if min(ranks) < k:
+        # Rangos distintos: se anulan los valores singulares sobrantes
+        s_k = np.where(np.arange(k) < np.asarray(ranks)[:, np.newaxis], s_k, 0)
+    s_k = s_k[:, np.newaxis, :]
+    VT_k = VT[:, :k, :]
+    # Cada canal del bloque ocupa BLOCK_BYTES
+    dtype = np.result_type(U.dtype, VT.dtype)
+    rows = block_rows or _block_rows(n, dtype)
+    target = out if out.ndim == 3 else out[:, :, np.newaxis]
+    # Un único buffer reutilizado por todos los bloques
+    buffer = np.empty((channels, min(rows, m), n), dtype=dtype)
+    for start in range(0, m, rows):
+        block = buffer[:, :min(rows, m - start)]
+        np.matmul(U[:, start:start + rows, :k] * s_k, VT_k, out=block)
+        to_pixels(block)
+        # Una escritura por canal es más rápida que intercalar con moveaxis
+        for c in range(channels):
+            target[start:start + rows, :, c] = block[c]
+    return out
+
+
+def preview_size(height: int, width: int, max_width: int, max_height: int):
+    """
+    Calcula el tamaño de vista previa conservando la proporción.
+
+    Args:
+        height: Alto original
+        width: Ancho original
+        max_width: Ancho máximo
+        max_height: Alto máximo
+
+    Returns:
+        Tupla (alto, ancho); la imagen nunca se amplía
+    """
+    ratio = min(max_width / width, max_height / height)
+    if ratio >= 1:
+        return height, width
+    return max(1, int(height * ratio)), max(1, int(width * ratio))
+
+
+def box_downsample(array: np.ndarray, size: int, axis: int) -> np.ndarray:
+    """
+    Reduce un eje a `size` elementos promediando bloques contiguos.
+
+    Al ser lineal, promediar las filas de U y las columnas de VT equivale
+    a promediar por áreas la imagen reconstruida (antes de recortar).
+
+    Args:
+        array: Array a reducir
+        size: Nuevo tamaño del eje
+        axis: Eje a reducir
+
+    Returns:
+        Array float32 reducido
+    """
+    length = array.shape[axis]
+    if size >= length:
+        return np.asarray(array, dtype=np.float32)
+    edges = np.linspace(0, length, size + 1).astype(np.intp)
+    counts = np.diff(edges).astype(np.float32)
+    sums = np.add.reduceat(np.asarray(array, dtype=np.float32), edges[:-1], axis=axis)
+    shape = [1] * sums.ndim
+    shape[axis] = size
+    return sums / counts.reshape(shape)
+
+
+def _block_rows(n: int, dtype=np.float32) -> int:
+    """Filas de n columnas del tipo dtype que caben en BLOCK_BYTES."""
+    return max(1, BLOCK_BYTES // (np.dtype(dtype).itemsize * n))
+
+
+class IncrementalReconstructor:
+    """
+    Reconstrucción incremental por diferencias de rango.
+
+    Mantiene el acumulador float32 sin recortar de la última reconstrucción
+    y, al cambiar de k1 a k2, suma o resta solo el bloque
+    U[:, k1:k2] * s[k1:k2] @ VT[k1:k2, :]. Si la diferencia cuesta más
+    que empezar de cero (|k2 - k1| >= k2) se recalcula todo. k puede ser
+    común o un rango por canal.
+    """
+
+    def __init__(self, components, shape, refresh_after: int = 64):
+        """
+        Inicializa el reconstructor.
+
+        Args:
+            components: Tupla (U, s, VT) por canal, apilada o en listas
+            shape: Forma de la imagen de salida
+            refresh_after: Actualizaciones incrementales tras las que se
+                recalcula el acumulador para descartar el error de redondeo
+        """
+        U_channels, s_channels, VT_channels = components
+        self._channels = list(zip(U_channels, s_channels, VT_channels))
+        self.shape = tuple(shape)
+        self.refresh_after = refresh_after
+        self._accumulators = None
+        self._k = 0
+        self._ranks = [0] * len(self._channels)
+        self._updates = 0
+        self.full_recomputes = 0
+        self.incremental_updates = 0
+
+    @property
+    def k(self):
+        """Rango del acumulador actual (tal como se pidió)."""
+        return self._k
+
+    def _channel_ranks(self, k) -> list:
+        """Rango efectivo de cada canal."""
+        ranks = [k] * len(self._channels) if np.isscalar(k) else list(k)
+        if len(ranks) != len(self._channels):
+            raise ValueError(f"Se necesitan {len(self._channels)} rangos, uno por canal")
+        return [min(max(0, int(r)), len(s)) for r, (_, s, _) in zip(ranks, self._channels)]
+
+    def _add_range(self, acc: np.ndarray, U, s, VT, start: int, stop: int, sign: float) -> None:
+        """Suma (o resta) los componentes start:stop al acumulador por bloques de filas."""
+        if stop <= start:
+            return
+        Us = U[:, start:stop] * s[start:stop]
+        VT_block = VT[start:stop, :]
+        if scipy_blas is not None and acc.dtype == np.float32 and acc.flags.c_contiguous:
+            # GEMM en sitio sobre acc^T (orden Fortran): acc += sign * Us @ VT
+            # sin temporales del tamaño de la imagen
+            result = scipy_blas.sgemm(sign, VT_block.T, Us.T, beta=1.0, c=acc.T, overwrite_c=True)
+            if result.ctypes.data != acc.ctypes.data:
+                acc[...] = result.T
+            return
+        Us *= sign
+        rows = _block_rows(acc.shape[1], acc.dtype)
+        for r in range(0, acc.shape[0], rows):
+            acc[r:r + rows] += Us[r:r + rows] @ VT_block
+
+    def _recompute(self, ranks: list) -> None:
+        if self._accumulators is None:
+            self._accumulators = [np.zeros((U.shape[0], VT.shape[1]), dtype=np.float32)
+                                  for U, _, VT in self._channels]
+        for acc, (U, s, VT), r in zip(self._accumulators, self._channels, ranks):
+            acc.fill(0)
+            self._add_range(acc, U, s, VT, 0, r, 1.0)
+        self._updates = 0
+        self.full_recomputes += 1
+
+    def update(self, k) -> None:
+        """
+        Lleva el acumulador al rango k.
+
+        Args:
+            k: Número de valores singulares a usar (común o uno por canal)
+        """
+        ranks = self._channel_ranks(k)
+        delta = sum(abs(new - old) for new, old in zip(ranks, self._ranks))
+        if self._accumulators is None or delta >= sum(ranks) or self._updates >= self.refresh_after:
+            self._recompute(ranks)
+        elif delta:
+            for acc, (U, s, VT), k_old, k_new in zip(self._accumulators, self._channels,
+                                                     self._ranks, ranks):
+                if k_new > k_old:
+                    self._add_range(acc, U, s, VT, k_old, k_new, 1.0)
+                else:
+                    self._add_range(acc, U, s, VT, k_new, k_old, -1.0)
+            self._updates += 1
+            self.incremental_updates += 1
+        self._ranks = ranks
+        self._k = max(0, int(k)) if np.isscalar(k) else tuple(int(r) for r in k)
+
+    def reconstruct(self, k, out: np.ndarray = None) -> np.ndarray:
+        """
+        Reconstruye la imagen con k componentes.
+
+        Args:
+            k: Número de valores singulares a usar (común o uno por canal)
+            out: Buffer uint8 de salida (opcional)
+
+        Returns:
+            Imagen uint8 reconstruida
+        """
+        self.update(k)
+        if out is None:
+            out = np.empty(self.shape, dtype=np.uint8)
+        for i, acc in enumerate(self._accumulators):
+            target = out if out.ndim == 2 else out[:, :, i]
+            rows = _block_rows(acc.shape[1], acc.dtype)
+            for r in range(0, acc.shape[0], rows):
+                target[r:r + rows] = to_pixels(np.array(acc[r:r + rows]))
+        return out
@@ -0,0 +1,273 @@
+"""
+Compresión SVD de secuencias de fotogramas (vídeo, pilas médicas).
+
+Fotogramas consecutivos de una misma escena tienen subespacios singulares
+casi iguales, así que no hace falta una SVD completa por fotograma: se
+parte de los vectores singulares derechos del fotograma anterior (más unas
+columnas aleatorias de sobremuestreo) y unas pocas iteraciones de subespacio
+a rango fijo bastan para converger. Cuesta O(m n r) frente a O(m n²) de la
+SVD completa.
+
+La SVD completa solo se repite en el primer fotograma, en los cortes de
+escena (el fotograma cambia más de `scene_cut` en norma relativa) y cuando
+la solución arrancada en caliente captura claramente menos energía que la
+última SVD completa.
+
+Las fuentes pueden ser cualquier iterable de arrays, una pila .npy (se
+mapea en memoria), un directorio de imágenes, un archivo multifotograma que
+PIL sepa leer (GIF, TIFF, APNG) o un vídeo si imageio está instalado.
+"""
+
+import os
+import time
+import numpy as np
+from PIL import Image, ImageSequence
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+try:
+    import imageio.v3 as iio
+except Exception:
+    iio = None
+
+from .engines import BACKENDS, batched_svd
+from .reconstruct import reconstruct_stacked_into
+
+
+FRAME_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+
+def _as_frame(frame) -> np.ndarray:
+    """Convierte un fotograma (array o imagen PIL) en un array gris o RGB."""
+    if isinstance(frame, Image.Image):
+        frame = frame.convert('L' if frame.mode in ('L', 'I;16', 'I', 'F') else 'RGB')
+    frame = np.asarray(frame)
+    if frame.ndim == 3 and frame.shape[2] == 4:
+        frame = frame[:, :, :3]
+    if frame.ndim not in (2, 3):
+        raise ValueError(f"Fotograma con forma no soportada: {frame.shape}")
+    return frame
+
+
+def iter_frames(source: Union[str, np.ndarray, Iterable]) -> Iterator[np.ndarray]:
+    """
+    Recorre los fotogramas de una fuente sin cargarla entera.
+
+    Args:
+        source: Iterable de arrays o imágenes PIL, pila (n, alto, ancho[, c]),
+            ruta .npy, directorio de imágenes, archivo multifotograma o vídeo
+
+    Yields:
+        Fotogramas (alto, ancho) o (alto, ancho, 3)
+    """
+    if isinstance(source, str):
+        if os.path.isdir(source):
+            names = sorted(name for name in os.listdir(source)
+                           if name.lower().endswith(FRAME_EXTENSIONS))
+            for name in names:
+                with Image.open(os.path.join(source, name)) as image:
+                    yield _as_frame(image)
+            return
+        if source.lower().endswith('.npy'):
+            source = np.load(source, mmap_mode='r')
+        else:
+            try:
+                image = Image.open(source)
+            except Exception:
+                if iio is None:
+                    raise ValueError(f"No se puede leer {source}: los vídeos requieren imageio")
+                for frame in iio.imiter(source):
+                    yield _as_frame(frame)
+                return
+            with image:
+                for frame in ImageSequence.Iterator(image):
+                    yield _as_frame(frame)
+            return
+    for frame in source:
+        yield _as_frame(frame)
+
+
+def _orthonormal(mat: np.ndarray) -> np.ndarray:
+    """Base ortonormal de las columnas de una pila de matrices."""
+    Q, _ = np.linalg.qr(mat)
+    return Q
+
+
+class SequenceProcessor:
+    """
+    Descompone secuencias de fotogramas a rango fijo con arranque en caliente.
+
+    Todos los canales de un fotograma se procesan apilados (c, alto, ancho)
+    con matmul y QR por lotes.
+    """
+
+    def __init__(self, rank: int = 20, power_iterations: int = 1, oversampling: int = 5,
+                 scene_cut: float = 0.3, energy_drop: float = 0.01, backend: str = 'auto',
+                 dtype: str = 'float32', random_state: Optional[int] = None):
+        """
+        Inicializa el procesador.
+
+        Args:
+            rank: Componentes por canal y fotograma
+            power_iterations: Iteraciones de subespacio por fotograma
+            oversampling: Columnas aleatorias añadidas al subespacio anterior
+                (capturan las direcciones nuevas que aparecen en la escena)
+            scene_cut: Cambio relativo ||F_t - F_t-1|| / ||F_t-1|| a partir
+                del cual se hace una SVD completa
+            energy_drop: Pérdida de energía capturada (fracción) frente a la
+                última SVD completa que también fuerza una SVD completa
+            backend: Backend de la SVD completa (ver engines.BACKENDS)
+            dtype: Tipo de los cálculos ('float32' o 'float64')
+            random_state: Semilla de las columnas de sobremuestreo
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend desconocido: {backend}. Opciones: {', '.join(BACKENDS)}")
+        self.rank = max(1, int(rank))
+        self.power_iterations = max(0, int(power_iterations))
+        self.oversampling = max(0, int(oversampling))
+        self.scene_cut = scene_cut
+        self.energy_drop = energy_drop
+        self.backend = backend
+        self.dtype = np.dtype(dtype)
+        self._rng = np.random.default_rng(random_state)
+        self.reset()
+
+    def reset(self) -> None:
+        """Olvida el subespacio y las estadísticas (p. ej. al cambiar de clip)."""
+        self._previous = None
+        self._V = None
+        self._reference_energy = None
+        self._latencies: List[float] = []
+        self._full = 0
+        self._warm = 0
+        self._started = None
+        self._elapsed = 0.0
+
+    def _full_svd(self, stack: np.ndarray, r: int):
+        """SVD completa truncada a r componentes."""
+        U, s, VT = batched_svd(stack, backend=self.backend)
+        return U[:, :, :r], s[:, :r], VT[:, :r, :]
+
+    def _warm_svd(self, stack: np.ndarray, r: int):
+        """Iteración de subespacio a rango fijo desde los vectores V anteriores."""
+        channels, m, n = stack.shape
+        start = self._V
+        extra = min(self.oversampling, n - r)
+        if extra > 0:
+            noise = self._rng.standard_normal((channels, n, extra)).astype(self.dtype, copy=False)
+            start = np.concatenate([start, noise], axis=2)
+        stack_t = np.swapaxes(stack, 1, 2)
+        Q = _orthonormal(stack @ start)
+        for _ in range(self.power_iterations):
+            Q = _orthonormal(stack @ _orthonormal(stack_t @ Q))
+        # SVD del problema proyectado, de tamaño (r + extra, n)
+        Ub, s, VT = np.linalg.svd(np.swapaxes(Q, 1, 2) @ stack, full_matrices=False)
+        return Q @ Ub[:, :, :r], s[:, :r], VT[:, :r, :]
+
+    def process_frame(self, frame: np.ndarray, reconstruct: bool = True) -> Dict:
+        """
+        Descompone un fotograma, arrancando del subespacio del anterior.
+
+        Args:
+            frame: Fotograma (alto, ancho) o (alto, ancho, c)
+            reconstruct: Si se devuelve también la reconstrucción uint8
+
+        Returns:
+            Diccionario con el índice, el método ('full' o 'warm'), el
+            motivo de la SVD completa ('first', 'scene_cut', 'shape',
+            'energy_drop' o None), el cambio relativo respecto al anterior,
+            la energía retenida (%), la latencia en ms, los factores
+            apilados (U, s, VT) y la reconstrucción
+        """
+        begin = time.perf_counter()
+        if self._started is None:
+            self._started = begin
+        frame = _as_frame(frame)
+        planes = frame[np.newaxis] if frame.ndim == 2 else np.moveaxis(frame, -1, 0)
+        stack = np.ascontiguousarray(planes, dtype=self.dtype)
+        channels, m, n = stack.shape
+        r = min(self.rank, m, n)
+        total = np.einsum('cij,cij->', stack, stack, dtype=np.float64)
+
+        reason = None
+        change = None
+        if self._previous is None:
+            reason = 'first'
+        elif self._previous.shape != stack.shape:
+            reason = 'shape'
+        else:
+            diff = np.subtract(stack, self._previous)
+            previous_norm = np.sqrt(np.einsum('cij,cij->', self._previous, self._previous,
+                                              dtype=np.float64))
+            change = float(np.sqrt(np.einsum('cij,cij->', diff, diff, dtype=np.float64))
+                           / max(previous_norm, np.finfo(float).tiny))
+            if change > self.scene_cut:
+                reason = 'scene_cut'
+
+        if reason is None:
+            U, s, VT = self._warm_svd(stack, r)
+            captured = float(np.sum(s.astype(np.float64) ** 2) / total) if total > 0 else 1.0
+            if captured < self._reference_energy - self.energy_drop:
+                reason = 'energy_drop'
+        if reason is not None:
+            U, s, VT = self._full_svd(stack, r)
+            captured = float(np.sum(s.astype(np.float64) ** 2) / total) if total > 0 else 1.0
+            self._reference_energy = captured
+            self._full += 1
+        else:
+            self._warm += 1
+
+        self._V = np.swapaxes(VT, 1, 2)
+        self._previous = stack
+        output = None
+        if reconstruct:
+            output = np.empty(frame.shape[:2] + ((channels,) if frame.ndim == 3 else ()), dtype=np.uint8)
+            reconstruct_stacked_into(U, s, VT, [r] * channels, output)
+
+        end = time.perf_counter()
+        latency = (end - begin) * 1000
+        self._latencies.append(latency)
+        self._elapsed = end - self._started
+        return {
+            'index': len(self._latencies) - 1,
+            'method': 'warm' if reason is None else 'full',
+            'reason': reason,
+            'change': change,
+            'energy_retained': 100 * captured,
+            'latency_ms': latency,
+            'components': (U, s, VT),
+            'frame': output,
+        }
+
+    def process(self, source, reconstruct: bool = True) -> Iterator[Dict]:
+        """
+        Procesa una secuencia completa en streaming.
+
+        Args:
+            source: Cualquier fuente aceptada por iter_frames
+            reconstruct: Si cada resultado incluye la reconstrucción uint8
+
+        Yields:
+            El resultado de process_frame de cada fotograma
+        """
+        for frame in iter_frames(source):
+            yield self.process_frame(frame, reconstruct)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Estadísticas de la secuencia procesada.
+
+        Returns:
+            Diccionario con los fotogramas procesados, las SVD completas y
+            en caliente, fotogramas por segundo (contando la lectura de la
+            fuente entre fotogramas) y latencias por fotograma en ms
+        """
+        latencies = np.asarray(self._latencies, dtype=float)
+        frames = int(latencies.size)
+        return {
+            'frames': frames,
+            'full_svds': self._full,
+            'warm_starts': self._warm,
+            'fps': frames / self._elapsed if self._elapsed > 0 else 0.0,
+            'latency_mean_ms': float(latencies.mean()) if frames else 0.0,
+            'latency_p95_ms': float(np.percentile(latencies, 95)) if frames else 0.0,
+            'latency_max_ms': float(latencies.max()) if frames else 0.0,
+        }
@@ -0,0 +1,139 @@
+"""
+Fuentes de imagen mapeadas en memoria.
+
+Permiten abrir archivos .npy, volcados raw con cabecera de metadatos y
+TIFF sin comprimir sin decodificarlos: los píxeles se leen bajo demanda
+desde la caché de páginas del sistema operativo.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+import numpy as np
+from PIL import Image
+from typing import Optional
+
+
+RAW_EXTENSIONS = ('.raw', '.bin')
+
+# Modos de PIL que se pueden mapear directamente: (dtype, canales)
+_TIFF_MODES = {
+    'L': (np.uint8, 1),
+    'RGB': (np.uint8, 3),
+    'RGBA': (np.uint8, 4),
+    'I;16': (np.dtype('<u2'), 1),
+    'I;16B': (np.dtype('>u2'), 1),
+    'F': (np.dtype('<f4'), 1),
+}
+
+_PIXEL_LIMIT_LOCK = threading.Lock()
+
+
+@contextmanager
+def unlimited_pixels():
+    """
+    Desactiva el límite anti "decompression bomb" de PIL dentro del bloque.
+
+    Image.MAX_IMAGE_PIXELS es global del proceso; el cerrojo evita que dos
+    hilos (el de la interfaz y el de trabajo, o el servicio) se pisen al
+    guardarlo y restaurarlo. PIL solo lo consulta al abrir el archivo, así
+    que basta con envolver Image.open y el bloque debe ser corto. Quien lo
+    use debe comprobar el tamaño por su cuenta antes de decodificar.
+    """
+    with _PIXEL_LIMIT_LOCK:
+        max_pixels = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = None
+        try:
+            yield
+        finally:
+            Image.MAX_IMAGE_PIXELS = max_pixels
+
+
+def _raw_header_path(path: str) -> Optional[str]:
+    """Busca la cabecera JSON de un volcado raw (archivo.raw.json o archivo.json)."""
+    for candidate in (path + '.json', os.path.splitext(path)[0] + '.json'):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def open_raw(path: str, header_path: Optional[str] = None) -> np.memmap:
+    """
+    Mapea un volcado raw descrito por una cabecera JSON.
+
+    La cabecera contiene `shape` ([alto, ancho] o [alto, ancho, canales]),
+    `dtype` (por defecto "uint8") y opcionalmente `offset` en bytes.
+
+    Args:
+        path: Ruta del archivo raw
+        header_path: Ruta de la cabecera (por defecto se busca junto al archivo)
+
+    Returns:
+        Array mapeado en memoria de solo lectura
+    """
+    header_path = header_path or _raw_header_path(path)
+    if header_path is None:
+        raise ValueError(f"No se encontró la cabecera JSON de {path}")
+    with open(header_path, 'r', encoding='utf-8') as f:
+        header = json.load(f)
+    shape = tuple(int(v) for v in header['shape'])
+    if len(shape) not in (2, 3):
+        raise ValueError("La cabecera raw debe describir una imagen 2D o 3D")
+    return np.memmap(path, dtype=np.dtype(header.get('dtype', 'uint8')), mode='r',
+                     offset=int(header.get('offset', 0)), shape=shape)
+
+
+def open_uncompressed_tiff(path: str) -> Optional[np.memmap]:
+    """
+    Mapea un TIFF sin comprimir cuyas tiras son contiguas en el archivo.
+
+    Args:
+        path: Ruta del TIFF
+
+    Returns:
+        Array mapeado, o None si el archivo no se puede mapear directamente
+        (compresión, tiles, orientación o modo no soportados)
+    """
+    with unlimited_pixels(), Image.open(path) as img:
+        if img.format != 'TIFF' or img.mode not in _TIFF_MODES:
+            return None
+        width, height = img.size
+        tiles = sorted(img.tile, key=lambda t: t[2])
+        mode = img.mode
+
+    dtype, channels = _TIFF_MODES[mode]
+    dtype = np.dtype(dtype)
+    row_bytes = width * channels * dtype.itemsize
+    first_offset = tiles[0][2]
+    for codec, extents, offset, args in tiles:
+        rawmode, stride, orientation = (tuple(args) + (0, 1))[:3]
+        x0, y0, x1, _ = extents
+        if (codec != 'raw' or rawmode != mode or stride not in (0, row_bytes)
+                or orientation != 1 or x0 != 0 or x1 != width
+                or offset != first_offset + y0 * row_bytes):
+            return None
+
+    shape = (height, width) if channels == 1 else (height, width, channels)
+    return np.memmap(path, dtype=dtype, mode='r', offset=first_offset, shape=shape)
+
+
+def open_mapped_source(path: str) -> Optional[np.ndarray]:
+    """
+    Abre una imagen como array mapeado en memoria si el formato lo permite.
+
+    Args:
+        path: Ruta de la imagen
+
+    Returns:
+        Array de solo lectura (.npy, raw con cabecera o TIFF sin comprimir),
+        o None si hay que decodificar la imagen con PIL
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.npy':
+        return np.load(path, mmap_mode='r')
+    if ext in RAW_EXTENSIONS:
+        return open_raw(path)
+    if ext in ('.tif', '.tiff'):
+        return open_uncompressed_tiff(path)
+    return None
@@ -3,125 +3,807 @@ Módulo para aplicar SVD (Singular Value Decomposition) a imágenes.
 Permite comprimir imágenes manteniendo solo los valores singulares más importantes.
 """
 
+import logging
 import numpy as np
 from PIL import Image
-from typing import Tuple, List
-try:
-    from scipy.linalg import svd as scipy_svd
-except Exception:
-    scipy_svd = None
+from typing import Callable, Dict, Iterator, Tuple, List, Optional, Sequence, Union
+
+from .cache import FactorCache, FrameCache, hash_pixels
+from .color import COLOR_SPACES, LumaChromaReconstructor, chroma_shape, iter_planes, plane_weights
+from .container import encode_svdz, iter_svdz_progressive, svdz_size
+from .instrumentation import NULL_STAGE, Instrumentation
+from .rank_selection import select_rank, water_fill_ranks
+from .rate_distortion import clipping_correction, rate_distortion_curve
+from .factor_store import STORAGES, CompactFactors, factors_nbytes
+from .engines import (BACKENDS, ENGINES, batched_svd, choose_backend, full_svd, randomized_svd,
+                      singular_values)
+from .reconstruct import (BLOCK_BYTES, IncrementalReconstructor, box_downsample, preview_size,
+                          reconstruct_into, reconstruct_stacked_into)
+from .sources import open_mapped_source
+from .updates import append_columns, append_rows, orthogonality_error, region_update, reorthogonalize
+
+
+# Rango común o un rango por canal
+Ranks = Union[int, Sequence[int]]
+
+logger = logging.getLogger(__name__)
+
+
+class ComputationCancelled(Exception):
+    """La descomposición se canceló antes de terminar."""
 
 
 class SVDImageProcessor:
     """Clase para procesar imágenes con SVD."""
     
-    def __init__(self, image_path: str = None):
+    def __init__(self, image_path: str = None, engine: str = 'full',
+                 rank: Optional[int] = None, oversampling: int = 10,
+                 power_iterations: int = 2, random_state: Optional[int] = None,
+                 batched: bool = True, cache: Optional[FactorCache] = None,
+                 frame_cache_bytes: int = 64 * 1024 ** 2, backend: str = 'auto',
+                 dtype: str = 'float32', accumulate: str = 'float64',
+                 instrumentation: Optional[Instrumentation] = None,
+                 color_space: str = 'rgb', chroma_subsampling: int = 1,
+                 chroma_rank_fraction: float = 0.25, storage: str = 'float32',
+                 max_rank: Optional[int] = None, storage_block: int = 64,
+                 update_tolerance: float = 1e-4):
         """
         Inicializa el procesador de imágenes.
         
         Args:
             image_path: Ruta de la imagen a procesar
+            engine: Motor de descomposición ('full' o 'randomized')
+            rank: Número de componentes a calcular con el motor
+                'randomized' (por defecto 300)
+            oversampling: Columnas extra del bosquejo aleatorio
+            power_iterations: Iteraciones de potencia del motor aleatorizado
+            random_state: Semilla del motor aleatorizado
+            batched: Si es True, los canales se descomponen desde una pila
+                contigua (ver engines.batched_svd) y los factores se guardan
+                como arrays 3D contiguos (c, m, r), (c, r) y (c, r, n)
+            cache: Caché persistente de factores (opcional); si la imagen y
+                la configuración coinciden, compute_svd no recalcula la SVD
+            frame_cache_bytes: Presupuesto en bytes de la caché LRU de
+                imágenes reconstruidas (0 la desactiva)
+            backend: Rutina de la SVD completa ('gesdd', 'gesvd', 'numpy',
+                'qr', 'gram' o 'auto', que elige según la forma de la imagen;
+                ver engines.choose_backend)
+            dtype: Precisión de la descomposición y de los factores
+                ('float32' o 'float64')
+            accumulate: Precisión de la matriz de Gram del backend 'gram'
+                ('float64' o 'float32')
+            instrumentation: Medición opcional de tiempo y memoria por
+                etapa (decodificación, conversión, SVD, copias, energía y
+                núcleo de reconstrucción)
+            color_space: 'rgb' descompone R, G y B; 'ycbcr' o 'ycocg'
+                descomponen luminancia y crominancia (solo imágenes RGB)
+            chroma_subsampling: Factor de submuestreo de la crominancia en
+                cada eje (1 = resolución completa, 2 = 4:2:0)
+            chroma_rank_fraction: Con un k común, fracción de k que recibe
+                cada plano de crominancia (la luminancia recibe k)
+            storage: Almacenamiento de los factores en memoria tras
+                compute_svd: 'float32' (arrays de self.dtype), 'float16' o
+                'int8' con una escala por bloque (ver factor_store)
+            max_rank: Componentes que se conservan por canal tras compute_svd
+                (None = todos)
+            storage_block: Elementos de cada vector que comparten escala en int8
+            update_tolerance: Pérdida de ortogonalidad de U y V a partir de
+                la cual las actualizaciones incrementales reortogonalizan
+                los factores (ver append_rows, append_columns y update_region)
         """
+        if engine not in ENGINES:
+            raise ValueError(f"Motor desconocido: {engine}. Opciones: {', '.join(ENGINES)}")
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend desconocido: {backend}. Opciones: {', '.join(BACKENDS)}")
+        if dtype not in ('float32', 'float64'):
+            raise ValueError(f"Tipo no soportado: {dtype}. Opciones: float32, float64")
+        if accumulate not in ('float32', 'float64'):
+            raise ValueError(f"Acumulación no soportada: {accumulate}. Opciones: float32, float64")
+        if color_space not in COLOR_SPACES:
+            raise ValueError(f"Espacio de color desconocido: {color_space}. Opciones: {', '.join(COLOR_SPACES)}")
+        if storage not in STORAGES:
+            raise ValueError(f"Almacenamiento desconocido: {storage}. Opciones: {', '.join(STORAGES)}")
+        if int(chroma_subsampling) < 1:
+            raise ValueError("chroma_subsampling debe ser 1 o mayor")
         self.image_path = image_path
         self.original_image = None
         self.image_array = None
         self.svd_components = None
+        self._incremental = None
+        self._preview = None
+        self.engine = engine
+        self.rank = rank
+        self.oversampling = oversampling
+        self.power_iterations = power_iterations
+        self.random_state = random_state
+        self.batched = batched
+        self.backend = backend
+        self.accumulate = accumulate
+        self.svd_backend = None
+        self.dtype = np.dtype(dtype)
+        self.color_space = color_space
+        self.chroma_subsampling = int(chroma_subsampling)
+        self.chroma_rank_fraction = chroma_rank_fraction
+        self.storage = storage
+        self.max_rank = max_rank
+        self.storage_block = storage_block
+        self.update_tolerance = update_tolerance
+        self._updates = 0
+        self.cache = cache
+        self.instrumentation = instrumentation
+        self.frame_cache = FrameCache(frame_cache_bytes)
         
         if image_path:
             self.load_image(image_path)
     
+    @property
+    def original_image(self) -> Optional[Image.Image]:
+        """Imagen PIL original; para fuentes mapeadas se crea al pedirla."""
+        if self._original_image is None and self.image_array is not None:
+            self._original_image = Image.fromarray(np.asarray(self.image_array))
+        return self._original_image
+
+    @original_image.setter
+    def original_image(self, image: Optional[Image.Image]) -> None:
+        self._original_image = image
+
     def load_image(self, image_path: str) -> None:
         """
         Carga una imagen desde un archivo.
         
+        Los archivos .npy, los volcados raw con cabecera JSON y los TIFF sin
+        comprimir se mapean en memoria en lugar de decodificarse.
+        
         Args:
             image_path: Ruta de la imagen
         """
         self.image_path = image_path
-        self.original_image = Image.open(image_path)
-        self.image_array = np.array(self.original_image)
+        with self._stage('load_image'):
+            mapped = open_mapped_source(image_path)
+            if mapped is not None:
+                self.original_image = None
+                self.image_array = mapped
+            else:
+                self.original_image = Image.open(image_path)
+                self.image_array = np.array(self.original_image)
+        self.svd_components = None
+        self._incremental = None
+        self._preview = None
+        self.frame_cache.clear()
+
+    def _stage(self, name: str, channel: Optional[int] = None, **meta):
+        """Contexto de medición de una etapa (nulo sin instrumentación)."""
+        if self.instrumentation is None:
+            return NULL_STAGE
+        return self.instrumentation.stage(name, channel, **meta)
+
+    def _luma_chroma(self) -> bool:
+        """Indica si los factores son de luminancia y crominancia en lugar de RGB."""
+        return (self.color_space != 'rgb' and self.image_array is not None
+                and self.image_array.ndim == 3 and self.image_array.shape[2] == 3)
+
+    def _plane_shapes(self) -> List[Tuple[int, int]]:
+        """Forma de la matriz que se descompone en cada canal."""
+        shape = self.image_array.shape
+        if self._luma_chroma():
+            chroma = chroma_shape(shape[0], shape[1], self.chroma_subsampling)
+            return [shape[:2], chroma, chroma]
+        return [shape[:2]] * (1 if len(shape) == 2 else shape[2])
+
+    def _require_rgb(self, feature: str) -> None:
+        """Rechaza operaciones que suponen factores RGB del mismo tamaño."""
+        if self._luma_chroma():
+            raise ValueError(f"{feature} no está disponible con color_space='{self.color_space}'")
+
+    def _is_mapped(self) -> bool:
+        """Indica si la imagen se lee desde un archivo mapeado en memoria."""
+        return isinstance(self.image_array, np.memmap)
     
-    def compute_svd(self) -> Tuple[List, List, List]:
+    def compute_svd(self, progress: Optional[Callable[[int, int], None]] = None,
+                    cancel_event=None) -> Tuple[List, List, List]:
         """
         Calcula la descomposición SVD para cada canal de color.
         
+        Con `progress` o `cancel_event` los canales se descomponen de uno en
+        uno para poder informar del avance y detenerse entre canales.
+        
+        Args:
+            progress: Función llamada con (canales terminados, total)
+            cancel_event: Objeto con is_set() (p. ej. threading.Event); si se
+                activa se lanza ComputationCancelled
+        
         Returns:
-            Tupla con listas de U, S, VT para cada canal
+            Tupla con U, S, VT para cada canal (arrays apilados por canal
+            si batched=True, listas en caso contrario; CompactFactors si
+            storage o max_rank piden un almacén compacto)
         """
         if self.image_array is None:
             raise ValueError("No hay imagen cargada. Use load_image() primero.")
         
-        # Si la imagen es en escala de grises
-        img_arr = self.image_array.astype(np.float32, copy=False)
+        with self._stage('compute_svd'):
+            self._compute_svd(progress, cancel_event)
+        if self.storage != 'float32' or self.max_rank is not None:
+            with self._stage('compact'):
+                self._compact()
+        return self.svd_components
+
+    def _compact(self) -> None:
+        """Sustituye los factores por un almacén truncado y cuantizado."""
+        self.svd_components = CompactFactors(self.svd_components, self.storage, self.max_rank,
+                                             self.storage_block)
+        if self.max_rank is not None:
+            # La energía total no cambia: lo descartado cuenta como error
+            if isinstance(self._energy_cumsums, np.ndarray):
+                self._energy_cumsums = self._energy_cumsums[:, :self.max_rank]
+            else:
+                self._energy_cumsums = [csum[:self.max_rank] for csum in self._energy_cumsums]
+
+    def _compute_svd(self, progress, cancel_event):
+        """Cuerpo de compute_svd (medido como una sola etapa)."""
+        n_channels = 1 if self.image_array.ndim == 2 else self.image_array.shape[2]
+
+        def _check_cancelled():
+            if cancel_event is not None and cancel_event.is_set():
+                raise ComputationCancelled()
+        
+        _check_cancelled()
+        self._incremental = None
+        self._preview = None
+        self._updates = 0
+        self.frame_cache.clear()
+        self.svd_backend = self._resolve_backend() if self.engine == 'full' else None
+        cache_key = None
+        if self.cache is not None:
+            with self._stage('cache_load'):
+                cache_key = hash_pixels(self.image_array, self._cache_settings())
+                entry = self.cache.load(cache_key)
+            if entry is not None:
+                self.svd_components = entry['components']
+                self._energy_totals = entry['energy_totals']
+                self._energy_cumsums = entry['energy_cumsums']
+                if progress is not None:
+                    progress(n_channels, n_channels)
+                return self.svd_components
+        
+        if self.svd_backend is not None:
+            m, n = self._plane_shapes()[0]
+            logger.info("SVD de %dx%d (%d canales) con backend %s", m, n, n_channels, self.svd_backend)
 
-        def _svd(mat):
-            if scipy_svd is not None:
-                return scipy_svd(mat, full_matrices=False, lapack_driver='gesdd')
-            return np.linalg.svd(mat, full_matrices=False)
+        # Con SVD truncada la energía total es la norma de Frobenius de la
+        # imagen, no la suma de los valores singulares calculados
+        truncated = self.engine != 'full'
+        totals = []
 
-        if len(img_arr.shape) == 2:
-            U, s, VT = _svd(img_arr)
-            U, s, VT = U.astype(np.float32, copy=False), s.astype(np.float32, copy=False), VT.astype(np.float32, copy=False)
-            self.svd_components = ([U], [s], [VT])
+        stepwise = progress is not None or cancel_event is not None
+        if self.batched and not self._is_mapped() and not stepwise and not self._luma_chroma():
+            # Una sola transposición a una pila contigua (c, m, n) en self.dtype
+            with self._stage('cast'):
+                if self.image_array.ndim == 2:
+                    stack = self.image_array.astype(self.dtype)[np.newaxis]
+                else:
+                    stack = np.ascontiguousarray(np.moveaxis(self.image_array, -1, 0), dtype=self.dtype)
+                if truncated:
+                    totals = [float(np.einsum('ij,ij->', ch, ch, dtype=np.float64)) for ch in stack]
+            with self._stage('svd', backend=self.svd_backend or self.engine):
+                U, s, VT = self._svd(stack)
+            del stack
+            with self._stage('astype'):
+                self.svd_components = (
+                    np.ascontiguousarray(U, dtype=self.dtype),
+                    np.ascontiguousarray(s, dtype=self.dtype),
+                    np.ascontiguousarray(VT, dtype=self.dtype),
+                )
         else:
-            # Imagen RGB
+            # Canal a canal: la conversión a self.dtype nunca abarca la imagen
+            # completa (importante con fuentes mapeadas) y se puede informar
+            # del progreso o cancelar entre canales
             U_channels = []
             s_channels = []
             VT_channels = []
-            for i in range(img_arr.shape[2]):
-                U, s, VT = _svd(img_arr[:, :, i])
-                U_channels.append(U.astype(np.float32, copy=False))
-                s_channels.append(s.astype(np.float32, copy=False))
-                VT_channels.append(VT.astype(np.float32, copy=False))
-            self.svd_components = (U_channels, s_channels, VT_channels)
+            for i, ch in enumerate(self._iter_channels(self.image_array)):
+                _check_cancelled()
+                if truncated:
+                    totals.append(float(np.einsum('ij,ij->', ch, ch, dtype=np.float64)))
+                with self._stage('svd', i, backend=self.svd_backend or self.engine):
+                    U, s, VT = self._svd(ch[np.newaxis] if self.batched else ch)
+                with self._stage('astype', i):
+                    U_channels.append(U.astype(self.dtype, copy=False))
+                    s_channels.append(s.astype(self.dtype, copy=False))
+                    VT_channels.append(VT.astype(self.dtype, copy=False))
+                del ch
+                if progress is not None:
+                    progress(i + 1, n_channels)
+            if self.batched and len(set(self._plane_shapes())) == 1:
+                with self._stage('astype'):
+                    self.svd_components = (np.concatenate(U_channels), np.concatenate(s_channels),
+                                           np.concatenate(VT_channels))
+            elif self.batched:
+                # Planos de distinto tamaño (crominancia submuestreada): listas
+                self.svd_components = ([U[0] for U in U_channels], [s[0] for s in s_channels],
+                                       [VT[0] for VT in VT_channels])
+            else:
+                self.svd_components = (U_channels, s_channels, VT_channels)
         
         # Precomputo de energia para consultas rapidas
         s_channels = self.svd_components[1]
-        self._energy_totals = [float(np.sum(sc ** 2)) for sc in s_channels]
-        self._energy_cumsums = [np.cumsum(sc ** 2) for sc in s_channels]
+        with self._stage('energy'):
+            # Acumulado en float64; con SVD completa el total es el último
+            # acumulado, así que k = max_k da exactamente el 100%
+            if isinstance(s_channels, np.ndarray):
+                self._energy_cumsums = np.cumsum(np.square(s_channels, dtype=np.float64), axis=-1)
+            else:
+                self._energy_cumsums = [np.cumsum(np.square(sc, dtype=np.float64)) for sc in s_channels]
+            if truncated:
+                self._energy_totals = totals
+            else:
+                self._energy_totals = [float(csum[-1]) if len(csum) else 0.0
+                                       for csum in self._energy_cumsums]
+
+        if cache_key is not None:
+            with self._stage('cache_store'):
+                self.cache.store(cache_key, self.svd_components, self._energy_totals, self._energy_cumsums)
 
         return self.svd_components
+
+    def _cache_settings(self) -> Dict:
+        """Configuración que determina los factores (forma parte de la clave de caché)."""
+        settings = {'engine': self.engine, 'dtype': self.dtype.name, 'batched': self.batched}
+        if self.engine == 'randomized':
+            settings.update(rank=self.rank, oversampling=self.oversampling,
+                            power_iterations=self.power_iterations,
+                            random_state=self.random_state)
+        elif self._resolve_backend() != 'gesdd':
+            # gesdd no se incluye para conservar las claves ya guardadas
+            settings['backend'] = self._resolve_backend()
+            if settings['backend'] == 'gram':
+                settings['accumulate'] = self.accumulate
+        if self._luma_chroma():
+            settings.update(color_space=self.color_space, chroma_subsampling=self.chroma_subsampling)
+        return settings
     
-    def reconstruct_image(self, k: int) -> np.ndarray:
+    def _svd(self, mat: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Descompone una matriz o una pila (c, m, n) con el motor configurado.
+
+        Las pilas se consideran copias privadas: LAPACK puede sobrescribirlas.
+        """
+        if self.engine == 'randomized':
+            rank = self.rank if self.rank is not None else 300
+            return randomized_svd(mat, rank, self.oversampling,
+                                  self.power_iterations, self.random_state)
+        # Sin backend resuelto (p. ej. por tiles) 'auto' se resuelve por matriz
+        backend = self.svd_backend or self.backend
+        if mat.ndim == 3:
+            return batched_svd(mat, overwrite=True, backend=backend, accumulate=self.accumulate)
+        return full_svd(mat, backend, self.accumulate)
+
+    def _resolve_backend(self) -> str:
+        """Backend de la SVD completa para la imagen actual ('auto' se resuelve por su forma)."""
+        if self.backend != 'auto':
+            return self.backend
+        return choose_backend(*self._plane_shapes()[0])
+
+    def _iter_channels(self, img_arr: np.ndarray):
+        """Itera los canales de la imagen (o sus planos de luminancia y crominancia) en self.dtype."""
+        if self._luma_chroma():
+            planes = iter_planes(img_arr, self.color_space, self.chroma_subsampling, self.dtype)
+            for i in range(3):
+                with self._stage('cast', i):
+                    ch = next(planes)
+                yield ch
+        elif img_arr.ndim == 2:
+            with self._stage('cast', 0):
+                ch = img_arr.astype(self.dtype)
+            yield ch
+        else:
+            for i in range(img_arr.shape[2]):
+                with self._stage('cast', i):
+                    ch = img_arr[:, :, i].astype(self.dtype)
+                yield ch
+
+    def get_engine_accuracy(self) -> List[Dict[str, float]]:
+        """
+        Compara la descomposición calculada con la SVD completa.
+
+        Calcula los valores singulares exactos de cada canal, por lo que es
+        una operación de diagnóstico y no debe usarse en caminos rápidos.
+
+        Returns:
+            Lista con un diccionario por canal:
+            - rank: componentes calculados
+            - residual_error: error de Frobenius relativo de la aproximación
+            - optimal_error: error relativo de la SVD truncada exacta del mismo rango
+            - excess_error: residual_error / optimal_error - 1
+            - max_singular_value_error: error máximo de los valores singulares,
+              relativo al mayor de ellos
+        """
+        if self.svd_components is None:
+            self.compute_svd()
+
+        _, s_channels, _ = self.svd_components
+        report = []
+        for ch, s, total in zip(self._iter_channels(self.image_array), s_channels, self._energy_totals):
+            s = np.asarray(s, dtype=np.float64)
+            s_exact = singular_values(ch).astype(np.float64)
+            r = len(s)
+            norm = np.sqrt(total) if total > 0 else 1.0
+            # Con factores ortonormales ||A - U S VT||^2 = ||A||^2 - sum(s^2)
+            residual = np.sqrt(max(total - float(np.sum(s ** 2)), 0.0)) / norm
+            optimal = np.sqrt(float(np.sum(s_exact[r:] ** 2))) / norm
+            excess = residual / optimal - 1.0 if optimal > 0 else 0.0
+            sv_error = float(np.max(np.abs(s - s_exact[:r])) / s_exact[0]) if r and s_exact[0] > 0 else 0.0
+            report.append({
+                'rank': r,
+                'residual_error': float(residual),
+                'optimal_error': float(optimal),
+                'excess_error': float(max(excess, 0.0)),
+                'max_singular_value_error': sv_error,
+            })
+        return report
+
+    def append_rows(self, rows: np.ndarray) -> Dict:
+        """
+        Añade filas debajo de la imagen y actualiza los factores sin recalcular la SVD.
+
+        Args:
+            rows: Filas nuevas (c, ancho) o (c, ancho, canales)
+
+        Returns:
+            Informe de la actualización (ver _update)
+        """
+        return self._update('rows', rows)
+
+    def append_columns(self, columns: np.ndarray) -> Dict:
+        """
+        Añade columnas a la derecha de la imagen y actualiza los factores.
+
+        Args:
+            columns: Columnas nuevas (alto, c) o (alto, c, canales)
+
+        Returns:
+            Informe de la actualización (ver _update)
+        """
+        return self._update('columns', columns)
+
+    def update_region(self, row: int, col: int, patch: np.ndarray) -> Dict:
+        """
+        Sustituye una región rectangular de la imagen y actualiza los factores.
+
+        Args:
+            row: Primera fila de la región
+            col: Primera columna de la región
+            patch: Píxeles nuevos (alto, ancho) o (alto, ancho, canales)
+
+        Returns:
+            Informe de la actualización (ver _update)
+        """
+        return self._update('region', patch, row, col)
+
+    def _update(self, kind: str, pixels: np.ndarray, row: int = 0, col: int = 0) -> Dict:
+        """
+        Actualización de Brand de los factores (ver updates).
+
+        Con el motor completo se conservan todos los componentes (añadir
+        filas o columnas puede aumentar el rango); con el aleatorizado el
+        rango no cambia. La energía total se actualiza con las normas de los
+        píxeles añadidos o sustituidos, sin recorrer la imagen.
+
+        Returns:
+            Diccionario con la nueva forma, el rango, la pérdida de
+            ortogonalidad máxima antes de corregirla, si se reortogonalizó y
+            el número de actualizaciones desde la última compute_svd
+        """
+        self._require_rgb("La actualización incremental")
+        if self.svd_components is None:
+            self.compute_svd()
+        if isinstance(self.svd_components, CompactFactors):
+            raise ValueError("Los factores compactos no se pueden actualizar (storage='float32' sin max_rank)")
+
+        image = self.image_array
+        pixels = np.asarray(pixels)
+        m, n = image.shape[:2]
+        if kind == 'rows':
+            expected, where = (pixels.shape[0], n), 'filas'
+        elif kind == 'columns':
+            expected, where = (m, pixels.shape[1] if pixels.ndim > 1 else 0), 'columnas'
+        else:
+            expected, where = pixels.shape[:2], 'región'
+        if pixels.shape != expected + image.shape[2:] or 0 in expected:
+            raise ValueError(f"Forma de {where} no válida: {pixels.shape}; la imagen es {image.shape}")
+        if kind == 'region' and not (0 <= row and 0 <= col and row + expected[0] <= m
+                                     and col + expected[1] <= n):
+            raise ValueError(f"La región {expected} en ({row}, {col}) se sale de la imagen {image.shape}")
+        pixels = pixels.astype(image.dtype, copy=False)
+
+        def planes(arr):
+            arr = arr.astype(self.dtype)
+            return arr[np.newaxis] if arr.ndim == 2 else np.moveaxis(arr, -1, 0)
+
+        truncated = self.engine != 'full'
+        U_channels, s_channels, VT_channels = self.svd_components
+        rank = len(s_channels[0]) if truncated or kind == 'region' else None
+
+        def update(U, s, VT, plane):
+            if kind == 'rows':
+                return append_rows(U, s, VT, plane, rank)
+            if kind == 'columns':
+                return append_columns(U, s, VT, plane, rank)
+            return region_update(U, s, VT, row, col, plane, rank)
+
+        new = planes(pixels)
+        added = np.einsum('cij,cij->c', new, new, dtype=np.float64)
+        if kind in ('rows', 'columns'):
+            axis = 0 if kind == 'rows' else 1
+            self.image_array = np.concatenate([image, pixels], axis=axis)
+        else:
+            old = planes(image[row:row + expected[0], col:col + expected[1]])
+            added -= np.einsum('cij,cij->c', old, old, dtype=np.float64)
+            new -= old
+            if self._is_mapped() or not image.flags.writeable:
+                # Las fuentes mapeadas son de solo lectura: se edita una copia
+                image = np.array(image)
+            image[row:row + expected[0], col:col + expected[1]] = pixels
+            self.image_array = image
+
+        if isinstance(U_channels, np.ndarray):
+            U, s, VT = update(U_channels, s_channels, VT_channels, new)
+            error = float(np.max(orthogonality_error(U, s, VT)))
+            reorthogonalize_now = error > self.update_tolerance
+            if reorthogonalize_now:
+                U, s, VT = reorthogonalize(U, s, VT)
+            self.svd_components = (U, s, VT)
+        else:
+            factors = [update(U, s, VT, p) for U, s, VT, p in zip(U_channels, s_channels, VT_channels, new)]
+            error = max(float(orthogonality_error(*f)) for f in factors)
+            reorthogonalize_now = error > self.update_tolerance
+            if reorthogonalize_now:
+                factors = [reorthogonalize(*f) for f in factors]
+            self.svd_components = tuple(list(part) for part in zip(*factors))
+
+        s_channels = self.svd_components[1]
+        with self._stage('energy'):
+            if isinstance(s_channels, np.ndarray):
+                self._energy_cumsums = np.cumsum(np.square(s_channels, dtype=np.float64), axis=-1)
+            else:
+                self._energy_cumsums = [np.cumsum(np.square(sc, dtype=np.float64)) for sc in s_channels]
+            if truncated:
+                self._energy_totals = [float(total + extra) for total, extra in zip(self._energy_totals, added)]
+            else:
+                self._energy_totals = [float(csum[-1]) if len(csum) else 0.0
+                                       for csum in self._energy_cumsums]
+
+        self.original_image = None
+        self._incremental = None
+        self._preview = None
+        self.frame_cache.clear()
+        self._updates += 1
+        logger.info("Actualización incremental (%s): ortogonalidad %.2e%s", kind, error,
+                    ", reortogonalizado" if reorthogonalize_now else "")
+        return {
+            'shape': self.image_array.shape,
+            'rank': len(s_channels[0]),
+            'orthogonality_error': error,
+            'reorthogonalized': reorthogonalize_now,
+            'updates': self._updates,
+        }
+
+    def get_update_drift(self) -> List[Dict[str, float]]:
+        """
+        Compara los factores actualizados con una descomposición nueva.
+
+        Mide el error real de la reconstrucción por bloques de filas y
+        calcula los valores singulares exactos de la imagen actual, así que
+        es una operación de diagnóstico.
+
+        Returns:
+            Lista con un diccionario por canal:
+            - rank: componentes de los factores
+            - updates: actualizaciones desde la última compute_svd
+            - orthogonality_error: max |UᵀU - I| y |VTVTᵀ - I|
+            - residual_error: ||A - U S VT|| / ||A|| medido
+            - optimal_error: error relativo de la SVD truncada exacta del mismo rango
+            - drift: residual_error - optimal_error
+            - max_singular_value_error: error máximo de los valores
+              singulares, relativo al mayor de ellos
+        """
+        self._require_rgb("get_update_drift")
+        if self.svd_components is None:
+            self.compute_svd()
+
+        report = []
+        for ch, U, s, VT in zip(self._iter_channels(self.image_array), *self.svd_components):
+            U, s, VT = np.asarray(U), np.asarray(s), np.asarray(VT)
+            m, n = ch.shape
+            rows = max(1, BLOCK_BYTES // (4 * n))
+            residual = 0.0
+            for start in range(0, m, rows):
+                diff = ch[start:start + rows] - (U[start:start + rows] * s) @ VT
+                residual += float(np.einsum('ij,ij->', diff, diff, dtype=np.float64))
+            total = float(np.einsum('ij,ij->', ch, ch, dtype=np.float64))
+            norm = np.sqrt(total) if total > 0 else 1.0
+            orthogonality = float(orthogonality_error(U, s, VT))
+            s = s.astype(np.float64)
+            s_exact = singular_values(ch).astype(np.float64)
+            r = len(s)
+            residual_error = np.sqrt(residual) / norm
+            optimal = np.sqrt(float(np.sum(s_exact[r:] ** 2))) / norm
+            report.append({
+                'rank': r,
+                'updates': self._updates,
+                'orthogonality_error': orthogonality,
+                'residual_error': float(residual_error),
+                'optimal_error': float(optimal),
+                'drift': float(max(residual_error - optimal, 0.0)),
+                'max_singular_value_error': float(np.max(np.abs(s - s_exact[:r])) / s_exact[0])
+                if r and s_exact[0] > 0 else 0.0,
+            })
+        return report
+
+    def _requested_ranks(self, k: Ranks) -> List[int]:
+        """Rango pedido para cada canal; un k común se reparte según el espacio de color."""
+        channels = len(self._plane_shapes())
+        if not np.isscalar(k):
+            if len(k) != channels:
+                raise ValueError(f"Se necesitan {channels} rangos, uno por canal")
+            return [int(r) for r in k]
+        k = int(k)
+        if self._luma_chroma() and k > 0:
+            chroma = max(1, int(np.ceil(k * self.chroma_rank_fraction)))
+            return [k, chroma, chroma]
+        return [k] * channels
+
+    def _frame_ranks(self, k: Ranks) -> Tuple[int, ...]:
+        """Rango efectivo de cada canal para k (parte de la clave de la caché de imágenes)."""
+        s_channels = self.svd_components[1]
+        return tuple(min(max(r, 0), len(s)) for r, s in zip(self._requested_ranks(k), s_channels))
+
+    def _make_reconstructor(self, components, shape):
+        """Reconstructor de vista previa o incremental adecuado al espacio de color."""
+        if self._luma_chroma():
+            return LumaChromaReconstructor(components, shape, self.color_space, self.chroma_subsampling)
+        return IncrementalReconstructor(components, shape)
+
+    def get_frame_cache_stats(self) -> Dict:
+        """
+        Obtiene los contadores de la caché de imágenes reconstruidas.
+        
+        Returns:
+            Diccionario con aciertos, fallos, expulsiones, entradas y bytes
+        """
+        return self.frame_cache.stats()
+
+    def reconstruct_image(self, k: Ranks, out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Reconstruye la imagen usando solo los primeros k valores singulares.
         
+        Sin `out` el resultado es siempre de solo lectura, quepa o no en la
+        caché de imágenes (puede ser la copia compartida de la caché); para
+        modificarlo use .copy() o pase `out`. Con `out` se escribe
+        directamente en ese buffer, que sigue siendo modificable, sin pasar
+        por la caché (útil para reutilizar memoria en bucles o servicios).
+        
         Args:
-            k: Número de valores singulares a usar
+            k: Número de valores singulares a usar (común o uno por canal)
+            out: Buffer uint8 preasignado con la forma de la imagen (opcional)
             
         Returns:
-            Array NumPy con la imagen reconstruida
+            Array NumPy con la imagen reconstruida (`out` si se indicó)
         """
         if self.svd_components is None:
             self.compute_svd()
         
+        if out is not None:
+            if out.shape != self.image_array.shape or out.dtype != np.uint8:
+                raise ValueError(f"El buffer debe ser uint8 con forma {self.image_array.shape}")
+            with self._stage('reconstruct_image'):
+                return self._reconstruct(k, out)
+        key = ('full', self.image_array.shape[:2], self._frame_ranks(k))
+        frame = self.frame_cache.get(key)
+        if frame is None:
+            with self._stage('reconstruct_image'):
+                frame = self.frame_cache.put(key, self._reconstruct(k))
+        return frame
+
+    def _reconstruct(self, k: Ranks, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Reconstrucción completa sin caché.
+        
+        Núcleo fusionado: cada bloque de filas se multiplica, se recorta y
+        se convierte a uint8 al escribirlo en la salida, sin temporales
+        float del tamaño de la imagen.
+        """
         U_channels, s_channels, VT_channels = self.svd_components
+        ranks = self._frame_ranks(k)
+        if out is None:
+            out = np.empty(self.image_array.shape, dtype=np.uint8)
         
-        if len(U_channels) == 1:
-            # Imagen en escala de grises
-            U, s, VT = U_channels[0], s_channels[0], VT_channels[0]
-            k = min(k, len(s))
-            reconstructed = (U[:, :k] * s[:k]) @ VT[:k, :]
-            reconstructed = np.clip(reconstructed, 0, 255).astype(np.uint8)
-        else:
-            # Imagen RGB
-            reconstructed = np.zeros_like(self.image_array)
-            for i in range(len(U_channels)):
-                U, s, VT = U_channels[i], s_channels[i], VT_channels[i]
-                k_channel = min(k, len(s))
-                channel_reconstructed = (U[:, :k_channel] * s[:k_channel]) @ VT[:k_channel, :]
-                reconstructed[:, :, i] = np.clip(channel_reconstructed, 0, 255)
+        with self._stage('kernel'):
+            if self._luma_chroma():
+                # Planos, ampliación de la crominancia y vuelta a RGB en una pasada
+                return LumaChromaReconstructor(self.svd_components, self.image_array.shape,
+                                               self.color_space, self.chroma_subsampling).reconstruct(ranks, out)
+            if isinstance(U_channels, np.ndarray):
+                # Factores apilados: una matmul por lotes de todos los canales por bloque
+                return reconstruct_stacked_into(U_channels, s_channels, VT_channels, ranks, out)
+            for i, r in enumerate(ranks):
+                target = out if out.ndim == 2 else out[:, :, i]
+                reconstruct_into(U_channels[i][:, :r], s_channels[i][:r], VT_channels[i][:r, :], target)
+        return out
+    
+    def reconstruct_incremental(self, k: Ranks) -> np.ndarray:
+        """
+        Reconstruye la imagen reutilizando la reconstrucción anterior.
+        
+        Pensado para movimientos del slider: pasar de k1 a k2 cuesta
+        O(|k2 - k1|·m·n) en lugar de O(k2·m·n). Con luminancia y crominancia
+        cada llamada reconstruye de nuevo (la vuelta a RGB no es separable
+        por canal).
+        
+        Args:
+            k: Número de valores singulares a usar (común o uno por canal)
             
-            reconstructed = reconstructed.astype(np.uint8)
+        Returns:
+            Array NumPy con la imagen reconstruida
+        """
+        if self.svd_components is None:
+            self.compute_svd()
         
-        return reconstructed
+        if self._incremental is None:
+            self._incremental = self._make_reconstructor(self.svd_components, self.image_array.shape)
+        return self._incremental.reconstruct(self._frame_ranks(k))
     
-    def get_compression_ratio(self, k: int) -> float:
+    def reconstruct_preview(self, k: Ranks, max_width: int = 400, max_height: int = 400) -> np.ndarray:
+        """
+        Reconstruye una vista previa a resolución de pantalla.
+        
+        Las filas de U y las columnas de VT se promedian por bloques hasta el
+        tamaño de destino antes de multiplicar, así que el coste depende de
+        los píxeles mostrados y no de los de la imagen original. Las
+        reconstrucciones sucesivas reutilizan la anterior (ver
+        reconstruct_incremental).
+        
+        Args:
+            k: Número de valores singulares a usar (común o uno por canal)
+            max_width: Ancho máximo de la vista previa
+            max_height: Alto máximo de la vista previa
+            
+        Returns:
+            Array NumPy uint8 de solo lectura con la vista previa (como en
+            reconstruct_image)
+        """
+        if self.svd_components is None:
+            self.compute_svd()
+        
+        shape = self.image_array.shape
+        height, width = preview_size(shape[0], shape[1], max_width, max_height)
+        key = ('preview', (height, width), self._frame_ranks(k))
+        frame = self.frame_cache.get(key)
+        if frame is not None:
+            return frame
+        if self._preview is None or self._preview[0] != (height, width):
+            with self._stage('preview_downsample'):
+                U_channels, s_channels, VT_channels = self.svd_components
+                if isinstance(U_channels, np.ndarray):
+                    components = (box_downsample(U_channels, height, axis=1), s_channels,
+                                  box_downsample(VT_channels, width, axis=2))
+                else:
+                    # La crominancia submuestreada se reduce en la misma proporción
+                    sizes = [(height, width)] + [chroma_shape(height, width, self.chroma_subsampling)] * 2 \
+                        if self._luma_chroma() else [(height, width)] * len(U_channels)
+                    components = ([box_downsample(U, rows, axis=0) for U, (rows, _) in zip(U_channels, sizes)],
+                                  s_channels,
+                                  [box_downsample(VT, cols, axis=1) for VT, (_, cols) in zip(VT_channels, sizes)])
+                self._preview = ((height, width),
+                                 self._make_reconstructor(components, (height, width) + shape[2:]))
+        with self._stage('preview'):
+            return self.frame_cache.put(key, self._preview[1].reconstruct(self._frame_ranks(k)))
+    
+    def get_compression_ratio(self, k: Ranks) -> float:
         """
         Calcula el ratio de compresión.
         
         Args:
-            k: Número de valores singulares usados
+            k: Número de valores singulares usados (común o uno por canal)
             
         Returns:
             Ratio de compresión (original/comprimido)
@@ -129,24 +811,134 @@ class SVDImageProcessor:
         if self.image_array is None:
             return 0.0
         
-        if len(self.image_array.shape) == 2:
-            m, n = self.image_array.shape
-            original_size = m * n
-            compressed_size = k * (m + n + 1)
-            channels = 1
-        else:
-            m, n, channels = self.image_array.shape
-            original_size = m * n * channels
-            compressed_size = channels * k * (m + n + 1)
+        original_size = self.image_array.size
+        # Cada componente guarda una columna de U, un valor singular y una fila de VT
+        compressed_size = sum(r * (m + n + 1) for r, (m, n)
+                              in zip(self._requested_ranks(k), self._plane_shapes()))
         
         return original_size / compressed_size
     
-    def get_energy_retained(self, k: int) -> float:
+    def encode_compressed(self, k: Ranks, quantization: str = 'int8', codec: str = 'zlib',
+                          progressive: bool = False) -> bytes:
+        """
+        Codifica los k primeros componentes en el formato .svdz.
+        
+        Args:
+            k: Número de valores singulares a guardar (común o uno por canal)
+            quantization: 'float32', 'float16' o 'int8'
+            codec: Compresión sin pérdida ('none', 'zlib' o 'lzma')
+            progressive: Ordenar los componentes por valor singular en
+                paquetes decodificables al llegar (ver iter_progressive)
+            
+        Returns:
+            Bytes del contenedor
+        """
+        self._require_rgb("El contenedor .svdz")
+        if self.svd_components is None:
+            self.compute_svd()
+        
+        return encode_svdz(self.svd_components, self.image_array.shape, k, quantization, codec,
+                           progressive)
+    
+    def iter_progressive(self, k: Ranks, quantization: str = 'int8', codec: str = 'zlib',
+                         batch_size: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Genera un .svdz progresivo por trozos, para enviarlo en streaming.
+        
+        Tras la cabecera, cada trozo lleva `batch_size` componentes de rango 1
+        en orden decreciente de valor singular, así que el receptor (ver
+        container.ProgressiveDecoder) muestra una primera imagen con los
+        primeros componentes sin esperar al resto.
+        
+        Args:
+            k: Número de valores singulares a enviar (común o uno por canal)
+            quantization: 'float32', 'float16' o 'int8'
+            codec: Compresión sin pérdida de cada paquete
+            batch_size: Componentes por paquete (por defecto uno por canal;
+                como mucho container.MAX_PACKET_COMPONENTS)
+            
+        Yields:
+            Bytes de la cabecera y de cada paquete
+        """
+        self._require_rgb("El contenedor .svdz")
+        if self.svd_components is None:
+            self.compute_svd()
+        
+        yield from iter_svdz_progressive(self.svd_components, self.image_array.shape, k,
+                                         quantization, codec, batch_size)
+    
+    def save_compressed(self, file_path: str, k: Ranks, quantization: str = 'int8',
+                        codec: str = 'zlib', progressive: bool = False) -> int:
+        """
+        Guarda la representación de rango k en un archivo .svdz.
+        
+        Args:
+            file_path: Ruta de salida
+            k: Número de valores singulares a guardar (común o uno por canal)
+            quantization: 'float32', 'float16' o 'int8'
+            codec: Compresión sin pérdida ('none', 'zlib' o 'lzma')
+            progressive: Guardar con la disposición progresiva
+            
+        Returns:
+            Bytes escritos
+        """
+        data = self.encode_compressed(k, quantization, codec, progressive)
+        with open(file_path, 'wb') as f:
+            f.write(data)
+        return len(data)
+    
+    def get_measured_compression_ratio(self, k: Ranks, quantization: str = 'int8',
+                                       codec: str = 'zlib') -> float:
+        """
+        Calcula el ratio de compresión real del contenedor .svdz.
+        
+        A diferencia de get_compression_ratio(), mide los bytes codificados
+        frente a los bytes de la imagen sin comprimir.
+        
+        Args:
+            k: Número de valores singulares usados (común o uno por canal)
+            quantization: 'float32', 'float16' o 'int8'
+            codec: Compresión sin pérdida ('none', 'zlib' o 'lzma')
+            
+        Returns:
+            Ratio de compresión (original/comprimido)
+        """
+        if self.image_array is None:
+            return 0.0
+        
+        return self.image_array.nbytes / len(self.encode_compressed(k, quantization, codec))
+    
+    def get_frame_stats(self, k: Ranks) -> Dict[str, float]:
+        """
+        Obtiene el ratio de compresión y la energía retenida para k.
+        
+        Los valores se guardan en la caché de imágenes junto a las
+        reconstrucciones, así que repetir un k no repite el cálculo.
+        
+        Args:
+            k: Número de valores singulares usados (común o uno por canal)
+            
+        Returns:
+            Diccionario con 'compression_ratio' y 'energy_retained'
+        """
+        if self.svd_components is None:
+            self.compute_svd()
+        
+        key = ('stats', self._frame_ranks(k))
+        stats = self.frame_cache.get(key)
+        if stats is None:
+            stats = self.frame_cache.put(key, {
+                'compression_ratio': self.get_compression_ratio(k),
+                'energy_retained': self.get_energy_retained(k),
+            }, nbytes=256)
+        return stats
+    
+    def get_energy_retained(self, k: Ranks) -> float:
         """
         Calcula el porcentaje de energía retenida con k valores singulares.
         
         Args:
-            k: Número de valores singulares usados
+            k: Número de valores singulares usados (común o uno por canal)
             
         Returns:
             Porcentaje de energía retenida (0-100)
@@ -157,6 +949,11 @@ class SVDImageProcessor:
         _, s_channels, _ = self.svd_components
         
         total_energy = sum(self._energy_totals) if hasattr(self, '_energy_totals') else sum(np.sum(s ** 2) for s in s_channels)
+        if not np.isscalar(k) or self._luma_chroma():
+            # Un rango por canal
+            ranks = self._frame_ranks(k)
+            retained_energy = sum(float(csum[r - 1]) for csum, r in zip(self._energy_cumsums, ranks) if r > 0)
+            return (retained_energy / total_energy) * 100 if total_energy > 0 else 0.0
         if k <= 0:
             return 0.0
         retained_energy = 0.0
@@ -172,6 +969,50 @@ class SVDImageProcessor:
         
         return (retained_energy / total_energy) * 100 if total_energy > 0 else 0.0
     
+    def get_memory_footprint(self) -> Dict:
+        """
+        Obtiene la memoria que ocupan los factores frente a la imagen.
+        
+        Returns:
+            Diccionario con 'factors_bytes', 'image_bytes', 'ratio'
+            (factores / imagen), 'storage' y 'max_rank'
+        """
+        if self.svd_components is None:
+            self.compute_svd()
+        
+        factors = factors_nbytes(self.svd_components)
+        image = int(self.image_array.nbytes)
+        return {
+            'factors_bytes': factors,
+            'image_bytes': image,
+            'ratio': factors / image if image else 0.0,
+            'storage': self.storage,
+            'max_rank': self.max_rank,
+        }
+
+    def get_storage_error_bound(self, k: Ranks) -> Dict:
+        """
+        Cota del error que añade el almacenamiento cuantizado con k componentes.
+        
+        Acota la diferencia (antes de recortar a uint8) entre la
+        reconstrucción con los factores cuantizados y con los originales.
+        
+        Args:
+            k: Número de valores singulares usados (común o uno por canal)
+            
+        Returns:
+            Diccionario con 'frobenius' (cota por canal) y 'rmse' (cota del
+            RMSE por píxel en escala 0-255); ceros sin cuantización
+        """
+        if self.svd_components is None:
+            self.compute_svd()
+        
+        if not isinstance(self.svd_components, CompactFactors):
+            return {'frobenius': [0.0] * len(self.svd_components[1]), 'rmse': 0.0}
+        bounds = self.svd_components.error_bound(self._frame_ranks(k))
+        return {'frobenius': bounds,
+                'rmse': float(np.sqrt(np.sum(np.square(bounds)) / self.image_array.size))}
+
     def get_singular_values(self) -> List[np.ndarray]:
         """
         Obtiene los valores singulares de cada canal.
@@ -195,4 +1036,128 @@ class SVDImageProcessor:
             self.compute_svd()
         
         _, s_channels, _ = self.svd_components
+        if self._luma_chroma():
+            # Un k común es el rango de la luminancia
+            return len(s_channels[0])
         return min(len(s) for s in s_channels)
+
+    def get_k_for_energy(self, target: float) -> int:
+        """
+        Obtiene el menor k que retiene al menos un porcentaje de energía.
+        
+        Args:
+            target: Porcentaje de energía deseado (0-100)
+            
+        Returns:
+            Número de valores singulares (get_max_k() si no se alcanza)
+        """
+        return self.select_rank(energy=target)
+
+    def select_rank(self, energy: Optional[float] = None, psnr: Optional[float] = None,
+                    rmse: Optional[float] = None, max_bytes: Optional[int] = None,
+                    per_channel: bool = False,
+                    quantization: str = 'int8') -> Union[int, List[int]]:
+        """
+        Elige k a partir de la energía acumulada, sin reconstrucciones de prueba.
+        
+        Los objetivos de calidad (energía, PSNR, RMSE) dan el menor k que los
+        cumple; max_bytes limita el tamaño del .svdz (ver rank_selection).
+        
+        Args:
+            energy: Porcentaje mínimo de energía retenida (0-100)
+            psnr: PSNR mínimo en dB
+            rmse: Error cuadrático medio máximo por píxel (escala 0-255)
+            max_bytes: Tamaño máximo del contenedor .svdz sin códec
+            per_channel: Devolver un k por canal que cumpla el objetivo en
+                cada canal por separado
+            quantization: Cuantización usada para estimar los bytes
+            
+        Returns:
+            k común, o lista con un k por canal
+        """
+        self._require_rgb("select_rank")
+        if self.svd_components is None:
+            self.compute_svd()
+        
+        return select_rank(self._energy_cumsums, self._energy_totals, self.image_array.shape,
+                           self.get_max_k(), energy=energy, psnr=psnr, rmse=rmse,
+                           max_bytes=max_bytes, per_channel=per_channel,
+                           quantization=quantization)
+
+    def get_rate_distortion(self, clip_samples: int = 0, sample_rows: int = 64,
+                            random_state: Optional[int] = 0) -> Dict[str, np.ndarray]:
+        """
+        Curva tasa-distorsión de todos los k sin reconstruir la imagen.
+        
+        Args:
+            clip_samples: Rangos en los que medir el error real tras el
+                recorte a uint8 (0 usa solo la fórmula de la cola de s²)
+            sample_rows: Filas usadas en esa medición
+            random_state: Semilla de la elección de filas
+            
+        Returns:
+            Diccionario de arrays por k ('k', 'compression_ratio',
+            'energy_retained', 'mse', 'rmse', 'psnr' y, con clip_samples,
+            las versiones '_corrected')
+        """
+        self._require_rgb("La curva tasa-distorsión")
+        if self.svd_components is None:
+            self.compute_svd()
+        
+        curve = rate_distortion_curve(self._energy_cumsums, self._energy_totals,
+                                      self.image_array.shape, self.get_max_k())
+        if clip_samples > 0:
+            clipping_correction(self.svd_components, self.image_array, curve,
+                                samples=clip_samples, sample_rows=sample_rows,
+                                random_state=random_state)
+        return curve
+
+    def allocate_ranks(self, k: Optional[int] = None, budget: Optional[float] = None,
+                       max_bytes: Optional[int] = None, quantization: str = 'int8') -> List[int]:
+        """
+        Reparte un presupuesto entre canales maximizando la energía retenida.
+        
+        Con el mismo tamaño que un k común, los canales con espectro más
+        concentrado reciben menos componentes y los demás más, lo que reduce
+        el error total (y sube el PSNR). Ver water_fill_ranks. Con luminancia
+        y crominancia la energía de cada plano se pondera por su peso en el
+        error RGB (ver plane_weights) y el coste depende de su tamaño.
+        
+        Args:
+            k: Presupuesto equivalente a k componentes en cada canal
+            budget: Presupuesto en parámetros (k · (m + n + 1) por canal)
+            max_bytes: Presupuesto en bytes de un .svdz sin códec
+            quantization: Cuantización usada para convertir bytes en rangos
+            
+        Returns:
+            Lista con el rango de cada canal
+        """
+        if self.svd_components is None:
+            self.compute_svd()
+        
+        shape = self.image_array.shape
+        m, n = shape[:2]
+        s_channels = self.svd_components[1]
+        if self._luma_chroma():
+            if max_bytes is not None:
+                self._require_rgb("max_bytes")
+            weights = plane_weights(self.color_space, self.chroma_subsampling)
+            costs = [rows + cols + 1 for rows, cols in self._plane_shapes()]
+            if budget is None:
+                if k is None:
+                    raise ValueError("Indica k o budget")
+                budget = sum(r * c for r, c in zip(self._requested_ranks(k), costs))
+            spectra = [np.asarray(s, dtype=np.float64) * np.sqrt(w) for s, w in zip(s_channels, weights)]
+            return water_fill_ranks(spectra, costs, budget)
+        if max_bytes is not None:
+            # En bytes todos los componentes cuestan lo mismo: basta contar rangos
+            base = svdz_size(shape, 0, quantization)
+            per_rank = (svdz_size(shape, 1, quantization) - base) // len(s_channels)
+            costs, budget = [per_rank] * len(s_channels), max_bytes - base
+        elif k is not None:
+            costs, budget = [m + n + 1] * len(s_channels), len(s_channels) * int(k) * (m + n + 1)
+        elif budget is not None:
+            costs = [m + n + 1] * len(s_channels)
+        else:
+            raise ValueError("Indica k, budget o max_bytes")
+        return water_fill_ranks(s_channels, costs, budget)
@@ -0,0 +1,406 @@
+"""
+SVD por bloques (tiles) para imágenes que no caben en memoria.
+
+La imagen se descompone en tiles de tamaño fijo, calculado a partir de un
+límite de memoria. Los factores de cada tile se guardan en disco y la
+reconstrucción se hace tile a tile hacia un escritor de salida en streaming,
+de modo que la memoria de trabajo no depende del tamaño de la imagen.
+
+Solo las fuentes mapeables (.npy, raw con cabecera y TIFF sin comprimir) se
+leen tile a tile. Los formatos comprimidos (PNG, JPEG, TIFF comprimido) se
+decodifican enteros en memoria, así que solo se admiten si la imagen
+decodificada cabe en el límite de memoria; para imágenes mayores hay que
+convertirlas antes a uno de los formatos mapeables.
+"""
+
+import os
+import shutil
+import tempfile
+import weakref
+import numpy as np
+from PIL import Image
+from typing import List, Optional, Tuple
+
+from .reconstruct import to_pixels
+from .sources import open_mapped_source, unlimited_pixels
+from .svd_processor import SVDImageProcessor
+
+
+# Copias de un tile que conviven durante la descomposición:
+# pila de entrada, U, VT, espacio de trabajo de LAPACK y reconstrucción.
+_TILE_WORKING_COPIES = 6
+
+
+def tile_size_for_memory(memory_limit: int, channels: int, minimum: int = 64,
+                         multiple: int = 64, itemsize: int = 4) -> int:
+    """
+    Calcula el lado de tile que respeta un límite de memoria de trabajo.
+
+    Args:
+        memory_limit: Bytes disponibles para procesar un tile
+        channels: Número de canales de la imagen
+        minimum: Lado mínimo del tile
+        multiple: El lado se redondea hacia abajo a un múltiplo de este valor
+        itemsize: Bytes por elemento del tipo de cálculo (4 para float32)
+
+    Returns:
+        Lado del tile en píxeles
+    """
+    per_pixel = itemsize * channels * _TILE_WORKING_COPIES
+    side = int(np.sqrt(max(memory_limit, 0) / per_pixel))
+    side = (side // multiple) * multiple
+    return max(minimum, side)
+
+
+def decoded_size(image: Image.Image) -> int:
+    """Bytes que ocupa una imagen PIL decodificada como array."""
+    if image.mode in ('I', 'F'):
+        itemsize = 4
+    elif image.mode.startswith('I;16'):
+        itemsize = 2
+    else:
+        itemsize = 1
+    width, height = image.size
+    return width * height * len(image.getbands()) * itemsize
+
+
+class NpyTileWriter:
+    """Escritor de salida .npy mapeado en memoria; acepta tiles en cualquier orden."""
+
+    def __init__(self, path: str, shape: Tuple[int, ...]):
+        self.path = path
+        self._array = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=shape)
+
+    def write_tile(self, row: int, col: int, tile: np.ndarray) -> None:
+        self._array[row:row + tile.shape[0], col:col + tile.shape[1]] = tile
+
+    def close(self) -> None:
+        self._array.flush()
+        del self._array
+
+
+class PNMTileWriter:
+    """
+    Escritor secuencial PGM/PPM binario.
+
+    Los tiles deben llegar por filas de tiles; solo se mantiene en memoria
+    la banda de filas actual.
+    """
+
+    def __init__(self, path: str, shape: Tuple[int, ...]):
+        height, width = shape[:2]
+        channels = shape[2] if len(shape) == 3 else 1
+        if channels not in (1, 3):
+            raise ValueError("PGM/PPM solo admite imágenes de 1 o 3 canales")
+        self.path = path
+        self._shape = shape
+        self._file = open(path, 'wb')
+        magic = b'P5' if channels == 1 else b'P6'
+        self._file.write(magic + f"\n{width} {height}\n255\n".encode('ascii'))
+        self._band = None
+        self._band_row = 0
+        self._next_row = 0
+
+    def write_tile(self, row: int, col: int, tile: np.ndarray) -> None:
+        if self._band is None or row != self._band_row:
+            self._flush_band()
+            if row != self._next_row:
+                raise ValueError("PNMTileWriter requiere los tiles en orden de filas")
+            self._band = np.zeros((tile.shape[0],) + self._shape[1:], dtype=np.uint8)
+            self._band_row = row
+        self._band[:, col:col + tile.shape[1]] = tile
+
+    def _flush_band(self) -> None:
+        if self._band is not None:
+            self._file.write(self._band.tobytes())
+            self._next_row = self._band_row + self._band.shape[0]
+            self._band = None
+
+    def close(self) -> None:
+        self._flush_band()
+        self._file.close()
+
+
+def open_tile_writer(path: str, shape: Tuple[int, ...]):
+    """Elige el escritor según la extensión (.npy, .pgm, .ppm o .pnm)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.npy':
+        return NpyTileWriter(path, shape)
+    if ext in ('.pgm', '.ppm', '.pnm'):
+        return PNMTileWriter(path, shape)
+    raise ValueError(f"Formato de salida no soportado para escritura por tiles: {ext}")
+
+
+class TiledSVDProcessor(SVDImageProcessor):
+    """
+    Procesador SVD por tiles con memoria de trabajo acotada.
+
+    Mantiene la API de SVDImageProcessor. Los factores de cada tile se
+    guardan en `factor_dir` como U traspuesta (c, r, h), s (c, r) y
+    VT (c, r, w) en self.dtype, de forma que reconstruir con k componentes
+    solo lee las k primeras filas de cada archivo.
+
+    Un `factor_dir` temporal se borra con cleanup(), al salir de un bloque
+    with o, en último caso, cuando el procesador se recolecta.
+    """
+
+    def __init__(self, image_path: str = None, memory_limit: int = 256 * 1024 ** 2,
+                 tile_size: Optional[int] = None, max_rank: Optional[int] = None,
+                 factor_dir: Optional[str] = None, **kwargs):
+        """
+        Inicializa el procesador por tiles.
+
+        Args:
+            image_path: Ruta de la imagen a procesar
+            memory_limit: Límite de memoria de trabajo en bytes; determina
+                el tamaño de tile si no se indica `tile_size`
+            tile_size: Lado del tile en píxeles (opcional)
+            max_rank: Componentes guardados por tile (por defecto todos)
+            factor_dir: Directorio para los factores (por defecto uno temporal)
+            **kwargs: Opciones del motor de SVDImageProcessor
+        """
+        self.memory_limit = memory_limit
+        self.tile_size = tile_size
+        self._owns_factor_dir = factor_dir is None
+        self.factor_dir = factor_dir or tempfile.mkdtemp(prefix='svd_tiles_')
+        os.makedirs(self.factor_dir, exist_ok=True)
+        self._finalizer = None
+        if self._owns_factor_dir:
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self.factor_dir, True)
+        self.shape = None
+        self.tiles = []
+        self._source = None
+        self._decoded_bytes = 0
+        # max_rank tiene el mismo significado que en SVDImageProcessor
+        super().__init__(image_path, max_rank=max_rank, **kwargs)
+
+    def load_image(self, image_path: str) -> None:
+        """
+        Abre la imagen sin decodificarla a un array completo.
+
+        Las fuentes mapeables (.npy, raw, TIFF sin comprimir) se leen tile a
+        tile desde el archivo. El resto se decodifica una sola vez en
+        memoria, y solo si cabe en memory_limit (si no, ValueError): PIL
+        descomprime la imagen entera al leer cualquier región.
+
+        Args:
+            image_path: Ruta de la imagen
+        """
+        self.image_path = image_path
+        self.image_array = None
+        self.svd_components = None
+        self.tiles = []
+        self._decoded_bytes = 0
+        self._source = open_mapped_source(image_path)
+        if self._source is not None:
+            self.original_image = None
+            self.shape = self._source.shape
+            return
+        # El límite anti "decompression bomb" de PIL se sustituye por
+        # memory_limit, que se comprueba antes de decodificar
+        with unlimited_pixels():
+            image = Image.open(image_path)
+        size = decoded_size(image)
+        if size > self.memory_limit:
+            image.close()
+            raise ValueError(
+                f"{image_path} ocupa {size / 1024 ** 2:.0f} MB decodificada, más que memory_limit "
+                f"({self.memory_limit / 1024 ** 2:.0f} MB). Conviértala a .npy, raw o TIFF sin "
+                f"comprimir para procesarla por tiles")
+        with image:
+            self._source = np.asarray(image)
+        self._decoded_bytes = size
+        self.original_image = None
+        self.shape = self._source.shape
+
+    @property
+    def channels(self) -> int:
+        return 1 if len(self.shape) == 2 else self.shape[2]
+
+    def _tile_side(self) -> int:
+        if self.tile_size:
+            return int(self.tile_size)
+        # La imagen decodificada en memoria descuenta del presupuesto
+        budget = self.memory_limit - self._decoded_bytes
+        return tile_size_for_memory(budget, self.channels, itemsize=self.dtype.itemsize)
+
+    def _tile_boxes(self) -> List[Tuple[int, int, int, int]]:
+        """Devuelve (fila, columna, alto, ancho) de cada tile en orden de filas."""
+        side = self._tile_side()
+        height, width = self.shape[:2]
+        return [(r, c, min(side, height - r), min(side, width - c))
+                for r in range(0, height, side)
+                for c in range(0, width, side)]
+
+    def _read_tile(self, row: int, col: int, height: int, width: int) -> np.ndarray:
+        """Lee un tile como pila contigua (c, h, w) en self.dtype."""
+        tile = self._source[row:row + height, col:col + width]
+        if tile.ndim == 2:
+            return tile.astype(self.dtype)[np.newaxis]
+        return np.ascontiguousarray(np.moveaxis(tile, -1, 0), dtype=self.dtype)
+
+    def _tile_path(self, index: int, name: str) -> str:
+        return os.path.join(self.factor_dir, f"tile_{index:06d}_{name}.npy")
+
+    def compute_svd(self) -> List[dict]:
+        """
+        Descompone cada tile y guarda sus factores en disco.
+
+        Returns:
+            Lista con la descripción de cada tile (posición, tamaño y rango)
+        """
+        if self.shape is None:
+            raise ValueError("No hay imagen cargada. Use load_image() primero.")
+
+        self.tiles = []
+        energy_totals = []
+        energy_cumsums = []
+        for index, (row, col, height, width) in enumerate(self._tile_boxes()):
+            stack = self._read_tile(row, col, height, width)
+            totals = [float(np.einsum('ij,ij->', ch, ch, dtype=np.float64)) for ch in stack]
+            U, s, VT = self._svd(stack)
+            rank = s.shape[-1] if self.max_rank is None else min(self.max_rank, s.shape[-1])
+            np.save(self._tile_path(index, 'Ut'),
+                    np.ascontiguousarray(np.swapaxes(U[:, :, :rank], 1, 2), dtype=self.dtype))
+            np.save(self._tile_path(index, 's'), np.ascontiguousarray(s[:, :rank], dtype=self.dtype))
+            np.save(self._tile_path(index, 'VT'), np.ascontiguousarray(VT[:, :rank, :], dtype=self.dtype))
+            del stack, U, VT
+
+            self.tiles.append({'row': row, 'col': col, 'height': height, 'width': width, 'rank': rank})
+            energy_totals.extend(totals)
+            energy_cumsums.extend(np.cumsum(s[:, :rank].astype(np.float64) ** 2, axis=-1))
+
+        # Una entrada por (tile, canal)
+        self._energy_totals = energy_totals
+        self._energy_cumsums = energy_cumsums
+        self.svd_components = self.tiles
+        return self.tiles
+
+    def _reconstruct_tile(self, index: int, k: int) -> np.ndarray:
+        """Reconstruye un tile con k componentes como uint8 (h, w[, c])."""
+        Ut = np.load(self._tile_path(index, 'Ut'), mmap_mode='r')
+        s = np.load(self._tile_path(index, 's'), mmap_mode='r')
+        VT = np.load(self._tile_path(index, 'VT'), mmap_mode='r')
+        k = min(k, s.shape[-1])
+        U = np.swapaxes(Ut[:, :k, :], 1, 2) * s[:, np.newaxis, :k]
+        tile = to_pixels(np.matmul(U, VT[:, :k, :]))
+        if len(self.shape) == 2:
+            return tile[0].astype(np.uint8)
+        return np.moveaxis(tile, 0, -1).astype(np.uint8)
+
+    def reconstruct_to_file(self, k: int, output_path: str) -> str:
+        """
+        Reconstruye la imagen tile a tile directamente en un archivo.
+
+        Args:
+            k: Número de valores singulares a usar
+            output_path: Ruta de salida (.npy, .pgm, .ppm o .pnm)
+
+        Returns:
+            Ruta del archivo escrito
+        """
+        if not self.tiles:
+            self.compute_svd()
+        writer = open_tile_writer(output_path, self.shape)
+        try:
+            for index, tile in enumerate(self.tiles):
+                writer.write_tile(tile['row'], tile['col'], self._reconstruct_tile(index, k))
+        finally:
+            writer.close()
+        return output_path
+
+    def reconstruct_image(self, k: int) -> np.ndarray:
+        """
+        Reconstruye la imagen completa en memoria (uint8).
+
+        Para imágenes muy grandes use reconstruct_to_file().
+
+        Args:
+            k: Número de valores singulares a usar
+
+        Returns:
+            Array NumPy con la imagen reconstruida
+        """
+        if not self.tiles:
+            self.compute_svd()
+        output = np.empty(self.shape, dtype=np.uint8)
+        for index, tile in enumerate(self.tiles):
+            row, col = tile['row'], tile['col']
+            output[row:row + tile['height'], col:col + tile['width']] = self._reconstruct_tile(index, k)
+        return output
+
+    def get_compression_ratio(self, k: int) -> float:
+        """
+        Calcula el ratio de compresión sumando los factores de cada tile.
+
+        Args:
+            k: Número de valores singulares usados
+
+        Returns:
+            Ratio de compresión (original/comprimido)
+        """
+        if self.shape is None:
+            return 0.0
+        channels = self.channels
+        original_size = self.shape[0] * self.shape[1] * channels
+        if self.tiles:
+            boxes = [(t['height'], t['width'], t['rank']) for t in self.tiles]
+        else:
+            boxes = [(h, w, min(h, w)) for _, _, h, w in self._tile_boxes()]
+        compressed_size = sum(channels * min(k, r) * (h + w + 1) for h, w, r in boxes)
+        return original_size / compressed_size if compressed_size else 0.0
+
+    def get_energy_retained(self, k: int) -> float:
+        """
+        Calcula el porcentaje de energía retenida con k valores singulares
+        por tile.
+
+        Args:
+            k: Número de valores singulares usados
+
+        Returns:
+            Porcentaje de energía retenida (0-100)
+        """
+        if not self.tiles:
+            self.compute_svd()
+        total_energy = sum(self._energy_totals)
+        if k <= 0 or total_energy <= 0:
+            return 0.0
+        retained_energy = sum(float(csum[min(k, len(csum)) - 1]) for csum in self._energy_cumsums)
+        return retained_energy / total_energy * 100
+
+    def get_singular_values(self) -> List[np.ndarray]:
+        """
+        Obtiene los valores singulares de cada tile.
+
+        Returns:
+            Lista con un array (c, r) por tile
+        """
+        if not self.tiles:
+            self.compute_svd()
+        return [np.load(self._tile_path(i, 's')) for i in range(len(self.tiles))]
+
+    def get_max_k(self) -> int:
+        """
+        Obtiene el rango del mayor tile; los tiles de borde más pequeños
+        usan min(k, su rango).
+
+        Returns:
+            Número máximo de componentes
+        """
+        if not self.tiles:
+            self.compute_svd()
+        return max(t['rank'] for t in self.tiles)
+
+    def cleanup(self) -> None:
+        """Elimina los factores en disco si el directorio es temporal."""
+        if self._finalizer is not None:
+            self._finalizer()
+        self.tiles = []
+        self.svd_components = None
+
+    def __enter__(self) -> 'TiledSVDProcessor':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cleanup()
@@ -0,0 +1,212 @@
+"""
+Actualización incremental de factores SVD (Brand, 2006).
+
+Si A = U S Vᵀ y la imagen cambia en A + X Yᵀ con X (m, c) e Y (n, c) de
+pocas columnas, la nueva SVD sale de la SVD de una matriz pequeña
+(r + c, r + c) en lugar de descomponer otra vez la imagen:
+
+    [U Qx] K [V Qy]ᵀ,   K = [S 0; 0 0] + [P; Rx] [Q; Ry]ᵀ
+
+con P = Uᵀ X, Q = Vᵀ Y y las QR de las partes de X e Y fuera de los
+subespacios actuales. Añadir filas o columnas y cambiar una región
+rectangular son casos particulares de X Yᵀ (ver append_columns,
+append_rows y region_update).
+
+El coste es O((m + n)(r + c)² + (r + c)³), así que compensa sobre todo con
+factores truncados (r pequeño); con la SVD completa de una imagen cuadrada
+es comparable a recalcularla. Las actualizaciones sucesivas acumulan
+pérdida de ortogonalidad en U y V: orthogonality_error la mide y
+reorthogonalize la corrige con dos QR y una SVD (r, r).
+
+Todas las funciones aceptan una matriz o una pila (c, m, n) de canales.
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+
+def _t(mat: np.ndarray) -> np.ndarray:
+    return np.swapaxes(mat, -1, -2)
+
+
+def _residual_basis(basis: np.ndarray, mat: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Proyecta mat sobre una base ortonormal y ortonormaliza lo que queda fuera.
+
+    La proyección se repite dos veces (Gram-Schmidt clásico con
+    reortogonalización) para que el residuo sea ortogonal a la base incluso
+    en float32.
+
+    Returns:
+        Tupla (coeficientes en la base, base del residuo, R del residuo)
+    """
+    coeffs = _t(basis) @ mat
+    residual = mat - basis @ coeffs
+    correction = _t(basis) @ residual
+    residual -= basis @ correction
+    coeffs += correction
+    Q, R = np.linalg.qr(residual)
+    return coeffs, Q, R
+
+
+def brand_update(U: np.ndarray, s: np.ndarray, VT: np.ndarray, X: np.ndarray, Y: np.ndarray,
+                 rank: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    SVD de U diag(s) VT + X Yᵀ a partir de los factores actuales.
+
+    Args:
+        U: Vectores singulares izquierdos (..., m, r)
+        s: Valores singulares (..., r)
+        VT: Vectores singulares derechos (..., r, n)
+        X: Factor izquierdo de la actualización (..., m, c)
+        Y: Factor derecho de la actualización (..., n, c)
+        rank: Componentes que se conservan (por defecto r + c, limitado
+            por el tamaño de la matriz)
+
+    Returns:
+        Tupla (U, s, VT) actualizada, en el tipo de U
+    """
+    dtype = U.dtype
+    m, r = U.shape[-2:]
+    n = VT.shape[-1]
+    c = X.shape[-1]
+    V = _t(VT)
+    X = X.astype(dtype, copy=False)
+    Y = Y.astype(dtype, copy=False)
+    P, Qx, Rx = _residual_basis(U, X)
+    Q, Qy, Ry = _residual_basis(V, Y)
+
+    # Matriz pequeña (r + c, r + c) en float64
+    left = np.concatenate([P, Rx], axis=-2).astype(np.float64)
+    right = np.concatenate([Q, Ry], axis=-2).astype(np.float64)
+    K = left @ _t(right)
+    diagonal = np.arange(r)
+    K[..., diagonal, diagonal] += s
+    Uk, sk, VTk = np.linalg.svd(K)
+
+    rank = min(r + c, m, n) if rank is None else min(int(rank), r + c, m, n)
+    U_new = np.concatenate([U, Qx], axis=-1) @ Uk[..., :rank].astype(dtype)
+    VT_new = VTk[..., :rank, :].astype(dtype) @ _t(np.concatenate([V, Qy], axis=-1))
+    return U_new, sk[..., :rank].astype(dtype), VT_new
+
+
+def append_columns(U: np.ndarray, s: np.ndarray, VT: np.ndarray, columns: np.ndarray,
+                   rank: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    SVD de [A, columns]: [A, 0] = U S [VT, 0] más la actualización columns · [0, I].
+
+    Args:
+        U, s, VT: Factores de A (..., m, n)
+        columns: Columnas nuevas (..., m, c)
+        rank: Componentes que se conservan (ver brand_update)
+
+    Returns:
+        Tupla (U, s, VT) de la matriz (..., m, n + c)
+    """
+    n = VT.shape[-1]
+    c = columns.shape[-1]
+    VT_padded = np.concatenate([VT, np.zeros(VT.shape[:-1] + (c,), dtype=VT.dtype)], axis=-1)
+    Y = np.zeros(columns.shape[:-2] + (n + c, c), dtype=U.dtype)
+    Y[..., n:, :] = np.eye(c, dtype=U.dtype)
+    return brand_update(U, s, VT_padded, columns, Y, rank)
+
+
+def append_rows(U: np.ndarray, s: np.ndarray, VT: np.ndarray, rows: np.ndarray,
+                rank: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    SVD de [A; rows], como append_columns sobre la traspuesta.
+
+    Args:
+        U, s, VT: Factores de A (..., m, n)
+        rows: Filas nuevas (..., c, n)
+        rank: Componentes que se conservan (ver brand_update)
+
+    Returns:
+        Tupla (U, s, VT) de la matriz (..., m + c, n)
+    """
+    V, s, UT = append_columns(_t(VT), s, _t(U), _t(rows), rank)
+    return _t(UT), s, _t(V)
+
+
+def region_update(U: np.ndarray, s: np.ndarray, VT: np.ndarray, row: int, col: int,
+                  delta: np.ndarray, rank: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    SVD de A tras sumar `delta` a la región que empieza en (row, col).
+
+    El cambio se escribe como X Yᵀ con c = min(alto, ancho) de la región:
+    una matriz de selección de filas (o columnas) y el propio delta.
+
+    Args:
+        U, s, VT: Factores de A (..., m, n)
+        row: Primera fila de la región
+        col: Primera columna de la región
+        delta: Cambio de la región (..., alto, ancho)
+        rank: Componentes que se conservan (por defecto los actuales)
+
+    Returns:
+        Tupla (U, s, VT) actualizada
+    """
+    m, n = U.shape[-2], VT.shape[-1]
+    height, width = delta.shape[-2:]
+    lead = delta.shape[:-2]
+    rank = s.shape[-1] if rank is None else rank
+    if height <= width:
+        X = np.zeros(lead + (m, height), dtype=U.dtype)
+        X[..., row:row + height, :] = np.eye(height, dtype=U.dtype)
+        Y = np.zeros(lead + (n, height), dtype=U.dtype)
+        Y[..., col:col + width, :] = _t(delta)
+    else:
+        X = np.zeros(lead + (m, width), dtype=U.dtype)
+        X[..., row:row + height, :] = delta
+        Y = np.zeros(lead + (n, width), dtype=U.dtype)
+        Y[..., col:col + width, :] = np.eye(width, dtype=U.dtype)
+    return brand_update(U, s, VT, X, Y, rank)
+
+
+def _active(s: np.ndarray) -> np.ndarray:
+    """Componentes con valor singular no despreciable (sus vectores deben ser ortonormales)."""
+    return s > s[..., :1] * np.finfo(s.dtype).eps * 100
+
+
+def orthogonality_error(U: np.ndarray, s: np.ndarray, VT: np.ndarray) -> np.ndarray:
+    """
+    Pérdida de ortogonalidad de los factores.
+
+    Los componentes con valor singular despreciable no cuentan: sus
+    vectores no afectan a la reconstrucción (y el backend 'gram' los deja
+    a cero).
+
+    Args:
+        U, s, VT: Factores (matriz o pila)
+
+    Returns:
+        max |UᵀU - I| y |VTVTᵀ - I| por canal (escalar para una matriz)
+    """
+    active = _active(s)
+    mask = active[..., :, np.newaxis] & active[..., np.newaxis, :]
+    identity = np.eye(s.shape[-1])
+    errors = []
+    for gram in (_t(U) @ U, VT @ _t(VT)):
+        errors.append(np.max(np.abs(np.where(mask, gram - identity, 0)), axis=(-2, -1), initial=0.0))
+    return np.maximum(*errors)
+
+
+def reorthogonalize(U: np.ndarray, s: np.ndarray, VT: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Devuelve factores ortonormales del mismo producto U diag(s) VT.
+
+    U = Qu Ru y V = Qv Rv, así que U S Vᵀ = Qu (Ru S Rvᵀ) Qvᵀ y basta la SVD
+    de la matriz (r, r) central.
+
+    Args:
+        U, s, VT: Factores (matriz o pila)
+
+    Returns:
+        Tupla (U, s, VT) con U y V ortonormales
+    """
+    dtype = U.dtype
+    Qu, Ru = np.linalg.qr(U)
+    Qv, Rv = np.linalg.qr(_t(VT))
+    core = (Ru.astype(np.float64) * s[..., np.newaxis, :]) @ _t(Rv.astype(np.float64))
+    Uc, sc, VTc = np.linalg.svd(core)
+    return Qu @ Uc.astype(dtype), sc.astype(dtype), VTc.astype(dtype) @ _t(Qv)
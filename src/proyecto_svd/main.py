@@ -2,7 +2,12 @@
 Punto de entrada principal para la aplicación de compresión de imágenes con SVD.
 """
 
-from .ui.gui import main
+
+def main():
+    """Inicia la interfaz gráfica (tkinter se importa solo al usarla)."""
+    from .ui.gui import main as gui_main
+    gui_main()
+
 
 if __name__ == "__main__":
     main()
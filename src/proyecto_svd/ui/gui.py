@@ -9,10 +9,25 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import os
+import queue
+import threading
 from dotenv import load_dotenv
 load_dotenv()
 
-from ..core.svd_processor import SVDImageProcessor
+from ..core.cache import FactorCache
+from ..core.container import svdz_size
+from ..core.instrumentation import Instrumentation, JsonLinesSink, LoggingSink, MemorySink
+from ..core.svd_processor import ComputationCancelled, SVDImageProcessor
+from .scheduler import RenderScheduler
+
+
+# Modos del slider: k directo o un objetivo del que se obtiene k
+SLIDER_MODES = (
+    ('k', "Valores singulares (k)"),
+    ('energy', "Energía retenida (%)"),
+    ('psnr', "PSNR mínimo (dB)"),
+    ('size', "Tamaño máximo (KB)"),
+)
 
 
 class SVDImageApp:
@@ -34,13 +49,57 @@ class SVDImageApp:
         self.current_image = None
         self.original_photo = None
         self.compressed_photo = None
+        self._rd_plot = None
 
-        self._update_job = None
-        self._last_k = None
+        # Descomposición en segundo plano: cada carga recibe un id nuevo y
+        # los mensajes de trabajos anteriores se descartan
+        self._svd_job_id = 0
+        self._svd_cancel = None
+        self._svd_queue = queue.Queue()
+        self._svd_polling = False
         try:
             self._debounce_ms = int(os.getenv("DEBOUNCE_MS", "120"))
         except Exception:
             self._debounce_ms = 120
+        try:
+            frame_budget_ms = float(os.getenv("FRAME_BUDGET_MS", "100"))
+        except Exception:
+            frame_budget_ms = 100.0
+
+        # Los movimientos del slider se agrupan y se reconstruyen fuera del
+        # hilo de Tk; el planificador guarda el último k y el after pendiente
+        self._render_scheduler = RenderScheduler(
+            render=self._render_frame,
+            deliver=self._show_frame,
+            schedule=self.root.after,
+            cancel=self.root.after_cancel,
+            on_error=self._on_render_error,
+            debounce_ms=self._debounce_ms,
+            frame_budget_ms=frame_budget_ms
+        )
+
+        # Instrumentación opcional: SVD_INSTRUMENT=1 muestra una línea con los
+        # tiempos por etapa; SVD_INSTRUMENT_LOG y SVD_INSTRUMENT_JSONL añaden
+        # los sumideros de logging y JSON lines
+        self._instrument_sink = None
+        self._instrument_sinks = []
+        if os.getenv("SVD_INSTRUMENT", "0") == "1":
+            self._instrument_sink = MemorySink(maxlen=1000)
+            self._instrument_sinks.append(self._instrument_sink)
+            if os.getenv("SVD_INSTRUMENT_LOG", "0") == "1":
+                self._instrument_sinks.append(LoggingSink())
+            jsonl_path = os.getenv("SVD_INSTRUMENT_JSONL")
+            if jsonl_path:
+                self._instrument_sinks.append(JsonLinesSink(jsonl_path))
+
+        self._factor_cache = None
+        cache_dir = os.getenv("SVD_CACHE_DIR")
+        if cache_dir:
+            try:
+                cache_mb = int(os.getenv("SVD_CACHE_MB", "2048"))
+            except Exception:
+                cache_mb = 2048
+            self._factor_cache = FactorCache(cache_dir, cache_mb * 1024 ** 2)
         
         self.setup_ui()
 
@@ -107,6 +166,16 @@ class SVDImageApp:
         )
         self.info_btn.pack(side=tk.LEFT, padx=10)
         
+        self.rd_btn = ttk.Button(
+            button_frame,
+            text="📈 Curva R-D",
+            command=self.show_rate_distortion,
+            style='Large.TButton',
+            width=15,
+            state=tk.DISABLED
+        )
+        self.rd_btn.pack(side=tk.LEFT, padx=10)
+        
         # Frame principal con dos columnas
         main_frame = tk.Frame(self.root, bg='#f0f0f0')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
@@ -168,12 +237,21 @@ class SVDImageApp:
         slider_container = tk.Frame(control_frame, bg='white')
         slider_container.pack(fill=tk.X, pady=10)
         
-        tk.Label(
+        # El slider controla k o un objetivo (energía, PSNR o tamaño); en
+        # los modos de objetivo el k se elige con select_rank
+        mode = os.getenv("SLIDER_MODE", "k")
+        self._slider_mode = mode if mode in dict(SLIDER_MODES) else 'k'
+        self.mode_var = tk.StringVar(value=dict(SLIDER_MODES)[self._slider_mode])
+        self.mode_combo = ttk.Combobox(
             slider_container,
-            text="Número de Valores Singulares (k):",
-            font=('Arial', 11),
-            bg='white'
-        ).pack(side=tk.LEFT, padx=(0, 10))
+            textvariable=self.mode_var,
+            values=[label for _, label in SLIDER_MODES],
+            state='readonly',
+            width=24
+        )
+        self.mode_combo.bind('<<ComboboxSelected>>', self._on_mode_change)
+        self.mode_combo.pack(side=tk.LEFT, padx=(0, 10))
+        self.target_var = tk.DoubleVar(value=0.0)
         
         default_k = 50
         try:
@@ -187,7 +265,7 @@ class SVDImageApp:
             to=100,
             orient=tk.HORIZONTAL,
             variable=self.k_var,
-            command=self.update_compression,
+            command=self._on_slider_move,
             length=500
         )
         self.k_slider.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=10)
@@ -198,7 +276,7 @@ class SVDImageApp:
             text="50",
             font=('Arial', 11, 'bold'),
             bg='white',
-            width=5
+            width=16
         )
         self.k_value_label.pack(side=tk.LEFT, padx=(10, 0))
         
@@ -212,13 +290,35 @@ class SVDImageApp:
             justify=tk.LEFT
         )
         self.stats_label.pack(pady=10)
+        
+        # Progreso de la descomposición en segundo plano
+        self.progress_bar = ttk.Progressbar(
+            control_frame,
+            orient=tk.HORIZONTAL,
+            mode='determinate',
+            maximum=100,
+            length=500
+        )
+        self.progress_bar.pack(pady=(0, 5))
+
+        # Línea de instrumentación (solo con SVD_INSTRUMENT=1)
+        self.instrument_label = tk.Label(
+            control_frame,
+            text="",
+            font=('Consolas', 9),
+            bg='white',
+            fg='#7f8c8d'
+        )
+        if self._instrument_sink is not None:
+            self.instrument_label.pack(pady=(0, 5))
     
     def load_image(self):
         """Carga una imagen desde el sistema de archivos."""
         file_path = filedialog.askopenfilename(
             title="Seleccionar imagen",
             filetypes=[
-                ("Imágenes", "*.png *.jpg *.jpeg *.bmp *.gif *.tiff"),
+                ("Imágenes", "*.png *.jpg *.jpeg *.bmp *.gif *.tif *.tiff"),
+                ("Datos crudos", "*.npy *.raw *.bin"),
                 ("Todos los archivos", "*.*")
             ]
         )
@@ -226,46 +326,147 @@ class SVDImageApp:
         if not file_path:
             return
         
-        try:
-            # Cargar y procesar imagen
-            self.processor = SVDImageProcessor(file_path)
-            self.processor.compute_svd()
-            
-            # Mostrar imagen original
-            self.display_original_image()
-            
-            # Configurar slider
-            max_k = self.processor.get_max_k()
-            self.k_slider.config(to=max_k, state=tk.NORMAL)
-            self.k_var.set(min(50, max_k))
-            
-            # Habilitar botón de guardar
-            self.save_btn.config(state=tk.NORMAL)
-            
-            # Mostrar imagen comprimida inicial
-            self.update_compression()
-            
-            messagebox.showinfo("Éxito", "Imagen cargada correctamente")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"No se pudo cargar la imagen:\n{str(e)}")
+        self._start_decomposition(file_path, default_k=50, notify=True)
     
+    def _create_processor(self, file_path):
+        """Crea el procesador con el motor configurado en el entorno."""
+        engine = os.getenv("SVD_ENGINE", "full")
+        try:
+            rank = int(os.getenv("SVD_RANK", "300"))
+        except Exception:
+            rank = 300
+        try:
+            frame_cache_mb = int(os.getenv("FRAME_CACHE_MB", "64"))
+        except Exception:
+            frame_cache_mb = 64
+        instrumentation = None
+        if self._instrument_sinks:
+            # Cada procesador mide con su propia pila de etapas, pero todos
+            # comparten los sumideros
+            instrumentation = Instrumentation(self._instrument_sinks)
+        return SVDImageProcessor(file_path, engine=engine, rank=rank, cache=self._factor_cache,
+                                 frame_cache_bytes=frame_cache_mb * 1024 ** 2,
+                                 instrumentation=instrumentation)
+
     def _load_image_from_path(self, file_path):
+        self._start_decomposition(file_path)
+
+    def _start_decomposition(self, file_path, default_k=None, notify=False):
+        """
+        Carga la imagen, la muestra de inmediato y lanza la SVD en un hilo.
+        
+        Args:
+            file_path: Ruta de la imagen
+            default_k: k inicial del slider (por defecto se conserva el actual)
+            notify: Mostrar un aviso al terminar
+        """
+        # Cancelar el trabajo anterior; sus mensajes se ignorarán
+        if self._svd_cancel is not None:
+            self._svd_cancel.set()
+        if self._instrument_sink is not None:
+            # La línea de instrumentación resume solo la carga actual
+            self._instrument_sink.clear()
+        
         try:
-            self.processor = SVDImageProcessor(file_path)
-            self.processor.compute_svd()
-            self.display_original_image()
-            max_k = self.processor.get_max_k()
-            self.k_slider.config(to=max_k, state=tk.NORMAL)
-            self.k_var.set(min(self.k_var.get(), max_k))
-            self.save_btn.config(state=tk.NORMAL)
-            self._apply_compression()
+            processor = self._create_processor(file_path)
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo cargar la imagen:\n{str(e)}")
+            return
+        
+        self._svd_job_id += 1
+        job_id = self._svd_job_id
+        cancel_event = threading.Event()
+        self._svd_cancel = cancel_event
+        
+        # Mientras se calculan los factores no hay procesador listo
+        self._render_scheduler.reset()
+        self.processor = None
+        self.current_image = None
+        self.k_slider.config(state=tk.DISABLED)
+        self.save_btn.config(state=tk.DISABLED)
+        self.rd_btn.config(state=tk.DISABLED)
+        self.compressed_canvas.delete("all")
+        self.display_original_image(processor)
+        self.progress_bar['value'] = 0
+        self.compressed_info_label.config(text="Calculando SVD...")
+        
+        worker = threading.Thread(
+            target=self._decomposition_worker,
+            args=(job_id, processor, cancel_event, default_k, notify),
+            daemon=True
+        )
+        worker.start()
+        if not self._svd_polling:
+            self._svd_polling = True
+            self.root.after(50, self._poll_decomposition)
+
+    def _decomposition_worker(self, job_id, processor, cancel_event, default_k, notify):
+        """Hilo de trabajo: calcula la SVD y envía mensajes a la cola."""
+        def progress(done, total):
+            self._svd_queue.put(('progress', job_id, (done, total)))
+        
+        try:
+            processor.compute_svd(progress=progress, cancel_event=cancel_event)
+        except ComputationCancelled:
+            return
+        except Exception as e:
+            self._svd_queue.put(('error', job_id, e))
+            return
+        self._svd_queue.put(('done', job_id, (processor, default_k, notify)))
 
-    def display_original_image(self):
+    def _poll_decomposition(self):
+        """Procesa en el hilo de Tk los mensajes del hilo de trabajo."""
+        running = True
+        while True:
+            try:
+                kind, job_id, payload = self._svd_queue.get_nowait()
+            except queue.Empty:
+                break
+            if job_id != self._svd_job_id:
+                continue
+            if kind == 'progress':
+                done, total = payload
+                self.progress_bar['value'] = 100 * done / total
+                self.compressed_info_label.config(text=f"Calculando SVD... canal {done} de {total}")
+            elif kind == 'error':
+                running = False
+                self.compressed_info_label.config(text="Error en la descomposición")
+                messagebox.showerror("Error", f"No se pudo cargar la imagen:\n{str(payload)}")
+            else:
+                running = False
+                self._on_decomposition_ready(*payload)
+        
+        if running:
+            self.root.after(50, self._poll_decomposition)
+        else:
+            self._svd_polling = False
+
+    def _on_decomposition_ready(self, processor, default_k, notify):
+        """Activa los controles cuando los factores están listos."""
+        self.processor = processor
+        self.progress_bar['value'] = 100
+        
+        # Configurar slider
+        max_k = self.processor.get_max_k()
+        k = default_k if default_k is not None else self.k_var.get()
+        self.k_var.set(min(k, max_k))
+        self._configure_slider()
+        self.k_slider.config(state=tk.NORMAL)
+        
+        # Habilitar botones de guardar y de la curva R-D
+        self.save_btn.config(state=tk.NORMAL)
+        self.rd_btn.config(state=tk.NORMAL)
+        
+        # Mostrar imagen comprimida inicial
+        self.update_compression()
+        
+        if notify:
+            messagebox.showinfo("Éxito", "Imagen cargada correctamente")
+
+    def display_original_image(self, processor=None):
         """Muestra la imagen original en el canvas."""
-        img = self.processor.original_image
+        processor = processor or self.processor
+        img = processor.original_image
         img_resized = self.resize_image_for_canvas(img, 400, 400)
         self.original_photo = ImageTk.PhotoImage(img_resized)
         
@@ -273,7 +474,7 @@ class SVDImageApp:
         self.original_canvas.create_image(200, 200, image=self.original_photo)
         
         # Información
-        shape = self.processor.image_array.shape
+        shape = processor.image_array.shape
         if len(shape) == 2:
             info = f"Tamaño: {shape[1]}x{shape[0]} píxeles (Escala de grises)"
         else:
@@ -281,49 +482,148 @@ class SVDImageApp:
         
         self.original_info_label.config(text=info)
     
+    def _configure_slider(self):
+        """Ajusta el rango y la variable del slider al modo actual."""
+        if self.processor is None:
+            return
+        max_k = self.processor.get_max_k()
+        k = min(self.k_var.get(), max_k)
+        mode = self._slider_mode
+        if mode == 'k':
+            self.k_slider.config(variable=self.k_var, from_=1, to=max_k)
+            return
+        if mode == 'energy':
+            low, high = 50.0, 100.0
+            value = self.processor.get_energy_retained(k)
+        elif mode == 'psnr':
+            low, high = 15.0, 60.0
+            value = 35.0
+        else:
+            shape = self.processor.image_array.shape
+            low = svdz_size(shape, 1) / 1024
+            high = svdz_size(shape, max_k) / 1024
+            value = svdz_size(shape, k) / 1024
+        self.target_var.set(min(max(value, low), high))
+        self.k_slider.config(variable=self.target_var, from_=low, to=high)
+
+    def _on_mode_change(self, event=None):
+        """Cambia el modo del slider conservando el k actual como punto de partida."""
+        labels = {label: mode for mode, label in SLIDER_MODES}
+        self._slider_mode = labels.get(self.mode_var.get(), 'k')
+        self._configure_slider()
+        self._on_slider_move()
+
+    def _slider_k(self):
+        """k del modo actual: el valor del slider o el elegido para el objetivo."""
+        mode = self._slider_mode
+        if mode == 'k':
+            return int(round(self.k_var.get()))
+        target = self.target_var.get()
+        if mode == 'energy':
+            k = self.processor.select_rank(energy=target)
+        elif mode == 'psnr':
+            k = self.processor.select_rank(psnr=target)
+        else:
+            k = self.processor.select_rank(max_bytes=int(target * 1024))
+        self.k_var.set(k)
+        return k
+
+    def _slider_text(self, k):
+        """Texto junto al slider: k, o el objetivo y el k elegido."""
+        mode = self._slider_mode
+        if mode == 'k':
+            return str(k)
+        target = self.target_var.get()
+        unit = {'energy': "%", 'psnr': " dB", 'size': " KB"}[mode]
+        return f"{target:.1f}{unit} → k={k}"
+
+    def _on_slider_move(self, value=None):
+        """Callback del slider: actualiza la etiqueta y programa el renderizado."""
+        if self.processor is None:
+            return
+        k = self._slider_k()
+        self.k_value_label.config(text=self._slider_text(k))
+        self._render_scheduler.request(k)
+
     def update_compression(self, event=None):
-        """Actualiza la imagen comprimida según el valor del slider."""
+        """Programa la reconstrucción del k actual aunque coincida con el último."""
         if self.processor is None:
             return
+        k = self._slider_k()
+        self.k_value_label.config(text=self._slider_text(k))
+        self._render_scheduler.reset()
+        self._render_scheduler.request(k)
+
+    def _render_frame(self, k):
+        """Reconstruye la vista previa y sus estadísticas (hilo de trabajo)."""
+        processor = self.processor
+        if processor is None:
+            return None
+        return (processor,
+                processor.reconstruct_preview(k, 400, 400),
+                processor.get_frame_stats(k))
+
+    def _on_render_error(self, k, error):
+        messagebox.showerror("Error", f"Error al comprimir imagen:\n{str(error)}")
+
+    def _show_frame(self, k, frame, latency_ms=None):
+        """Muestra un fotograma reconstruido y sus estadísticas (hilo de Tk)."""
+        if frame is None or frame[0] is not self.processor:
+            return
+        _, reconstructed, frame_stats = frame
+        img = Image.fromarray(reconstructed)
         
-        k = self.k_var.get()
-        self.k_value_label.config(text=str(k))
+        # Mostrar imagen comprimida
+        self.compressed_photo = ImageTk.PhotoImage(img)
         
-        try:
-            # Reconstruir imagen
-            reconstructed = self.processor.reconstruct_image(k)
-            img = Image.fromarray(reconstructed)
-            
-            # Mostrar imagen comprimida
-            img_resized = self.resize_image_for_canvas(img, 400, 400)
-            self.compressed_photo = ImageTk.PhotoImage(img_resized)
-            
-            self.compressed_canvas.delete("all")
-            self.compressed_canvas.create_image(200, 200, image=self.compressed_photo)
-            
-            # Actualizar estadísticas
-            compression_ratio = self.processor.get_compression_ratio(k)
-            energy_retained = self.processor.get_energy_retained(k)
-            
-            max_k = self.processor.get_max_k()
-            percentage_k = (k / max_k) * 100
-            
-            stats_text = (
-                f"📊 Estadísticas de Compresión:\n"
-                f"   • Valores singulares usados: {k} de {max_k} ({percentage_k:.1f}%)\n"
-                f"   • Ratio de compresión: {compression_ratio:.2f}x\n"
-                f"   • Energía retenida: {energy_retained:.2f}%"
+        self.compressed_canvas.delete("all")
+        self.compressed_canvas.create_image(200, 200, image=self.compressed_photo)
+        
+        # Actualizar estadísticas
+        compression_ratio = frame_stats['compression_ratio']
+        energy_retained = frame_stats['energy_retained']
+        
+        max_k = self.processor.get_max_k()
+        percentage_k = (k / max_k) * 100
+        
+        stats_text = (
+            f"📊 Estadísticas de Compresión:\n"
+            f"   • Valores singulares usados: {k} de {max_k} ({percentage_k:.1f}%)\n"
+            f"   • Ratio de compresión: {compression_ratio:.2f}x\n"
+            f"   • Energía retenida: {energy_retained:.2f}%"
+        )
+        if latency_ms is not None:
+            render_stats = self._render_scheduler.stats()
+            stats_text += (
+                f"\n   • Latencia: {latency_ms:.0f} ms "
+                f"(descartados: {render_stats['dropped']}, tardíos: {render_stats['late']})"
             )
-            
-            self.stats_label.config(text=stats_text)
-            self.compressed_info_label.config(text=f"Comprimida con k={k}")
-            
-            # Guardar imagen actual para poder salvarla
-            self.current_image = img
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al comprimir imagen:\n{str(e)}")
+        
+        self.stats_label.config(text=stats_text)
+        self.compressed_info_label.config(text=f"Comprimida con k={k}")
+        self._update_instrument_line()
+        self._update_rd_marker(k)
+        
+        # Vista previa actual; la resolución completa se calcula al guardar
+        self.current_image = img
     
+    def _update_instrument_line(self):
+        """Muestra los tiempos por etapa de la última carga y vista previa."""
+        if self._instrument_sink is None:
+            return
+        summary = self._instrument_sink.summary()
+        labels = (('load_image', 'carga'), ('cast', 'conversión'), ('svd', 'SVD'),
+                  ('astype', 'copias'), ('energy', 'energía'))
+        parts = [f"{label} {summary[stage]['wall_s'] * 1000:.1f} ms"
+                 for stage, label in labels if stage in summary]
+        previews = [r for r in self._instrument_sink.records if r['stage'] == 'preview']
+        if previews:
+            parts.append(f"vista previa {previews[-1]['wall_s'] * 1000:.1f} ms")
+        peak = max((entry['peak_bytes'] for entry in summary.values()), default=0)
+        if peak:
+            parts.append(f"pico {peak / 1024 ** 2:.1f} MB")
+        self.instrument_label.config(text="⏱ " + " · ".join(parts))
+
     def resize_image_for_canvas(self, img, max_width, max_height):
         """
         Redimensiona una imagen para que quepa en el canvas.
@@ -358,13 +658,29 @@ class SVDImageApp:
             filetypes=[
                 ("PNG", "*.png"),
                 ("JPEG", "*.jpg"),
+                ("SVD comprimido", "*.svdz"),
                 ("Todos los archivos", "*.*")
             ]
         )
         
         if file_path:
             try:
-                self.current_image.save(file_path)
+                if file_path.lower().endswith('.svdz'):
+                    k = self.k_var.get()
+                    with self._render_scheduler.lock:
+                        written = self.processor.save_compressed(file_path, k)
+                    measured = self.processor.image_array.nbytes / written
+                    theoretical = self.processor.get_compression_ratio(k)
+                    messagebox.showinfo(
+                        "Éxito",
+                        f"Factores guardados en:\n{file_path}\n\n"
+                        f"Tamaño: {written / 1024:.1f} KB\n"
+                        f"Ratio real: {measured:.2f}x (teórico: {theoretical:.2f}x)"
+                    )
+                    return
+                with self._render_scheduler.lock:
+                    full_image = Image.fromarray(self.processor.reconstruct_image(self.k_var.get()))
+                full_image.save(file_path)
                 messagebox.showinfo("Éxito", f"Imagen guardada en:\n{file_path}")
             except Exception as e:
                 messagebox.showerror("Error", f"No se pudo guardar la imagen:\n{str(e)}")
@@ -458,6 +774,73 @@ Uso de la aplicación:
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
+    
+    def show_rate_distortion(self):
+        """Muestra el espectro de valores singulares y la curva tasa-distorsión."""
+        if self.processor is None:
+            return
+        if self._rd_plot is not None:
+            self._rd_plot['window'].destroy()
+        
+        processor = self.processor
+        with self._render_scheduler.lock:
+            # Todos los k de una vez, con el recorte medido en 8 rangos
+            curve = processor.get_rate_distortion(clip_samples=8)
+            spectra = [np.asarray(s) for s in processor.get_singular_values()]
+        
+        window = tk.Toplevel(self.root)
+        window.title("Espectro y curva tasa-distorsión")
+        window.geometry("950x450")
+        window.configure(bg='white')
+        
+        figure = plt.Figure(figsize=(9.5, 4.2), dpi=100)
+        ax_spectrum, ax_rd = figure.subplots(1, 2)
+        
+        names = ['Gris'] if len(spectra) == 1 else ['R', 'G', 'B', 'A'][:len(spectra)]
+        colors = ['#7f8c8d'] if len(spectra) == 1 else ['#e74c3c', '#27ae60', '#2980b9', '#8e44ad']
+        for s, name, color in zip(spectra, names, colors):
+            ax_spectrum.semilogy(np.arange(1, len(s) + 1), np.maximum(s, 1e-6), color=color, label=name)
+        ax_spectrum.set_title("Espectro de valores singulares")
+        ax_spectrum.set_xlabel("k")
+        ax_spectrum.set_ylabel("σ_k")
+        ax_spectrum.legend()
+        
+        ratio = curve['compression_ratio']
+        ax_rd.semilogx(ratio, curve['psnr'], '--', color='#95a5a6', label="Teórica (sin recorte)")
+        ax_rd.semilogx(ratio, curve['psnr_corrected'], color='#2c3e50', label="Con recorte a uint8")
+        ax_rd.set_title("Tasa-distorsión")
+        ax_rd.set_xlabel("Ratio de compresión")
+        ax_rd.set_ylabel("PSNR (dB)")
+        ax_rd.legend()
+        
+        k = min(self.k_var.get(), len(ratio))
+        vline = ax_spectrum.axvline(k, color='#f39c12')
+        point, = ax_rd.plot([ratio[k - 1]], [curve['psnr_corrected'][k - 1]], 'o', color='#f39c12')
+        figure.tight_layout()
+        
+        canvas = FigureCanvasTkAgg(figure, master=window)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        self._rd_plot = {'window': window, 'canvas': canvas, 'curve': curve,
+                         'processor': processor, 'vline': vline, 'point': point}
+        
+        def _close():
+            self._rd_plot = None
+            window.destroy()
+        window.protocol("WM_DELETE_WINDOW", _close)
+    
+    def _update_rd_marker(self, k):
+        """Mueve el marcador del k actual en la curva R-D abierta."""
+        plot = self._rd_plot
+        if plot is None or plot['processor'] is not self.processor:
+            return
+        curve = plot['curve']
+        k = min(max(k, 1), len(curve['k']))
+        plot['vline'].set_xdata([k, k])
+        plot['point'].set_data([curve['compression_ratio'][k - 1]], [curve['psnr_corrected'][k - 1]])
+        plot['canvas'].draw_idle()
+
 
 def main():
     """Función principal para ejecutar la aplicación."""
@@ -0,0 +1,167 @@
+"""
+Planificador de renderizado para los movimientos del slider.
+
+Agrupa los eventos del slider (debounce), ignora un k igual al último y
+reconstruye en un hilo de trabajo fuera del hilo de la interfaz, un
+fotograma a la vez. Mientras se arrastra el slider cada fotograma terminado
+se muestra (es más reciente que el visible) y a continuación se lanza solo
+el último k pedido; los k intermedios nunca se reconstruyen. Solo se
+descartan los fotogramas de una imagen anterior (reset). Registra la
+latencia de cada fotograma para detectar fotogramas descartados o tardíos.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+
+class RenderScheduler:
+    """Planificador de reconstrucciones con agrupación y descarte de fotogramas."""
+
+    def __init__(self, render: Callable[[int], Any], deliver: Callable[[int, Any, float], None],
+                 schedule: Callable[..., Any], cancel: Callable[[Any], None] = None,
+                 on_error: Callable[[int, Exception], None] = None,
+                 debounce_ms: int = 120, frame_budget_ms: float = 100.0,
+                 poll_ms: int = 10, history: int = 200):
+        """
+        Inicializa el planificador.
+
+        Args:
+            render: Reconstruye el fotograma de k (se ejecuta en el hilo de trabajo)
+            deliver: Muestra el fotograma; recibe (k, resultado, latencia en ms)
+                y se llama desde `schedule`, es decir, en el hilo de la interfaz
+            schedule: Programa una función tras n ms (p. ej. root.after)
+            cancel: Cancela una programación (p. ej. root.after_cancel)
+            on_error: Recibe (k, excepción) si falla la reconstrucción
+            debounce_ms: Ventana de agrupación de eventos
+            frame_budget_ms: Latencia a partir de la cual un fotograma es tardío
+            poll_ms: Intervalo de consulta del hilo de trabajo
+            history: Fotogramas recientes usados en las estadísticas
+        """
+        self._render = render
+        self._deliver = deliver
+        self._schedule = schedule
+        self._cancel = cancel
+        self._on_error = on_error
+        self.debounce_ms = debounce_ms
+        self.frame_budget_ms = frame_budget_ms
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='svd-render')
+        self.lock = threading.Lock()
+
+        self._update_job = None
+        self._last_k = None
+        self._pending = None
+        self._in_flight = None
+        self._shown_at = None
+        self._generation = 0
+        self._latencies = deque(maxlen=history)
+        self.requested = 0
+        self.coalesced = 0
+        self.skipped = 0
+        self.dropped = 0
+        self.delivered = 0
+        self.late = 0
+
+    def reset(self) -> None:
+        """Olvida el último k y descarta el trabajo en curso (p. ej. al cambiar de imagen)."""
+        self._generation += 1
+        self._last_k = None
+        self._pending = None
+        self._shown_at = None
+        if self._update_job is not None and self._cancel is not None:
+            self._cancel(self._update_job)
+        self._update_job = None
+
+    def request(self, k: int) -> None:
+        """
+        Pide mostrar el fotograma de k.
+
+        Args:
+            k: Número de valores singulares
+        """
+        k = int(k)
+        self.requested += 1
+        target = self._pending[0] if self._pending is not None else self._last_k
+        if k == target:
+            self.skipped += 1
+            return
+        if self._pending is not None:
+            self.coalesced += 1
+        self._pending = (k, time.perf_counter())
+        if self._update_job is None:
+            self._update_job = self._schedule(self.debounce_ms, self._dispatch)
+
+    def _dispatch(self) -> None:
+        self._update_job = None
+        if self._pending is None or self._in_flight is not None:
+            # El siguiente k se lanza cuando termine el fotograma en curso
+            return
+        k, requested_at = self._pending
+        self._pending = None
+        self._last_k = k
+        future = self._executor.submit(self._render_locked, k)
+        self._in_flight = (k, requested_at, self._generation, future)
+        self._schedule(self.poll_ms, self._poll)
+
+    def _render_locked(self, k: int):
+        with self.lock:
+            return self._render(k)
+
+    def _poll(self) -> None:
+        k, requested_at, generation, future = self._in_flight
+        if not future.done():
+            self._schedule(self.poll_ms, self._poll)
+            return
+        self._in_flight = None
+
+        # Otra imagen, o ya se muestra un fotograma pedido después
+        stale = self._shown_at is not None and requested_at <= self._shown_at
+        if generation != self._generation or stale:
+            self.dropped += 1
+        elif future.exception() is not None:
+            self._last_k = None
+            if self._on_error is None:
+                raise future.exception()
+            self._on_error(k, future.exception())
+        else:
+            latency = (time.perf_counter() - requested_at) * 1000
+            self._latencies.append(latency)
+            self.delivered += 1
+            self._shown_at = requested_at
+            if latency > self.frame_budget_ms:
+                self.late += 1
+            self._deliver(k, future.result(), latency)
+
+        if self._pending is not None and self._update_job is None:
+            self._dispatch()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Estadísticas de los fotogramas.
+
+        Returns:
+            Diccionario con contadores (pedidos, agrupados, omitidos,
+            descartados, mostrados y tardíos) y latencias en ms
+        """
+        latencies = np.asarray(self._latencies, dtype=float)
+        return {
+            'requested': self.requested,
+            'coalesced': self.coalesced,
+            'skipped': self.skipped,
+            'dropped': self.dropped,
+            'delivered': self.delivered,
+            'late': self.late,
+            'latency_mean_ms': float(latencies.mean()) if latencies.size else 0.0,
+            'latency_p95_ms': float(np.percentile(latencies, 95)) if latencies.size else 0.0,
+            'latency_max_ms': float(latencies.max()) if latencies.size else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        """Detiene el hilo de trabajo."""
+        self.reset()
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,320 @@
+"""
+Compresión por lotes sin interfaz gráfica.
+
+Reparte las imágenes de una lista de archivos o directorios entre un pool
+de procesos. Para cada imagen se calcula la SVD una sola vez y se guarda
+una reconstrucción por cada k pedido o por cada objetivo (energía retenida,
+PSNR mínimo o tamaño máximo), que se convierte en k con select_rank.
+
+Cada imagen terminada se añade a un diario JSON lines, de modo que una
+ejecución interrumpida se reanuda saltando las imágenes hechas con los
+mismos parámetros y sin cambios desde entonces (la clave combina la ruta,
+el tamaño, la fecha de modificación y los parámetros); al final se escribe
+el informe en CSV y JSON.
+
+Cada proceso limita los hilos de BLAS para que el pool no sature los
+núcleos (N procesos × M hilos de BLAS).
+"""
+
+import csv
+import hashlib
+import json
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tif', '.tiff', '.npy')
+
+BLAS_THREAD_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                    'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+# Objetivo más exigente cuando varios del mismo tipo dan el mismo k
+_STRICTEST = {'target_energy': max, 'target_psnr': max, 'target_bytes': min}
+
+REPORT_FIELDS = ('file', 'k', 'target_energy', 'target_psnr', 'target_bytes',
+                 'energy_retained', 'compression_ratio',
+                 'output', 'width', 'height', 'load_s', 'svd_s', 'reconstruct_s',
+                 'save_s', 'status', 'error')
+
+_JOURNAL = 'report.jsonl'
+
+
+def find_images(inputs: Iterable[str]) -> List[str]:
+    """
+    Busca las imágenes de una lista de archivos y directorios.
+
+    Args:
+        inputs: Rutas de archivos o directorios (se recorren recursivamente)
+
+    Returns:
+        Lista ordenada de rutas de imágenes
+    """
+    found = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                found.extend(os.path.join(dirpath, name) for name in filenames
+                             if name.lower().endswith(IMAGE_EXTENSIONS))
+        else:
+            found.append(path)
+    return sorted(set(found))
+
+
+def _limit_blas_threads(threads: int) -> None:
+    """Inicializador de los procesos: limita los hilos de BLAS ya cargado."""
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(threads)
+
+
+@contextmanager
+def blas_thread_limits(threads: int):
+    """
+    Limita los hilos de BLAS de los procesos creados dentro del bloque.
+
+    Los procesos nuevos heredan el entorno, así que los límites se definen
+    en las variables de entorno (antes de que importen numpy) y se restauran
+    al salir; el inicializador los aplica además con threadpoolctl si está
+    instalado.
+
+    Args:
+        threads: Hilos de BLAS por proceso
+
+    Yields:
+        Argumentos para ProcessPoolExecutor (contexto spawn e inicializador)
+    """
+    saved_env = {var: os.environ.get(var) for var in BLAS_THREAD_VARS}
+    os.environ.update({var: str(threads) for var in BLAS_THREAD_VARS})
+    try:
+        yield {'mp_context': multiprocessing.get_context('spawn'),
+               'initializer': _limit_blas_threads, 'initargs': (threads,)}
+    finally:
+        for var, value in saved_env.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def _output_path(output_dir: str, rel_path: str, k: int, fmt: str) -> str:
+    stem = os.path.splitext(rel_path)[0]
+    return os.path.join(output_dir, f"{stem}_k{k}.{fmt}")
+
+
+def process_image(path: str, rel_path: str, output_dir: str, ks: Sequence[int] = (),
+                  energies: Sequence[float] = (), fmt: str = 'png',
+                  engine: str = 'full', psnrs: Sequence[float] = (),
+                  max_bytes: Sequence[int] = (), progressive: bool = False) -> List[Dict]:
+    """
+    Comprime una imagen con varios k y guarda las reconstrucciones.
+
+    Args:
+        path: Ruta de la imagen
+        rel_path: Ruta relativa usada para nombrar las salidas
+        output_dir: Directorio de salida
+        ks: Valores de k a reconstruir
+        energies: Porcentajes de energía objetivo (cada uno se convierte en k)
+        fmt: Formato de salida ('png', 'jpg', ... o 'svdz')
+        engine: Motor de SVD del procesador
+        psnrs: PSNR mínimos en dB
+        max_bytes: Tamaños máximos del .svdz en bytes
+        progressive: Guardar los .svdz con la disposición progresiva
+
+    Returns:
+        Una fila del informe por cada k distinto (o una fila de error). Si
+        varios k u objetivos dan el mismo k se guarda una sola salida, y su
+        fila recoge el objetivo más exigente de cada tipo
+    """
+    from PIL import Image
+    from ..core.svd_processor import SVDImageProcessor
+
+    rows = []
+    try:
+        start = time.perf_counter()
+        processor = SVDImageProcessor(engine=engine)
+        processor.load_image(path)
+        load_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        processor.compute_svd()
+        svd_s = time.perf_counter() - start
+
+        height, width = processor.image_array.shape[:2]
+        targets = [(int(k), {}) for k in ks]
+        targets += [(processor.select_rank(energy=e), {'target_energy': float(e)}) for e in energies]
+        targets += [(processor.select_rank(psnr=p), {'target_psnr': float(p)}) for p in psnrs]
+        targets += [(processor.select_rank(max_bytes=b), {'target_bytes': int(b)}) for b in max_bytes]
+        max_k = processor.get_max_k()
+        by_k = {}
+        for k, target in targets:
+            merged = by_k.setdefault(min(max(k, 1), max_k), {})
+            for name, value in target.items():
+                merged[name] = _STRICTEST[name](merged[name], value) if name in merged else value
+
+        for k, target in by_k.items():
+            output = _output_path(output_dir, rel_path, k, fmt)
+            os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+
+            reconstruct_s = 0.0
+            start = time.perf_counter()
+            if fmt == 'svdz':
+                processor.save_compressed(output, k, progressive=progressive)
+            else:
+                reconstructed = processor.reconstruct_image(k)
+                reconstruct_s = time.perf_counter() - start
+                start = time.perf_counter()
+                Image.fromarray(reconstructed).save(output)
+            save_s = time.perf_counter() - start
+
+            rows.append({
+                'file': rel_path,
+                'k': k,
+                'target_energy': target.get('target_energy'),
+                'target_psnr': target.get('target_psnr'),
+                'target_bytes': target.get('target_bytes'),
+                'energy_retained': processor.get_energy_retained(k),
+                'compression_ratio': processor.get_compression_ratio(k),
+                'output': output,
+                'width': width,
+                'height': height,
+                'load_s': load_s,
+                'svd_s': svd_s,
+                'reconstruct_s': reconstruct_s,
+                'save_s': save_s,
+                'status': 'ok',
+                'error': '',
+            })
+    except Exception as e:
+        rows = [{'file': rel_path, 'status': 'error', 'error': f"{type(e).__name__}: {e}"}]
+    return rows
+
+
+def _job_key(path: str, rel_path: str, settings: Dict) -> str:
+    """
+    Clave de reanudación de una imagen.
+
+    Combina la ruta relativa, el tamaño y la fecha de modificación del
+    archivo y los parámetros de la ejecución, así que una imagen editada o
+    una ejecución con otros k, objetivos o formato se vuelven a procesar.
+    """
+    stat = os.stat(path)
+    key = json.dumps([rel_path, stat.st_size, stat.st_mtime_ns, settings], sort_keys=True)
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _read_journal(journal_path: str) -> Dict[str, List[Dict]]:
+    """Lee las filas ya escritas, agrupadas por clave de reanudación."""
+    done = {}
+    if not os.path.exists(journal_path):
+        return done
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Línea truncada por una interrupción
+                continue
+            if 'key' in entry:
+                done[entry['key']] = entry['rows']
+    return done
+
+
+def write_report(rows: List[Dict], output_dir: str) -> None:
+    """
+    Escribe el informe en report.csv y report.json.
+
+    Args:
+        rows: Filas del informe
+        output_dir: Directorio de salida
+    """
+    with open(os.path.join(output_dir, 'report.json'), 'w', encoding='utf-8') as f:
+        json.dump(rows, f, indent=2)
+    with open(os.path.join(output_dir, 'report.csv'), 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS, restval='')
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def run_batch(inputs: Iterable[str], output_dir: str, ks: Sequence[int] = (),
+              energies: Sequence[float] = (), workers: Optional[int] = None,
+              blas_threads: int = 1, fmt: str = 'png', engine: str = 'full',
+              resume: bool = True, progress=None, psnrs: Sequence[float] = (),
+              max_bytes: Sequence[int] = (), progressive: bool = False) -> List[Dict]:
+    """
+    Comprime un conjunto de imágenes en paralelo.
+
+    Args:
+        inputs: Archivos o directorios de entrada
+        output_dir: Directorio de salida (imágenes e informe)
+        ks: Valores de k a reconstruir por imagen
+        energies: Porcentajes de energía objetivo por imagen
+        workers: Número de procesos (por defecto núcleos / blas_threads)
+        blas_threads: Hilos de BLAS por proceso
+        fmt: Formato de salida
+        engine: Motor de SVD
+        resume: Saltar las imágenes ya terminadas en una ejecución anterior
+            con los mismos parámetros y sin cambios en el archivo
+        progress: Función opcional progress(hechas, total, filas)
+        psnrs: PSNR mínimos en dB por imagen
+        max_bytes: Tamaños máximos del .svdz en bytes por imagen
+        progressive: Guardar los .svdz con la disposición progresiva
+
+    Returns:
+        Filas del informe de todas las imágenes
+    """
+    if not ks and not energies and not psnrs and not max_bytes:
+        raise ValueError("Indica al menos un valor de k o un objetivo (energía, PSNR o bytes)")
+    inputs = list(inputs)
+    os.makedirs(output_dir, exist_ok=True)
+    journal_path = os.path.join(output_dir, _JOURNAL)
+    if not resume and os.path.exists(journal_path):
+        os.remove(journal_path)
+    done = _read_journal(journal_path)
+
+    roots = [os.path.abspath(p) for p in inputs if os.path.isdir(p)]
+
+    def _relative(path):
+        full = os.path.abspath(path)
+        for root in roots:
+            if full.startswith(root + os.sep):
+                return os.path.relpath(full, root)
+        return os.path.basename(path)
+
+    settings = {'ks': list(ks), 'energies': list(energies), 'psnrs': list(psnrs),
+                'max_bytes': list(max_bytes), 'fmt': fmt, 'engine': engine,
+                'progressive': progressive}
+    images = []
+    for path in find_images(inputs):
+        rel = _relative(path)
+        images.append((path, rel, _job_key(path, rel, settings)))
+    pending = [(path, rel, key) for path, rel, key in images
+               if done.get(key, [{}])[0].get('status') != 'ok']
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 1) // max(1, blas_threads))
+
+    completed = len(images) - len(pending)
+    with blas_thread_limits(blas_threads) as pool_options, \
+            open(journal_path, 'a', encoding='utf-8') as journal, \
+            ProcessPoolExecutor(max_workers=workers, **pool_options) as pool:
+        futures = {pool.submit(process_image, path, rel, output_dir, tuple(ks),
+                               tuple(energies), fmt, engine, tuple(psnrs),
+                               tuple(max_bytes), progressive): (rel, key)
+                   for path, rel, key in pending}
+        for future in as_completed(futures):
+            rows = future.result()
+            rel, key = futures[future]
+            done[key] = rows
+            journal.write(json.dumps({'file': rel, 'key': key, 'rows': rows}) + '\n')
+            journal.flush()
+            completed += 1
+            if progress is not None:
+                progress(completed, len(images), rows)
+
+    rows = [row for _, _, key in images for row in done.get(key, [])]
+    write_report(rows, output_dir)
+    return rows
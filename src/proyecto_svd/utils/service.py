@@ -0,0 +1,602 @@
+"""
+Servicio HTTP de compresión con asyncio.
+
+    python -m proyecto_svd serve --port 8080
+
+El bucle de eventos solo lee peticiones y escribe respuestas: decodificar
+la imagen, la SVD y la reconstrucción se hacen en un pool acotado de
+procesos. Los factores se guardan en una FactorCache en disco direccionada
+por contenido y compartida por todos los procesos (escrituras atómicas y
+expulsión LRU); cada proceso conserva además en memoria los últimos
+procesadores usados.
+
+Endpoints:
+    POST /decompose             cuerpo: archivo de imagen; devuelve su clave
+    GET  /reconstruct?key=&k=   imagen reconstruida (format=png, svdz o progressive)
+    POST /reconstruct?k=        igual, subiendo la imagen en el cuerpo
+    GET  /metrics?key=&k=       energía, ratio, tamaño .svdz y PSNR estimado
+    GET  /stats                 colas, cachés e histogramas de latencia
+
+La clave es el hash del archivo subido. Contrapresión: como mucho
+`workers` + `max_queue` peticiones admitidas en los endpoints del pool y
+`max_connections` conexiones abiertas; el resto recibe 503 con Retry-After
+nada más leer la cabecera (o sin leerla), antes de leer o guardar el
+cuerpo. Los cuerpos mayores que `max_body` se rechazan con 413 sin
+leerlos, y las respuestas se escriben esperando a drain() (en formato
+progressive, paquete a paquete). Las imágenes subidas ocupan como mucho
+`upload_bytes` en disco (LRU); al arrancar se reindexan las que dejó una
+ejecución anterior con el mismo cache_dir.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .batch import blas_thread_limits
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+RECONSTRUCT_FORMATS = ('png', 'svdz', 'progressive')
+ENDPOINTS = ('/decompose', '/reconstruct', '/metrics', '/stats')
+POOL_ENDPOINTS = ('/decompose', '/reconstruct', '/metrics')
+# Al rechazar sin leer la petición se descarta lo que siga llegando (hasta
+# estos límites) para que el cierre no resetee la conexión antes de que el
+# cliente lea la respuesta
+LINGER_SECONDS = 1.0
+LINGER_BYTES = 256 * 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            408: 'Request Timeout', 413: 'Payload Too Large', 500: 'Internal Server Error',
+            503: 'Service Unavailable'}
+
+# Procesadores que cada proceso del pool conserva en memoria
+_WORKER_PROCESSORS = 4
+_processors = OrderedDict()
+
+
+def _processor(path: str, cache_dir: str, cache_bytes: int, engine: str):
+    """
+    Procesador ya descompuesto de una imagen subida (en el proceso del pool).
+
+    Returns:
+        Tupla (procesador, origen de los factores: 'memory', 'factor_cache'
+        o 'computed')
+    """
+    from ..core.cache import FactorCache
+    from ..core.instrumentation import Instrumentation
+    from ..core.svd_processor import SVDImageProcessor
+
+    key = (path, engine)
+    processor = _processors.get(key)
+    if processor is not None:
+        _processors.move_to_end(key)
+        return processor, 'memory'
+    # La instrumentación solo se usa para saber si hubo SVD o acierto en la caché
+    instrumentation = Instrumentation(trace_memory=False)
+    processor = SVDImageProcessor(engine=engine, cache=FactorCache(cache_dir, cache_bytes),
+                                  instrumentation=instrumentation, frame_cache_bytes=0)
+    processor.load_image(path)
+    processor.compute_svd()
+    source = 'computed' if 'svd' in instrumentation.sinks[0].summary() else 'factor_cache'
+    processor.instrumentation = None
+    _processors[key] = processor
+    while len(_processors) > _WORKER_PROCESSORS:
+        _processors.popitem(last=False)
+    return processor, source
+
+
+def _decompose_task(path: str, settings: Dict) -> Dict:
+    processor, source = _processor(path, **settings)
+    return {
+        'shape': list(processor.image_array.shape),
+        'max_k': processor.get_max_k(),
+        'source': source,
+        'singular_values': [[float(v) for v in s[:32]] for s in processor.get_singular_values()],
+    }
+
+
+def _reconstruct_task(path: str, settings: Dict, k: int, fmt: str, quantization: str) -> Tuple[List[bytes], str]:
+    processor, source = _processor(path, **settings)
+    k = min(k, processor.get_max_k())
+    if fmt == 'png':
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.fromarray(processor.reconstruct_image(k)).save(buffer, format='PNG')
+        return [buffer.getvalue()], source
+    if fmt == 'svdz':
+        return [processor.encode_compressed(k, quantization)], source
+    return list(processor.iter_progressive(k, quantization)), source
+
+
+def _metrics_task(path: str, settings: Dict, k: int) -> Dict:
+    from ..core.container import svdz_size
+
+    processor, source = _processor(path, **settings)
+    k = min(k, processor.get_max_k())
+    curve = processor.get_rate_distortion()
+    return {
+        'k': k,
+        'source': source,
+        'energy_retained': float(curve['energy_retained'][k - 1]),
+        'compression_ratio': float(curve['compression_ratio'][k - 1]),
+        'rmse': float(curve['rmse'][k - 1]),
+        'psnr': float(curve['psnr'][k - 1]),
+        'svdz_bytes': int(svdz_size(processor.image_array.shape, k)),
+    }
+
+
+class LatencyHistogram:
+    """Histograma de latencias con cubetas fijas en ms."""
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS_MS):
+        """
+        Inicializa el histograma.
+
+        Args:
+            bounds: Límites superiores de las cubetas (la última es infinita)
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> float:
+        """Límite superior de la cubeta que contiene el cuantil q (max_ms en la última)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= target:
+                return float(bound)
+        return self.max_ms
+
+    def snapshot(self) -> Dict:
+        """
+        Estado del histograma.
+
+        Returns:
+            Diccionario con recuento, media, máximo, p50, p95, p99 (en ms)
+            y la cuenta de cada cubeta ('le' = límite superior)
+        """
+        buckets = [{'le': bound, 'count': count} for bound, count in zip(self.bounds, self.counts)]
+        buckets.append({'le': 'inf', 'count': self.counts[-1]})
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'max_ms': self.max_ms,
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'buckets': buckets,
+        }
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def _json(data: Dict) -> Tuple[str, List[bytes]]:
+    return 'application/json', [json.dumps(data).encode('utf-8')]
+
+
+class CompressionService:
+    """Servicio HTTP asyncio con un pool acotado de procesos y caché de factores compartida."""
+
+    def __init__(self, cache_dir: Optional[str] = None, workers: Optional[int] = None,
+                 max_queue: int = 32, max_body: int = 64 * 1024 ** 2,
+                 cache_bytes: int = 2 * 1024 ** 3, upload_bytes: int = 1024 ** 3,
+                 max_connections: int = 256, engine: str = 'full', blas_threads: int = 1,
+                 read_timeout: float = 30.0):
+        """
+        Inicializa el servicio (el pool se crea en start()).
+
+        Args:
+            cache_dir: Directorio de la caché de factores y de las imágenes
+                subidas (por defecto uno temporal que se borra al cerrar)
+            workers: Procesos del pool (por defecto núcleos / blas_threads)
+            max_queue: Peticiones que pueden esperar turno además de las
+                `workers` en curso; las demás reciben 503 sin leer su cuerpo
+            max_body: Tamaño máximo del cuerpo de una petición en bytes
+            cache_bytes: Tamaño máximo de la caché de factores en disco
+            upload_bytes: Tamaño máximo de las imágenes subidas en disco (LRU)
+            max_connections: Conexiones abiertas a la vez; las demás reciben 503
+            engine: Motor de SVD ('full' o 'randomized')
+            blas_threads: Hilos de BLAS por proceso
+            read_timeout: Segundos para recibir la cabecera y el cuerpo
+        """
+        self._temporary = cache_dir is None
+        self.cache_dir = cache_dir or tempfile.mkdtemp(prefix='svd-service-')
+        self.workers = workers or max(1, (os.cpu_count() or 1) // max(1, blas_threads))
+        self.max_queue = max_queue
+        self.max_body = max_body
+        self.cache_bytes = cache_bytes
+        self.upload_bytes = upload_bytes
+        self.max_connections = max_connections
+        self.engine = engine
+        self.blas_threads = blas_threads
+        self.read_timeout = read_timeout
+        self._factor_dir = os.path.join(self.cache_dir, 'factors')
+        self._upload_dir = os.path.join(self.cache_dir, 'uploads')
+        os.makedirs(self._factor_dir, exist_ok=True)
+        os.makedirs(self._upload_dir, exist_ok=True)
+        self._uploads = OrderedDict()
+        self._upload_total = 0
+        self._in_use = Counter()
+        self._pool = None
+        self._server = None
+        self._slots = None
+        self._blas_limits = ExitStack()
+        self._started = time.monotonic()
+        self.connections = 0
+        self.admitted = 0
+        self.waiting = 0
+        self.running = 0
+        self.max_waiting = 0
+        self.rejected = 0
+        self.statuses: Dict[int, int] = {}
+        self.sources = {'memory': 0, 'factor_cache': 0, 'computed': 0}
+        self.latency = {endpoint: LatencyHistogram() for endpoint in ENDPOINTS + ('other',)}
+        self._index_uploads()
+
+    @property
+    def port(self) -> int:
+        """Puerto en el que escucha el servidor."""
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8080):
+        """
+        Crea el pool de procesos y empieza a aceptar conexiones.
+
+        Args:
+            host: Dirección de escucha
+            port: Puerto (0 elige uno libre, ver port)
+
+        Returns:
+            El asyncio.Server
+        """
+        # El pool crea procesos a demanda: los límites siguen hasta close()
+        pool_options = self._blas_limits.enter_context(blas_thread_limits(self.blas_threads))
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, **pool_options)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._started = time.monotonic()
+        self._server = await asyncio.start_server(self._handle, host, port)
+        logger.info("Servicio SVD en %s:%d (%d procesos, cola %d)", host, self.port,
+                    self.workers, self.max_queue)
+        return self._server
+
+    async def close(self) -> None:
+        """Deja de aceptar conexiones, cierra el pool y borra el directorio temporal."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._pool is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._pool.shutdown)
+            self._pool = None
+        self._blas_limits.close()
+        if self._temporary:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _settings(self) -> Dict:
+        return {'cache_dir': self._factor_dir, 'cache_bytes': self.cache_bytes, 'engine': self.engine}
+
+    async def _run(self, func, *args):
+        """Ejecuta una tarea en el pool (la admisión ya acotó la cola en _handle)."""
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+        except (ValueError, OSError) as exc:
+            # Imagen ilegible o parámetros que el procesador rechaza
+            raise _HTTPError(400, str(exc))
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    def _store_upload(self, body: bytes) -> str:
+        """Guarda una imagen subida con su hash como nombre (en un hilo)."""
+        key = hashlib.blake2b(body, digest_size=20).hexdigest()
+        path = os.path.join(self._upload_dir, key)
+        if not os.path.exists(path):
+            fd, tmp = tempfile.mkstemp(dir=self._upload_dir, prefix='.')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            os.replace(tmp, path)
+        return key
+
+    def _index_uploads(self) -> None:
+        """Recupera las imágenes subidas en una ejecución anterior (las más antiguas primero)."""
+        entries = []
+        for name in os.listdir(self._upload_dir):
+            path = os.path.join(self._upload_dir, name)
+            try:
+                if name.startswith('.'):
+                    # Temporal de una escritura interrumpida
+                    os.remove(path)
+                    continue
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, name, st.st_size))
+        for _, name, size in sorted(entries):
+            self._uploads[name] = size
+            self._upload_total += size
+        self._evict_uploads()
+
+    def _evict_uploads(self) -> None:
+        """Borra las imágenes menos usadas hasta caber en upload_bytes (salvo las que están en uso)."""
+        for key in list(self._uploads):
+            if self._upload_total <= self.upload_bytes:
+                break
+            if self._in_use[key]:
+                continue
+            self._upload_total -= self._uploads.pop(key)
+            try:
+                os.remove(os.path.join(self._upload_dir, key))
+            except OSError:
+                pass
+
+    async def _upload(self, body: bytes) -> str:
+        if not body:
+            raise _HTTPError(400, "Falta la imagen en el cuerpo")
+        key = await asyncio.get_running_loop().run_in_executor(None, self._store_upload, body)
+        if key not in self._uploads:
+            self._uploads[key] = len(body)
+            self._upload_total += len(body)
+        return key
+
+    def _upload_path(self, key: Optional[str]) -> str:
+        if key is None:
+            raise _HTTPError(400, "Falta el parámetro key o la imagen en el cuerpo")
+        if key not in self._uploads:
+            raise _HTTPError(404, f"Clave desconocida: {key}")
+        self._uploads.move_to_end(key)
+        path = os.path.join(self._upload_dir, key)
+        try:
+            # El orden LRU sobrevive a un reinicio (ver _index_uploads)
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    async def _route(self, method: str, path: str, params: Dict[str, str], body: bytes):
+        """Atiende una petición ya leída; devuelve (estado, tipo, trozos, cabeceras)."""
+        if path == '/stats':
+            if method != 'GET':
+                raise _HTTPError(405, "Usa GET")
+            return (200,) + _json(await self.stats()) + ({},)
+        if path not in ENDPOINTS:
+            raise _HTTPError(404, f"Ruta desconocida: {path}")
+        if method not in ('GET', 'POST') or (path == '/decompose' and method != 'POST'):
+            raise _HTTPError(405, "Método no permitido")
+
+        key = await self._upload(body) if method == 'POST' else params.get('key')
+        upload = self._upload_path(key)
+        self._in_use[key] += 1
+        try:
+            self._evict_uploads()
+            return await self._route_task(path, params, key, upload)
+        finally:
+            self._in_use[key] -= 1
+            if not self._in_use[key]:
+                del self._in_use[key]
+
+    async def _route_task(self, path: str, params: Dict[str, str], key: str, upload: str):
+        if path == '/decompose':
+            result = await self._run(_decompose_task, upload, self._settings())
+            self.sources[result['source']] += 1
+            result['key'] = key
+            return (200,) + _json(result) + ({},)
+
+        try:
+            k = int(params.get('k', '0'))
+        except ValueError:
+            raise _HTTPError(400, "k debe ser un entero")
+        if k < 1:
+            raise _HTTPError(400, "Indica k >= 1")
+        if path == '/metrics':
+            result = await self._run(_metrics_task, upload, self._settings(), k)
+            self.sources[result['source']] += 1
+            result['key'] = key
+            return (200,) + _json(result) + ({},)
+
+        fmt = params.get('format', 'png')
+        quantization = params.get('quantization', 'int8')
+        if fmt not in RECONSTRUCT_FORMATS:
+            raise _HTTPError(400, f"Formato desconocido: {fmt}. Opciones: {', '.join(RECONSTRUCT_FORMATS)}")
+        chunks, source = await self._run(_reconstruct_task, upload, self._settings(), k, fmt, quantization)
+        self.sources[source] += 1
+        content_type = 'image/png' if fmt == 'png' else 'application/octet-stream'
+        return 200, content_type, chunks, {'X-SVD-Key': key}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Lee una petición HTTP/1.1, la atiende y cierra la conexión."""
+        start = time.perf_counter()
+        endpoint = 'other'
+        headers = {}
+        admitted = False
+        complete = False
+        self.connections += 1
+        try:
+            try:
+                if self.connections > self.max_connections:
+                    raise self._overloaded()
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.read_timeout)
+                    lines = head.decode('latin-1').split('\r\n')
+                    method, target, _ = lines[0].split(' ', 2)
+                    request_headers = {}
+                    for line in lines[1:]:
+                        if ':' in line:
+                            name, value = line.split(':', 1)
+                            request_headers[name.strip().lower()] = value.strip()
+                    length = request_headers.get('content-length', '0')
+                    if not length.isdigit():
+                        raise ValueError(f"Content-Length no válido: {length!r}")
+                    length = int(length)
+                except asyncio.TimeoutError:
+                    raise _HTTPError(408, "Tiempo de lectura agotado")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+                    raise _HTTPError(400, "Petición HTTP mal formada")
+                url = urlsplit(target)
+                endpoint = url.path if url.path in ENDPOINTS else 'other'
+                if url.path in POOL_ENDPOINTS:
+                    # Se admite o rechaza antes de leer y guardar el cuerpo
+                    if self.admitted >= self.workers + self.max_queue:
+                        raise self._overloaded()
+                    self.admitted += 1
+                    admitted = True
+                if length > self.max_body:
+                    raise _HTTPError(413, f"El cuerpo supera {self.max_body} bytes")
+                try:
+                    body = b''
+                    if length:
+                        body = await asyncio.wait_for(reader.readexactly(length), self.read_timeout)
+                except asyncio.TimeoutError:
+                    raise _HTTPError(408, "Tiempo de lectura agotado")
+                except asyncio.IncompleteReadError:
+                    raise _HTTPError(400, "Cuerpo incompleto")
+                complete = True
+                params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+                status, content_type, chunks, headers = await self._route(method.upper(), url.path,
+                                                                          params, body)
+            except _HTTPError as exc:
+                status = exc.status
+                headers = exc.headers
+                content_type, chunks = _json({'error': str(exc)})
+            except Exception as exc:
+                logger.exception("Error atendiendo la petición")
+                status = 500
+                content_type, chunks = _json({'error': f"{type(exc).__name__}: {exc}"})
+
+            try:
+                lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+                         f"Content-Type: {content_type}",
+                         f"Content-Length: {sum(len(chunk) for chunk in chunks)}",
+                         "Connection: close"]
+                lines += [f"{name}: {value}" for name, value in headers.items()]
+                writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+                for chunk in chunks:
+                    # Respeta el control de flujo del cliente entre trozos
+                    writer.write(chunk)
+                    await writer.drain()
+                if not complete and writer.can_write_eof():
+                    writer.write_eof()
+                    await self._discard_input(reader)
+                writer.close()
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+            finally:
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+                self.latency[endpoint].observe((time.perf_counter() - start) * 1000)
+        finally:
+            self.connections -= 1
+            if admitted:
+                self.admitted -= 1
+
+    async def _discard_input(self, reader: asyncio.StreamReader) -> None:
+        """Lee y descarta la petición no leída, con límite de tiempo y de bytes."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + LINGER_SECONDS
+        discarded = 0
+        while discarded < LINGER_BYTES and loop.time() < deadline:
+            try:
+                data = await asyncio.wait_for(reader.read(64 * 1024), deadline - loop.time())
+            except asyncio.TimeoutError:
+                return
+            if not data:
+                return
+            discarded += len(data)
+
+    def _overloaded(self) -> _HTTPError:
+        self.rejected += 1
+        return _HTTPError(503, "Servicio saturado, reintenta más tarde", {'Retry-After': '1'})
+
+    async def stats(self) -> Dict:
+        """
+        Estado del servicio.
+
+        Returns:
+            Diccionario con procesos, conexiones, cola (admitidas,
+            esperando, en curso, máximo observado y rechazadas), respuestas por estado, origen de los
+            factores, cachés e histogramas de latencia por endpoint
+        """
+        from ..core.cache import FactorCache
+
+        cache = FactorCache(self._factor_dir, self.cache_bytes)
+        factor_bytes = await asyncio.get_running_loop().run_in_executor(None, cache.size)
+        return {
+            'uptime_s': time.monotonic() - self._started,
+            'workers': self.workers,
+            'connections': {'open': self.connections, 'max': self.max_connections},
+            'queue': {
+                'admitted': self.admitted,
+                'waiting': self.waiting,
+                'running': self.running,
+                'max_waiting': self.max_waiting,
+                'max_queue': self.max_queue,
+                'rejected': self.rejected,
+            },
+            'responses': {str(status): count for status, count in sorted(self.statuses.items())},
+            'sources': dict(self.sources),
+            'uploads': {'entries': len(self._uploads), 'bytes': self._upload_total,
+                        'max_bytes': self.upload_bytes},
+            'factor_cache': {'bytes': factor_bytes, 'max_bytes': self.cache_bytes},
+            'latency': {endpoint: histogram.snapshot() for endpoint, histogram in self.latency.items()},
+        }
+
+
+def serve(host: str = '127.0.0.1', port: int = 8080, **kwargs) -> None:
+    """
+    Ejecuta el servicio hasta que se interrumpe (Ctrl+C).
+
+    Args:
+        host: Dirección de escucha
+        port: Puerto
+        **kwargs: Opciones de CompressionService
+    """
+    async def _main():
+        service = CompressionService(**kwargs)
+        server = await service.start(host, port)
+        print(f"Servicio SVD en http://{host}:{service.port} ({service.workers} procesos)", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,52 @@
+"""
+Fixtures compartidas por los tests.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import itertools
+import numpy as np
+from PIL import Image
+import pytest
+from proyecto_svd.core.svd_processor import SVDImageProcessor
+
+
+def smooth_image(height=50, width=40, channels=3, seed=0, offset=120, amplitude=60,
+                 periods=(5, 8), noise=10):
+    """
+    Imagen suave (senos y cosenos) con ruido gaussiano.
+
+    El canal c vale offset + amplitude * sin(x / (px + c)) * cos(y / py)
+    más ruido, recortado a [0, 255]. Con channels=1 la imagen es 2D.
+    """
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    px, py = periods
+    layers = [offset + amplitude * np.sin(x / (px + c)) * np.cos(y / py) + rng.normal(0, noise, (height, width))
+              for c in range(channels)]
+    img_array = np.clip(np.stack(layers, axis=-1), 0, 255).astype(np.uint8)
+    return img_array[:, :, 0] if channels == 1 else img_array
+
+
+@pytest.fixture
+def make_image():
+    """Generador de imágenes suaves con ruido (ver smooth_image)."""
+    return smooth_image
+
+
+@pytest.fixture
+def make_processor(tmp_path):
+    """Fábrica de procesadores ya descompuestos: guarda la imagen en PNG y la carga con load_image."""
+    counter = itertools.count()
+
+    def make(img_array, **kwargs):
+        path = str(tmp_path / f'imagen_{next(counter)}.png')
+        Image.fromarray(img_array).save(path)
+        processor = SVDImageProcessor(**kwargs)
+        processor.load_image(path)
+        processor.compute_svd()
+        return processor
+
+    return make
@@ -0,0 +1,149 @@
+"""
+Tests para la compresión por lotes.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import csv
+import json
+import numpy as np
+from PIL import Image
+import tempfile
+import pytest
+from proyecto_svd.core.svd_processor import SVDImageProcessor
+from proyecto_svd.utils.batch import BLAS_THREAD_VARS, blas_thread_limits, find_images, run_batch
+
+
+def create_images(directory, count=2):
+    """Crea imágenes de prueba en un subdirectorio."""
+    rng = np.random.default_rng(0)
+    os.makedirs(os.path.join(directory, 'sub'), exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, 'sub', f"img{i}.png")
+        Image.fromarray(rng.integers(0, 256, (24, 32, 3), dtype=np.uint8)).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_k_for_energy():
+    """Test el k elegido es el menor que alcanza la energía pedida."""
+    rng = np.random.default_rng(1)
+    processor = SVDImageProcessor()
+    processor.original_image = Image.fromarray(rng.integers(0, 256, (30, 40, 3), dtype=np.uint8))
+    processor.image_array = np.array(processor.original_image)
+    processor.compute_svd()
+
+    for target in (50.0, 90.0, 99.0):
+        k = processor.get_k_for_energy(target)
+        assert processor.get_energy_retained(k) >= target - 1e-6
+        if k > 1:
+            assert processor.get_energy_retained(k - 1) < target
+    assert processor.get_k_for_energy(100.0) <= processor.get_max_k()
+
+
+def test_batch_outputs_and_report():
+    """Test se escriben las salidas y el informe CSV/JSON."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = os.path.join(tmpdir, 'in')
+        output = os.path.join(tmpdir, 'out')
+        create_images(source)
+        assert len(find_images([source])) == 2
+
+        rows = run_batch([source], output, ks=[3, 5], energies=[90], workers=1,
+                         psnrs=[20], max_bytes=[2000])
+
+        assert len(rows) == 10
+        assert all(row['status'] == 'ok' for row in rows)
+        assert os.path.exists(os.path.join(output, 'sub', 'img0_k3.png'))
+        with open(os.path.join(output, 'report.csv'), newline='') as f:
+            assert len(list(csv.DictReader(f))) == 10
+        with open(os.path.join(output, 'report.json')) as f:
+            report = json.load(f)
+        energy_rows = [row for row in report if row['target_energy'] == 90]
+        assert all(row['energy_retained'] >= 90 - 1e-6 for row in energy_rows)
+        byte_rows = [row for row in report if row['target_bytes'] == 2000]
+        assert len(byte_rows) == 2 and all(row['k'] >= 1 for row in byte_rows)
+
+
+def test_batch_targets_with_the_same_k_share_one_output():
+    """Test varios k u objetivos que dan el mismo k escriben una sola salida y una sola fila."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = os.path.join(tmpdir, 'in')
+        output = os.path.join(tmpdir, 'out')
+        create_images(source, count=1)
+
+        # 1000 se limita a max_k = 24 y ambos presupuestos caben con todos los componentes
+        rows = run_batch([source], output, ks=[3, 3, 1000], max_bytes=[10 ** 8, 10 ** 9], workers=1)
+
+        assert [row['k'] for row in rows] == [3, 24]
+        assert rows[1]['target_bytes'] == 10 ** 8
+        assert len({row['output'] for row in rows}) == 2
+        assert sorted(os.listdir(os.path.join(output, 'sub'))) == ['img0_k24.png', 'img0_k3.png']
+
+
+def test_batch_resume_skips_finished_images():
+    """Test al reanudar no se repiten las imágenes terminadas."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = os.path.join(tmpdir, 'in')
+        output = os.path.join(tmpdir, 'out')
+        create_images(source)
+        run_batch([source], output, ks=[4], workers=1)
+
+        produced = os.path.join(output, 'sub', 'img0_k4.png')
+        os.remove(produced)
+        calls = []
+        rows = run_batch([source], output, ks=[4], workers=1,
+                         progress=lambda done, total, r: calls.append(done))
+        assert calls == []
+        assert not os.path.exists(produced)
+        assert len(rows) == 2
+
+        run_batch([source], output, ks=[4], workers=1, resume=False)
+        assert os.path.exists(produced)
+
+
+def test_batch_resume_detects_new_parameters_and_edited_inputs():
+    """Test al reanudar se repiten las imágenes con otros parámetros o modificadas."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source = os.path.join(tmpdir, 'in')
+        output = os.path.join(tmpdir, 'out')
+        paths = create_images(source)
+        run_batch([source], output, ks=[4], workers=1)
+
+        calls = []
+        rows = run_batch([source], output, ks=[6], workers=1,
+                         progress=lambda done, total, r: calls.append(done))
+        assert calls == [1, 2]
+        assert os.path.exists(os.path.join(output, 'sub', 'img0_k6.png'))
+        assert {row['k'] for row in rows} == {6}
+
+        # Editar una imagen (otro tamaño y fecha) la vuelve a procesar
+        Image.fromarray(np.zeros((10, 12, 3), dtype=np.uint8)).save(paths[0])
+        os.utime(paths[0], ns=(0, 10 ** 9))
+        calls.clear()
+        rows = run_batch([source], output, ks=[6], workers=1,
+                         progress=lambda done, total, r: calls.append(done))
+        assert calls == [2]
+        assert [row['width'] for row in rows if row['file'].endswith('img0.png')] == [12]
+
+
+def test_blas_thread_limits_restore_environment(monkeypatch):
+    """Test los límites de BLAS se definen dentro del bloque y el entorno se restaura al salir."""
+    monkeypatch.setenv('OMP_NUM_THREADS', '7')
+    monkeypatch.delenv('MKL_NUM_THREADS', raising=False)
+    with pytest.raises(RuntimeError):
+        with blas_thread_limits(2) as pool_options:
+            assert all(os.environ[var] == '2' for var in BLAS_THREAD_VARS)
+            assert pool_options['initargs'] == (2,)
+            raise RuntimeError
+    assert os.environ['OMP_NUM_THREADS'] == '7'
+    assert 'MKL_NUM_THREADS' not in os.environ
+
+
+def test_batch_requires_targets():
+    """Test sin k ni energía se rechaza la ejecución."""
+    with pytest.raises(ValueError):
+        run_batch([], tempfile.gettempdir())
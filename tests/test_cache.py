@@ -0,0 +1,159 @@
+"""
+Tests para la caché persistente de factores SVD.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from PIL import Image
+import tempfile
+import pytest
+from proyecto_svd.core.cache import FactorCache, FrameCache, hash_pixels
+from proyecto_svd.core.svd_processor import SVDImageProcessor
+
+
+def create_test_image(width=50, height=40, channels=3, seed=0):
+    """Crea una imagen de prueba."""
+    rng = np.random.default_rng(seed)
+    shape = (height, width, channels) if channels > 1 else (height, width)
+    return Image.fromarray(rng.integers(0, 256, shape, dtype=np.uint8))
+
+
+def test_hash_depends_on_pixels_and_settings():
+    """Test la clave cambia con los píxeles y con la configuración."""
+    img_array = np.array(create_test_image())
+    other = img_array.copy()
+    other[0, 0, 0] ^= 1
+
+    key = hash_pixels(img_array, {'engine': 'full'})
+
+    assert key == hash_pixels(img_array.copy(), {'engine': 'full'})
+    assert key != hash_pixels(other, {'engine': 'full'})
+    assert key != hash_pixels(img_array, {'engine': 'randomized'})
+
+
+@pytest.mark.parametrize('batched', [True, False])
+def test_cache_hit_skips_svd(batched, monkeypatch):
+    """Test un acierto de caché restaura los factores sin recalcular la SVD."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'img.png')
+        create_test_image().save(path)
+        cache = FactorCache(os.path.join(tmp, 'cache'))
+
+        first = SVDImageProcessor(path, batched=batched, cache=cache)
+        first.compute_svd()
+        expected = first.reconstruct_image(10)
+
+        second = SVDImageProcessor(path, batched=batched, cache=cache)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("la SVD no debería recalcularse")
+        monkeypatch.setattr(second, '_svd', fail)
+        second.compute_svd()
+
+        assert np.array_equal(second.reconstruct_image(10), expected)
+        assert second.get_energy_retained(10) == pytest.approx(first.get_energy_retained(10))
+        assert second.get_max_k() == first.get_max_k()
+
+
+def test_cache_lru_eviction():
+    """Test se expulsa la entrada usada hace más tiempo al superar el límite."""
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for seed in range(3):
+            path = os.path.join(tmp, f"img{seed}.png")
+            create_test_image(seed=seed).save(path)
+            paths.append(path)
+
+        probe = SVDImageProcessor(paths[0])
+        probe.compute_svd()
+        entry_bytes = sum(a.nbytes for a in probe.svd_components) + probe._energy_cumsums.nbytes
+        cache = FactorCache(os.path.join(tmp, 'cache'), max_bytes=int(entry_bytes * 2.5))
+
+        keys = []
+        for path in paths[:2]:
+            processor = SVDImageProcessor(path, cache=cache)
+            processor.compute_svd()
+            keys.append(hash_pixels(processor.image_array, processor._cache_settings()))
+        # Usar la primera entrada para que la segunda sea la menos reciente
+        os.utime(os.path.join(cache.cache_dir, keys[1]), ns=(1, 1))
+        assert cache.load(keys[0]) is not None
+
+        SVDImageProcessor(paths[2], cache=cache).compute_svd()
+
+        assert cache.load(keys[0]) is not None
+        assert cache.load(keys[1]) is None
+        assert cache.size() <= cache.max_bytes
+
+
+def test_frame_cache_byte_budget():
+    """Test la caché de imágenes respeta el presupuesto y cuenta aciertos."""
+    cache = FrameCache(max_bytes=250)
+    for key in 'abc':
+        cache.put(key, np.zeros(100, dtype=np.uint8))
+    assert cache.get('a') is None
+    assert cache.get('b') is not None
+    cache.put('d', np.zeros(100, dtype=np.uint8))
+
+    stats = cache.stats()
+    assert cache.get('c') is None
+    assert cache.get('b') is not None
+    assert stats['evictions'] == 2
+    assert stats['entries'] == 2
+    assert stats['bytes'] == 200
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 2
+    # Un valor mayor que el presupuesto no se guarda
+    cache.put('e', np.zeros(300, dtype=np.uint8))
+    assert cache.get('e') is None
+
+
+def test_processor_frame_cache():
+    """Test reconstrucciones repetidas salen de la caché y load_image la invalida."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'img.png')
+        create_test_image().save(path)
+        processor = SVDImageProcessor(path)
+
+        first = processor.reconstruct_image(10)
+        second = processor.reconstruct_image(10)
+        processor.reconstruct_preview(10, 20, 20)
+        processor.reconstruct_preview(10, 20, 20)
+        # k por encima del máximo comparte entrada con k = máximo
+        processor.reconstruct_image(processor.get_max_k())
+        processor.reconstruct_image(processor.get_max_k() + 5)
+        processor.get_frame_stats(10)
+        processor.get_frame_stats(10)
+
+        assert second is first
+        assert not first.flags.writeable
+        stats = processor.get_frame_cache_stats()
+        assert stats['hits'] == 4
+        assert stats['misses'] == 4
+
+        processor.load_image(path)
+        assert processor.get_frame_cache_stats()['entries'] == 0
+        assert processor.reconstruct_image(10) is not first
+
+
+@pytest.mark.parametrize('frame_cache_bytes', [0, 1000, 64 * 1024 ** 2])
+def test_reconstruction_is_read_only_with_and_without_cache(frame_cache_bytes):
+    """Test el resultado es de solo lectura tanto si cabe en la caché como si no."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'img.png')
+        create_test_image().save(path)
+        processor = SVDImageProcessor(path, frame_cache_bytes=frame_cache_bytes)
+        for frame in (processor.reconstruct_image(5), processor.reconstruct_image(5),
+                      processor.reconstruct_preview(5, 20, 20)):
+            assert not frame.flags.writeable
+            with pytest.raises(ValueError):
+                frame[0, 0] = 0
+        out = np.empty_like(processor.image_array)
+        assert processor.reconstruct_image(5, out=out).flags.writeable
+        assert processor.get_frame_cache_stats()['entries'] == (2 if frame_cache_bytes > 1000 else
+                                                                1 if frame_cache_bytes else 0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
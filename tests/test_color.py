@@ -0,0 +1,93 @@
+"""
+Tests para la descomposición en luminancia y crominancia.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from proyecto_svd.core.color import chroma_shape, iter_planes
+from proyecto_svd.core.svd_processor import SVDImageProcessor
+
+
+@pytest.fixture
+def make_color_image(make_image):
+    """Imagen con detalle en la luminancia y color suave."""
+    def make(height=45, width=62):
+        luma = make_image(height, width, channels=1, seed=3, amplitude=50, periods=(3, 4), noise=15)
+        y, x = np.mgrid[0:height, 0:width]
+        tint = np.stack([30 * np.sin(x / 20), 10 * np.cos(y / 15), -25 * np.sin((x + y) / 25)], axis=-1)
+        return np.clip(luma[:, :, np.newaxis] + tint, 0, 255).astype(np.uint8)
+    return make
+
+
+def psnr(original, reconstructed):
+    """PSNR en dB frente a la imagen original."""
+    mse = np.mean((original.astype(np.float64) - reconstructed) ** 2)
+    return 10 * np.log10(255 ** 2 / mse)
+
+
+@pytest.mark.parametrize('space', ['ycbcr', 'ycocg'])
+@pytest.mark.parametrize('batched', [True, False])
+def test_full_rank_round_trip(space, batched, make_color_image, make_processor):
+    """Test sin submuestreo y con todos los componentes se recupera la imagen."""
+    img = make_color_image()
+    processor = make_processor(img, color_space=space, batched=batched)
+    ranks = [len(s) for s in processor.svd_components[1]]
+    assert np.abs(processor.reconstruct_image(ranks).astype(int) - img).max() <= 1
+
+
+def test_subsampled_planes_and_factor_storage(make_color_image, make_processor):
+    """Test la crominancia submuestreada reduce el tamaño de los factores."""
+    img = make_color_image()
+    rgb = make_processor(img)
+    luma_chroma = make_processor(img, color_space='ycbcr', chroma_subsampling=2)
+
+    U, s, VT = luma_chroma.svd_components
+    assert [u.shape[0] for u in U] == [45, 23, 23]
+    assert [vt.shape[1] for vt in VT] == [62, 31, 31]
+    planes = list(iter_planes(img, 'ycbcr', 2))
+    assert planes[1].shape == chroma_shape(45, 62, 2) == (23, 31)
+
+    rgb_bytes = sum(a.nbytes for part in rgb.svd_components for a in part)
+    luma_chroma_bytes = sum(a.nbytes for part in luma_chroma.svd_components for a in part)
+    assert luma_chroma_bytes < 0.6 * rgb_bytes
+
+
+def test_quality_at_equal_size(make_color_image, make_processor):
+    """Test con el mismo tamaño de factores la luminancia y crominancia gana en PSNR."""
+    img = make_color_image(90, 120)
+    rgb = make_processor(img)
+    luma_chroma = make_processor(img, color_space='ycbcr', chroma_subsampling=2)
+
+    for k in (6, 12):
+        ranks = luma_chroma.allocate_ranks(budget=3 * k * (90 + 120 + 1))
+        assert luma_chroma.get_compression_ratio(ranks) >= rgb.get_compression_ratio(k)
+        assert psnr(img, luma_chroma.reconstruct_image(ranks)) > psnr(img, rgb.reconstruct_image(k))
+        # Un k común da casi todos los componentes a la luminancia
+        assert luma_chroma._frame_ranks(k) == (k, int(np.ceil(k / 4)), int(np.ceil(k / 4)))
+
+
+def test_preview_incremental_and_unsupported(make_color_image, make_processor):
+    """Test vista previa, reconstrucción incremental y operaciones solo RGB."""
+    img = make_color_image(80, 120)
+    processor = make_processor(img, color_space='ycocg', chroma_subsampling=2)
+    assert np.array_equal(processor.reconstruct_incremental(10), processor.reconstruct_image(10))
+    preview = processor.reconstruct_preview(10, 60, 60)
+    assert preview.shape == (40, 60, 3)
+    assert abs(preview.mean() - processor.reconstruct_image(10).mean()) < 2
+    assert 0 < processor.get_energy_retained(10) <= 100
+
+    with pytest.raises(ValueError):
+        processor.encode_compressed(10)
+    with pytest.raises(ValueError):
+        processor.select_rank(energy=90)
+    with pytest.raises(ValueError):
+        SVDImageProcessor(color_space='lab')
+
+    # En escala de grises el espacio de color no cambia nada
+    gray = make_processor(img[:, :, 0], color_space='ycbcr', chroma_subsampling=2)
+    assert gray.reconstruct_image(5).shape == (80, 120)
+    assert gray.get_compression_ratio(5) == pytest.approx(80 * 120 / (5 * 201))
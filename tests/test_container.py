@@ -0,0 +1,172 @@
+"""
+Tests para el formato contenedor .svdz.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from PIL import Image
+import tempfile
+import pytest
+from proyecto_svd.core.container import (MAX_PACKET_COMPONENTS, ProgressiveDecoder, decode_progressive,
+                                         decode_svdz, iter_svdz_progressive, load_svdz, read_svdz)
+from proyecto_svd.core.svd_processor import SVDImageProcessor
+
+
+def create_smooth_image(width=80, height=60, channels=3):
+    """Crea una imagen suave (bajo rango efectivo) de prueba."""
+    y, x = np.mgrid[0:height, 0:width]
+    layers = [127 + 100 * np.sin(x / (7 + c) + y / 11) * np.cos(y / (5 + c)) for c in range(channels)]
+    img_array = np.stack(layers, axis=-1).astype(np.uint8)
+    return Image.fromarray(img_array[:, :, 0] if channels == 1 else img_array)
+
+
+def load_processor(tmp, channels=3):
+    path = os.path.join(tmp, 'img.png')
+    create_smooth_image(channels=channels).save(path)
+    return SVDImageProcessor(path)
+
+
+def test_float32_roundtrip_matches_reconstruction():
+    """Test sin cuantización el decodificador reproduce reconstruct_image."""
+    with tempfile.TemporaryDirectory() as tmp:
+        processor = load_processor(tmp)
+        data = processor.encode_compressed(12, quantization='float32', codec='none')
+        decoded = decode_svdz(data)
+
+        assert decoded.dtype == np.uint8
+        assert decoded.shape == processor.image_array.shape
+        diff = decoded.astype(int) - processor.reconstruct_image(12).astype(int)
+        assert np.abs(diff).max() <= 1
+
+
+@pytest.mark.parametrize('quantization', ['float16', 'int8'])
+def test_quantized_error_is_small(quantization):
+    """Test el error añadido por la cuantización es pequeño."""
+    with tempfile.TemporaryDirectory() as tmp:
+        processor = load_processor(tmp)
+        reference = processor.reconstruct_image(20).astype(float)
+        decoded = decode_svdz(processor.encode_compressed(20, quantization=quantization)).astype(float)
+
+        rmse = np.sqrt(np.mean((decoded - reference) ** 2))
+        assert rmse < (0.5 if quantization == 'float16' else 3.0)
+
+
+def test_per_channel_ranks_and_header():
+    """Test rangos por canal y lectura de la cabecera."""
+    with tempfile.TemporaryDirectory() as tmp:
+        processor = load_processor(tmp)
+        info = read_svdz(processor.encode_compressed([10, 5, 2], codec='lzma'))
+
+        assert info['shape'] == (60, 80, 3)
+        assert info['ranks'] == [10, 5, 2]
+        assert info['quantization'] == 'int8'
+        assert info['codec'] == 'lzma'
+        assert info['components'][0][2].shape == (60, 2)
+
+
+def test_save_and_measured_ratio():
+    """Test el archivo guardado y el ratio medido frente al teórico."""
+    with tempfile.TemporaryDirectory() as tmp:
+        processor = load_processor(tmp, channels=1)
+        path = os.path.join(tmp, 'img.svdz')
+        written = processor.save_compressed(path, 10)
+
+        assert written == os.path.getsize(path)
+        assert load_svdz(path).shape == (60, 80)
+        measured = processor.get_measured_compression_ratio(10)
+        assert measured == pytest.approx(processor.image_array.nbytes / written)
+        # int8 ocupa un byte por valor, como la imagen original
+        assert measured > processor.get_compression_ratio(10) * 0.8
+
+
+def test_invalid_container():
+    """Test datos que no son .svdz producen ValueError."""
+    with pytest.raises(ValueError):
+        decode_svdz(b'PNG!' + bytes(20))
+
+
+
+@pytest.mark.parametrize('quantization', ['float16', 'int8'])
+def test_progressive_layout_matches_planar(quantization):
+    """Test la disposición progresiva guarda los mismos factores que la normal."""
+    with tempfile.TemporaryDirectory() as tmp:
+        processor = load_processor(tmp)
+        planar = read_svdz(processor.encode_compressed([12, 6, 0], quantization))
+        progressive = read_svdz(processor.encode_compressed([12, 6, 0], quantization, progressive=True))
+
+        assert progressive['progressive'] and not planar['progressive']
+        assert progressive['ranks'] == [12, 6, 0]
+        for a, b in zip(planar['components'], progressive['components']):
+            for x, y in zip(a, b):
+                assert x.shape == y.shape and np.array_equal(x, y)
+
+        path = os.path.join(tmp, 'img.svdz')
+        processor.save_compressed(path, 20, progressive=True)
+        assert np.array_equal(load_svdz(path), decode_svdz(processor.encode_compressed(20)))
+
+
+def test_progressive_decoder_milestones():
+    """Test el decodificador genera imágenes cada vez más finas en los hitos."""
+    with tempfile.TemporaryDirectory() as tmp:
+        processor = load_processor(tmp)
+        chunks = list(processor.iter_progressive(30, batch_size=4))
+        data = b''.join(chunks)
+        # Orden global por valor singular
+        s = np.concatenate([processor.get_singular_values()[c][:30] for c in range(3)])
+        decoder = ProgressiveDecoder(milestones=(1, 5, 10, 100))
+        frames, fed = [], 0
+        for start in range(0, len(data), 97):
+            chunk = data[start:start + 97]
+            fed += len(chunk)
+            for k, frame in decoder.feed(chunk):
+                frames.append((k, frame, fed))
+        assert decoder.done and decoder.received == 90
+        assert [k for k, _, _ in frames] == [1, 5, 10, 30]
+        # La primera imagen llega con una pequeña parte de los datos
+        assert frames[0][2] < 0.1 * len(data)
+
+        original = processor.image_array.astype(float)
+        errors = [np.mean(np.abs(frame - original)) for _, frame, _ in frames]
+        assert errors == sorted(errors, reverse=True)
+        assert np.abs(frames[-1][1].astype(int) - decode_svdz(data)).max() <= 1
+
+        # La imagen del hito k usa los k·canales componentes de mayor valor singular
+        order = np.argsort(-s, kind='stable')[:15]
+        ranks = [int(np.sum(order // 30 == c)) for c in range(3)]
+        reference = decode_svdz(processor.encode_compressed(ranks, progressive=True))
+        assert np.abs(frames[1][1].astype(int) - reference).max() <= 1
+
+        assert [k for k, _ in decode_progressive(chunks, milestones=(30,))] == [30]
+
+
+def test_progressive_batch_size_is_capped():
+    """Test un batch_size mayor que el recuento uint16 del paquete se limita en lugar de fallar."""
+    rank = MAX_PACKET_COMPONENTS + 10
+    rng = np.random.default_rng(0)
+    components = ([rng.random((2, rank), dtype=np.float32)], [np.sort(rng.random(rank, dtype=np.float32))[::-1]],
+                  [rng.random((rank, 3), dtype=np.float32)])
+    chunks = list(iter_svdz_progressive(components, (2, 3), rank, 'float32', 'none', batch_size=10 ** 6))
+    assert len(chunks) == 3
+    container = read_svdz(b''.join(chunks))
+    assert container['ranks'] == [rank]
+    assert np.array_equal(container['components'][0][0], components[0][0])
+
+
+def test_progressive_errors():
+    """Test flujos truncados y contenedores no progresivos."""
+    with tempfile.TemporaryDirectory() as tmp:
+        processor = load_processor(tmp)
+        data = processor.encode_compressed(10, progressive=True)
+        with pytest.raises(ValueError):
+            read_svdz(data[:-5])
+        decoder = ProgressiveDecoder()
+        assert list(decoder.feed(data[:10])) == [] and decoder.info is None
+        assert list(decoder.feed(data[10:-5])) and not decoder.done
+        with pytest.raises(ValueError):
+            list(ProgressiveDecoder().feed(processor.encode_compressed(10)))
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
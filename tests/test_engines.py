@@ -0,0 +1,261 @@
+"""
+Tests para los motores de descomposición SVD.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from PIL import Image
+import logging
+import tempfile
+import pytest
+from proyecto_svd.core.engines import choose_backend, full_svd, gram_svd, qr_svd, randomized_svd
+from proyecto_svd.core.instrumentation import Instrumentation, MemorySink
+from proyecto_svd.core.svd_processor import ComputationCancelled, SVDImageProcessor
+
+
+def create_low_rank_image(width=120, height=90, channels=3, rank=8, seed=0):
+    """Crea una imagen de bajo rango con algo de ruido."""
+    rng = np.random.default_rng(seed)
+    layers = []
+    for _ in range(channels):
+        base = rng.random((height, rank)) @ rng.random((rank, width))
+        layers.append(base / base.max() * 230 + rng.normal(0, 2, (height, width)))
+    img_array = np.clip(np.stack(layers, axis=-1), 0, 255).astype(np.uint8)
+    if channels == 1:
+        img_array = img_array[:, :, 0]
+    return Image.fromarray(img_array)
+
+
+def test_randomized_svd_matches_full_spectrum():
+    """Test los valores singulares aleatorizados coinciden con los exactos."""
+    rng = np.random.default_rng(1)
+    mat = rng.random((200, 10)) @ rng.random((10, 150))
+    U, s, VT = randomized_svd(mat, 10, random_state=0)
+    s_exact = np.linalg.svd(mat, compute_uv=False)
+
+    assert U.shape == (200, 10)
+    assert VT.shape == (10, 150)
+    assert np.allclose(s, s_exact[:10], rtol=1e-6)
+    assert np.allclose((U * s) @ VT, mat, atol=1e-8)
+
+
+def test_randomized_svd_stacked():
+    """Test el motor aleatorizado acepta una pila de canales."""
+    rng = np.random.default_rng(2)
+    stack = rng.random((3, 60, 5)) @ rng.random((3, 5, 40))
+    U, s, VT = randomized_svd(stack, 5, random_state=0)
+
+    assert U.shape == (3, 60, 5)
+    assert s.shape == (3, 5)
+    assert VT.shape == (3, 5, 40)
+    for i in range(3):
+        assert np.allclose((U[i] * s[i]) @ VT[i], stack[i], atol=1e-8)
+
+
+def test_processor_randomized_engine():
+    """Test el procesador con motor aleatorizado y rango objetivo."""
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+        img = create_low_rank_image()
+        img.save(f.name)
+
+        full = SVDImageProcessor(f.name)
+        fast = SVDImageProcessor(f.name, engine='randomized', rank=20, random_state=0)
+        U_channels, s_channels, VT_channels = fast.compute_svd()
+
+        assert fast.get_max_k() == 20
+        assert U_channels[0].shape == (90, 20)
+        assert VT_channels[0].shape == (20, 120)
+        assert fast.reconstruct_image(10).shape == full.image_array.shape
+        # La energía se mide respecto a la imagen completa, no al rango calculado
+        assert fast.get_energy_retained(20) < 100
+        assert abs(fast.get_energy_retained(8) - full.get_energy_retained(8)) < 0.1
+
+        os.unlink(f.name)
+
+
+def test_engine_accuracy_report():
+    """Test informe de precisión frente a la SVD completa."""
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+        img = create_low_rank_image(channels=1)
+        img.save(f.name)
+
+        processor = SVDImageProcessor(f.name, engine='randomized', rank=15, random_state=0)
+        report = processor.get_engine_accuracy()
+
+        assert len(report) == 1
+        assert report[0]['rank'] == 15
+        assert report[0]['residual_error'] >= report[0]['optimal_error'] - 1e-6
+        assert report[0]['excess_error'] < 0.05
+        assert report[0]['max_singular_value_error'] < 1e-3
+
+        os.unlink(f.name)
+
+
+def test_batched_matches_per_channel():
+    """Test la ruta por lotes coincide con el bucle por canal."""
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+        img_array = np.random.default_rng(3).integers(0, 256, (40, 30, 4), dtype=np.uint8)
+        Image.fromarray(img_array).save(f.name)
+
+        batched = SVDImageProcessor(f.name)
+        loop = SVDImageProcessor(f.name, batched=False)
+        U_stack, s_stack, VT_stack = batched.compute_svd()
+        _, s_list, _ = loop.compute_svd()
+
+        assert U_stack.shape == (4, 40, 30)
+        assert s_stack.shape == (4, 30)
+        assert VT_stack.shape == (4, 30, 30)
+        assert U_stack.flags['C_CONTIGUOUS'] and VT_stack.flags['C_CONTIGUOUS']
+        for i in range(4):
+            assert np.allclose(s_stack[i], s_list[i], rtol=1e-4)
+        for k in (1, 10, 30):
+            diff = batched.reconstruct_image(k).astype(int) - loop.reconstruct_image(k).astype(int)
+            assert np.abs(diff).max() <= 1
+            assert abs(batched.get_energy_retained(k) - loop.get_energy_retained(k)) < 1e-3
+
+        os.unlink(f.name)
+
+
+@pytest.mark.parametrize("backend", ["gesdd", "gesvd", "numpy", "qr", "gram", "auto"])
+@pytest.mark.parametrize("dtype", ["float32", "float64"])
+def test_backends_and_dtypes(backend, dtype):
+    """Test todos los backends y precisiones dan el mismo espectro."""
+    img = create_low_rank_image(50, 40)
+    reference = np.linalg.svd(np.asarray(img, dtype=np.float64).transpose(2, 0, 1), compute_uv=False)
+
+    processor = SVDImageProcessor(backend=backend, dtype=dtype)
+    processor.original_image = img
+    processor.image_array = np.array(img)
+    U, s, VT = processor.compute_svd()
+
+    assert U.dtype == np.dtype(dtype) and s.dtype == np.dtype(dtype)
+    rtol = 1e-4 if dtype == 'float32' else 1e-10
+    assert np.allclose(s, reference, rtol=rtol, atol=rtol * reference.max())
+    diff = processor.reconstruct_image(40).astype(int) - np.array(img).astype(int)
+    assert np.abs(diff).max() <= 1
+
+
+@pytest.mark.parametrize("shape", [(600, 40), (40, 600), (3, 500, 60)])
+@pytest.mark.parametrize("backend", ["qr", "gram"])
+def test_rectangular_backends_match_gesdd(shape, backend):
+    """Test las rutas QR y Gram coinciden con gesdd en matrices muy rectangulares."""
+    rng = np.random.default_rng(5)
+    mat = (rng.random(shape) * 255).astype(np.float32)
+    svd = qr_svd if backend == 'qr' else gram_svd
+    U, s, VT = svd(mat)
+    for i, channel in enumerate(mat.reshape((-1,) + shape[-2:])):
+        U_c, s_c, VT_c = (U[i], s[i], VT[i]) if mat.ndim == 3 else (U, s, VT)
+        _, s_ref, _ = full_svd(channel.astype(np.float64))
+        assert np.allclose(s_c, s_ref, rtol=1e-4, atol=1e-4 * s_ref[0])
+        assert np.abs((U_c * s_c) @ VT_c - channel).max() < 0.05
+        r = len(s_c)
+        assert np.allclose(U_c.T @ U_c, np.eye(r), atol=1e-3)
+        assert np.allclose(VT_c @ VT_c.T, np.eye(r), atol=1e-4)
+
+
+def test_gram_float64_accumulation_keeps_small_singular_values():
+    """Test acumular la matriz de Gram en float64 conserva los valores singulares pequeños."""
+    rng = np.random.default_rng(6)
+    # Espectro de 1e4 a 1e-1: en float32 la cola se pierde al elevar al cuadrado
+    Q1, _ = np.linalg.qr(rng.normal(size=(800, 30)))
+    Q2, _ = np.linalg.qr(rng.normal(size=(30, 30)))
+    s_true = np.logspace(4, -1, 30)
+    mat = ((Q1 * s_true) @ Q2.T).astype(np.float32)
+    _, s_ref, _ = full_svd(mat.astype(np.float64))
+
+    _, s64, _ = gram_svd(mat, accumulate='float64')
+    _, s32, _ = gram_svd(mat, accumulate='float32')
+    error64 = np.abs(s64 - s_ref) / s_ref
+    error32 = np.abs(s32 - s_ref) / s_ref
+    assert error64.max() < 1e-2
+    assert error32[-5:].max() > 10 * error64[-5:].max()
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_gram_rank_deficient_columns_are_orthonormal(dtype):
+    """Test con una matriz alta casi de rango 1 las columnas de U que quedan son ortonormales."""
+    y = np.linspace(0, 1, 3000)[:, np.newaxis]
+    x = np.linspace(0, 1, 300)[np.newaxis, :]
+    # Degradado RGB: rango 2 por canal, el resto de valores singulares es ruido numérico
+    mat = np.stack([255 * (a * y + b * x) for a, b in ((0.3, 0.7), (0.5, 0.5), (0.9, 0.1))]).astype(dtype)
+    assert choose_backend(3000, 300) == 'gram'
+
+    U, s, VT = gram_svd(mat)
+    for U_c, s_c, VT_c, channel in zip(U, s, VT, mat):
+        kept = np.linalg.norm(U_c, axis=0) > 0
+        assert kept.sum() == 2
+        assert np.allclose(U_c[:, kept].T @ U_c[:, kept], np.eye(2), atol=1e-5)
+        assert np.abs((U_c * s_c) @ VT_c - channel).max() < 0.01
+
+
+def test_auto_backend_by_shape(caplog):
+    """Test el backend automático depende de la forma y se registra."""
+    assert choose_backend(512, 512) == 'gesdd'
+    assert choose_backend(300, 900) == 'qr'
+    assert choose_backend(30000, 800) == 'gram'
+
+    rng = np.random.default_rng(7)
+    img_array = rng.integers(0, 256, (24, 400, 3), dtype=np.uint8)
+    sink = MemorySink()
+    processor = SVDImageProcessor(instrumentation=Instrumentation([sink], trace_memory=False))
+    processor.image_array = img_array
+    with caplog.at_level(logging.INFO, logger='proyecto_svd.core.svd_processor'):
+        processor.compute_svd()
+    assert processor.svd_backend == 'gram'
+    assert 'gram' in caplog.text
+    assert [r['backend'] for r in sink.records if r['stage'] == 'svd'] == ['gram']
+
+    reference = SVDImageProcessor(backend='gesdd')
+    reference.image_array = img_array
+    reference.compute_svd()
+    for k in (1, 8, 24):
+        diff = processor.reconstruct_image(k).astype(int) - reference.reconstruct_image(k).astype(int)
+        assert np.abs(diff).max() <= 1
+        assert processor.get_energy_retained(k) == pytest.approx(reference.get_energy_retained(k), abs=1e-3)
+
+
+def test_unknown_backend_and_dtype():
+    """Test backend o precisión desconocidos."""
+    with pytest.raises(ValueError):
+        SVDImageProcessor(backend='magma')
+    with pytest.raises(ValueError):
+        SVDImageProcessor(dtype='float16')
+    with pytest.raises(ValueError):
+        SVDImageProcessor(accumulate='float16')
+
+
+def test_progress_and_cancellation():
+    """Test progreso por canal y cancelación entre canales."""
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+        create_low_rank_image().save(f.name)
+
+        processor = SVDImageProcessor(f.name)
+        calls = []
+        U_stack, _, _ = processor.compute_svd(progress=lambda done, total: calls.append((done, total)))
+
+        assert calls == [(1, 3), (2, 3), (3, 3)]
+        assert U_stack.shape == (3, 90, 90)
+
+        class CancelAfterFirst:
+            def is_set(self):
+                return len(steps) >= 1
+        steps = []
+        with pytest.raises(ComputationCancelled):
+            SVDImageProcessor(f.name).compute_svd(progress=lambda d, t: steps.append(d),
+                                                  cancel_event=CancelAfterFirst())
+        assert steps == [1]
+
+        os.unlink(f.name)
+
+
+def test_unknown_engine():
+    """Test un motor desconocido produce ValueError."""
+    with pytest.raises(ValueError):
+        SVDImageProcessor(engine='magic')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
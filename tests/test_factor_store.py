@@ -0,0 +1,90 @@
+"""
+Tests para el almacén compacto de factores.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from proyecto_svd.core.factor_store import CompactFactors, QuantizedMatrix
+from proyecto_svd.core.quantization import dequantize_int8_blocks
+from proyecto_svd.core.svd_processor import SVDImageProcessor
+
+
+def unclipped(components, k):
+    """Reconstrucción float64 sin recortar, canal a canal."""
+    U, s, VT = components
+    return np.stack([(np.asarray(U[c][:, :k], dtype=np.float64) * s[c][:k]) @ VT[c][:k, :]
+                     for c in range(len(s))], axis=-1)
+
+
+@pytest.mark.parametrize('axis,shape', [(0, (150, 12)), (1, (12, 150))])
+def test_quantized_matrix_slices(axis, shape):
+    """Test cualquier selección descuantiza igual que la matriz completa."""
+    rng = np.random.default_rng(0)
+    mat = rng.normal(size=shape).astype(np.float32)
+    matrix = QuantizedMatrix(mat, 'int8', axis=axis, block=64)
+    full = dequantize_int8_blocks(matrix.values, matrix.scales, axis, 64)
+
+    # El error por elemento no supera la mitad de la escala de su bloque
+    scales = np.repeat(matrix.scales, 64, axis=0)[:shape[axis]]
+    assert np.all(np.abs(full - mat) <= (scales if axis == 0 else scales.T) / 2 + 1e-6)
+    assert np.array_equal(np.asarray(matrix), full)
+    for key in [(slice(None), slice(0, 5)), (slice(3, 9), slice(None)), (slice(2, 11), slice(1, 100)),
+                (np.array([0, 7, 11]), slice(None, 4))]:
+        assert np.array_equal(matrix[key], full[key])
+
+
+@pytest.mark.parametrize('storage', ['float16', 'int8'])
+def test_error_is_bounded(storage, make_image, make_processor):
+    """Test el error añadido por la cuantización respeta la cota y es pequeño."""
+    img = make_image(70, 90, seed=8, amplitude=70, periods=(6, 9), noise=8)
+    reference = make_processor(img)
+    compact = make_processor(img, storage=storage)
+    assert isinstance(compact.svd_components, CompactFactors)
+
+    pixels = img.shape[0] * img.shape[1]
+    for k in (1, 10, 40, 70):
+        error = unclipped(compact.svd_components, k) - unclipped(reference.svd_components, k)
+        bound = compact.get_storage_error_bound(k)
+        for c in range(3):
+            assert np.linalg.norm(error[:, :, c]) <= bound['frobenius'][c] * (1 + 1e-4) + 1e-3
+        assert np.sqrt(np.sum(error ** 2) / (3 * pixels)) <= bound['rmse'] * (1 + 1e-4) + 1e-3
+        assert bound['rmse'] < (0.1 if storage == 'float16' else 2.0)
+        diff = compact.reconstruct_image(k).astype(int) - reference.reconstruct_image(k).astype(int)
+        # Tras truncar a uint8 solo cambian unidades sueltas
+        assert np.abs(diff).max() <= (1 if storage == 'float16' else 4)
+
+
+def test_footprint_and_truncation(make_image, make_processor):
+    """Test la memoria de los factores baja con float16, int8 y el rango máximo."""
+    img = make_image(70, 90, seed=8, amplitude=70, periods=(6, 9), noise=8)
+    sizes = {}
+    for storage, max_rank in (('float32', None), ('float16', None), ('int8', None), ('int8', 20)):
+        footprint = make_processor(img, storage=storage, max_rank=max_rank).get_memory_footprint()
+        assert footprint['image_bytes'] == img.nbytes
+        sizes[(storage, max_rank)] = footprint['factors_bytes']
+    assert sizes[('float16', None)] < 0.55 * sizes[('float32', None)]
+    assert sizes[('int8', None)] < 0.3 * sizes[('float32', None)]
+    assert sizes[('int8', 20)] < img.nbytes
+
+    processor = make_processor(img, storage='int8', max_rank=20)
+    reference = make_processor(img)
+    assert processor.get_max_k() == 20
+    # La energía total incluye lo descartado
+    assert processor.get_energy_retained(20) == pytest.approx(reference.get_energy_retained(20))
+    assert processor.get_energy_retained(50) == pytest.approx(reference.get_energy_retained(20))
+    for k in (5, 12, 20, 8):
+        diff = processor.reconstruct_incremental(k).astype(int) - processor.reconstruct_image(k).astype(int)
+        assert np.abs(diff).max() <= 1
+    assert processor.reconstruct_preview(10, 45, 45).shape == (35, 45, 3)
+    assert processor.get_storage_error_bound(10)['rmse'] > 0
+    assert reference.get_storage_error_bound(10)['rmse'] == 0.0
+
+
+def test_unknown_storage():
+    """Test almacenamiento desconocido."""
+    with pytest.raises(ValueError):
+        SVDImageProcessor(storage='int4')
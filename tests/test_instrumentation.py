@@ -0,0 +1,103 @@
+"""
+Tests para la instrumentación por etapas.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import io
+import json
+import logging
+import numpy as np
+from PIL import Image
+import tempfile
+from proyecto_svd.core.instrumentation import (NULL_STAGE, Instrumentation, JsonLinesSink,
+                                               LoggingSink, MemorySink)
+from proyecto_svd.core.svd_processor import SVDImageProcessor
+
+
+def create_test_file(width=60, height=40, channels=3):
+    """Guarda una imagen aleatoria y devuelve su ruta."""
+    rng = np.random.default_rng(0)
+    f = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
+    f.close()
+    Image.fromarray(rng.integers(0, 256, (height, width, channels), dtype=np.uint8)).save(f.name)
+    return f.name
+
+
+def test_processor_stages():
+    """Test se registran las etapas de carga, SVD y reconstrucción."""
+    path = create_test_file()
+    instrumentation = Instrumentation()
+    try:
+        processor = SVDImageProcessor(path, instrumentation=instrumentation)
+        processor.compute_svd()
+        processor.reconstruct_image(5)
+        processor.reconstruct_preview(5, 20, 20)
+
+        summary = instrumentation.memory.summary()
+        for stage in ('load_image', 'cast', 'svd', 'astype', 'energy', 'compute_svd',
+                      'kernel', 'reconstruct_image', 'preview'):
+            assert stage in summary
+        # La conversión crea una pila float32 de 3 x 40 x 60
+        assert summary['cast']['peak_bytes'] >= 3 * 40 * 60 * 4
+        # El pico de la etapa padre incluye el de sus etapas internas
+        assert summary['compute_svd']['peak_bytes'] >= summary['cast']['peak_bytes']
+        assert summary['compute_svd']['wall_s'] >= summary['svd']['wall_s']
+    finally:
+        instrumentation.close()
+        os.unlink(path)
+
+
+def test_per_channel_records():
+    """Test en modo por canal cada canal tiene su medición."""
+    path = create_test_file()
+    instrumentation = Instrumentation(trace_memory=False)
+    processor = SVDImageProcessor(path, instrumentation=instrumentation)
+    processor.compute_svd(progress=lambda done, total: None)
+
+    channels = [r['channel'] for r in instrumentation.memory.records if r['stage'] == 'svd']
+    assert channels == [0, 1, 2]
+    assert all(r['peak_bytes'] is None for r in instrumentation.memory.records)
+    os.unlink(path)
+
+
+def test_sinks():
+    """Test los sumideros JSON lines y logging reciben las mediciones."""
+    stream = io.StringIO()
+    logger = logging.getLogger('test_instrumentation')
+    handler_stream = io.StringIO()
+    handler = logging.StreamHandler(handler_stream)
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    instrumentation = Instrumentation([JsonLinesSink(stream), LoggingSink(logger)],
+                                      trace_memory=False)
+    with instrumentation.stage('decode', channel=1, path='x.png'):
+        sum(range(1000))
+
+    record = json.loads(stream.getvalue())
+    assert record['stage'] == 'decode' and record['channel'] == 1
+    assert record['path'] == 'x.png'
+    assert record['wall_s'] >= 0 and record['cpu_s'] >= 0
+    assert 'decode canal=1' in handler_stream.getvalue()
+    logger.removeHandler(handler)
+
+
+def test_disabled_is_null():
+    """Test sin instrumentación se usa el contexto nulo compartido."""
+    processor = SVDImageProcessor()
+    assert processor._stage('svd') is NULL_STAGE
+
+
+def test_error_is_recorded():
+    """Test una etapa que falla queda registrada con el error."""
+    sink = MemorySink()
+    instrumentation = Instrumentation([sink], trace_memory=False)
+    try:
+        with instrumentation.stage('svd'):
+            raise ValueError("fallo")
+    except ValueError:
+        pass
+    assert sink.records[-1]['error'] == 'ValueError'
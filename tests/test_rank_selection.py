@@ -0,0 +1,152 @@
+"""
+Tests para la selección automática del rango.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from proyecto_svd.core.container import encode_svdz, svdz_size
+from proyecto_svd.core.rank_selection import QUANTIZATION_RMSE, water_fill_ranks
+
+
+@pytest.fixture
+def smooth_processor(make_image, make_processor):
+    """Procesador ya descompuesto de una imagen suave con ruido."""
+    def make(width=48, height=36, channels=3, seed=0, batched=True):
+        return make_processor(make_image(height, width, channels, seed, periods=(5, 7)), batched=batched)
+    return make
+
+
+def unclipped_error(processor, ks):
+    """Error cuadrático (suma) por canal de la aproximación sin recortar."""
+    U, s, VT = processor.svd_components
+    img = np.asarray(processor.image_array, dtype=np.float64)
+    if img.ndim == 2:
+        img = img[:, :, np.newaxis]
+    errors = []
+    for c, k in enumerate(ks):
+        approx = (U[c][:, :k].astype(np.float64) * s[c][:k]) @ VT[c][:k, :]
+        errors.append(float(np.sum((img[:, :, c] - approx) ** 2)))
+    return errors
+
+
+@pytest.mark.parametrize("batched", [True, False])
+def test_energy_matches_brute_force(batched, smooth_processor):
+    """Test el k elegido coincide con la búsqueda lineal sobre get_energy_retained."""
+    processor = smooth_processor(batched=batched)
+    max_k = processor.get_max_k()
+    for target in (40.0, 90.0, 99.0, 99.9):
+        expected = next((k for k in range(1, max_k + 1)
+                         if processor.get_energy_retained(k) >= target), max_k)
+        assert processor.select_rank(energy=target) == expected
+
+
+def test_psnr_and_rmse_bounds(smooth_processor):
+    """Test el error float deja el margen del redondeo a uint8 y k - 1 no lo deja."""
+    processor = smooth_processor()
+    h, w, c = processor.image_array.shape
+    for psnr in (25.0, 30.0, 35.0):
+        k = processor.select_rank(psnr=psnr)
+        budget = 255 / 10 ** (psnr / 20) - QUANTIZATION_RMSE
+        assert np.sqrt(sum(unclipped_error(processor, [k] * c)) / (h * w * c)) <= budget + 1e-6
+        if k > 1:
+            assert np.sqrt(sum(unclipped_error(processor, [k - 1] * c)) / (h * w * c)) > budget
+
+    k = processor.select_rank(rmse=8.0)
+    assert np.sqrt(sum(unclipped_error(processor, [k] * c)) / (h * w * c)) <= 7.5 + 1e-6
+
+
+@pytest.mark.parametrize("channels", [3, 1])
+def test_psnr_holds_for_uint8_reconstruction(channels, smooth_processor):
+    """Test el PSNR medido sobre reconstruct_image cumple el objetivo, incluso cerca de la cuantización."""
+    processor = smooth_processor(width=96, height=80, channels=channels, seed=3)
+    img = np.asarray(processor.image_array, dtype=np.float64)
+    for psnr in (30.0, 40.0, 45.0, 48.0, 50.0, 60.0):
+        k = processor.select_rank(psnr=psnr)
+        mse = np.mean((img - processor.reconstruct_image(k)) ** 2)
+        assert mse == 0 or 10 * np.log10(255 ** 2 / mse) >= psnr
+    for rmse in (4.0, 1.0, 0.6):
+        k = processor.select_rank(rmse=rmse)
+        assert np.sqrt(np.mean((img - processor.reconstruct_image(k)) ** 2)) <= rmse
+
+
+def test_per_channel_targets(smooth_processor):
+    """Test por canal cada canal cumple el objetivo por separado."""
+    processor = smooth_processor()
+    h, w, _ = processor.image_array.shape
+    ks = processor.select_rank(psnr=32.0, per_channel=True)
+    assert len(ks) == 3
+    for error in unclipped_error(processor, ks):
+        assert 10 * np.log10(255 ** 2 / (error / (h * w))) >= 32.0 - 1e-6
+
+    ks = processor.select_rank(energy=95.0, per_channel=True)
+    cumsums = processor._energy_cumsums
+    for c, k in enumerate(ks):
+        assert cumsums[c][k - 1] >= 0.95 * processor._energy_totals[c] * (1 - 1e-9)
+
+
+def test_byte_budget(smooth_processor):
+    """Test con solo presupuesto se elige el mayor k que cabe."""
+    processor = smooth_processor()
+    shape = processor.image_array.shape
+    budget = 4000
+    k = processor.select_rank(max_bytes=budget)
+    assert svdz_size(shape, k) <= budget < svdz_size(shape, k + 1)
+    data = encode_svdz(processor.svd_components, shape, k, codec='none')
+    assert len(data) <= budget
+
+    ks = processor.select_rank(max_bytes=budget, per_channel=True)
+    assert svdz_size(shape, ks) <= budget
+
+    # El presupuesto prevalece sobre un objetivo de calidad inalcanzable
+    assert processor.select_rank(energy=99.99, max_bytes=budget) == k
+    ks = processor.select_rank(energy=99.99, max_bytes=budget, per_channel=True)
+    assert svdz_size(shape, ks) <= budget
+
+
+def test_water_filling_beats_uniform_k(make_processor):
+    """Test con el mismo tamaño el reparto por canal da más PSNR que un k común."""
+    rng = np.random.default_rng(2)
+    y, x = np.mgrid[0:48, 0:64]
+    # Un canal casi plano, uno suave y uno ruidoso: espectros muy distintos
+    layers = [128 + 4 * np.sin(x / 9),
+              120 + 60 * np.sin(x / 5) * np.cos(y / 7),
+              128 + rng.normal(0, 40, (48, 64))]
+    img_array = np.clip(np.stack(layers, axis=-1), 0, 255).astype(np.uint8)
+    processor = make_processor(img_array)
+    shape = img_array.shape
+
+    for k in (4, 10, 20):
+        ks = processor.allocate_ranks(k=k)
+        assert sum(ks) == 3 * k
+        assert svdz_size(shape, ks) == svdz_size(shape, k)
+        assert sum(unclipped_error(processor, ks)) < sum(unclipped_error(processor, [k] * 3))
+
+    budget = svdz_size(shape, 8)
+    ks = processor.allocate_ranks(max_bytes=budget)
+    assert svdz_size(shape, ks) <= budget
+    assert len(encode_svdz(processor.svd_components, shape, ks, codec='none')) <= budget
+    with pytest.raises(ValueError):
+        processor.allocate_ranks()
+
+
+def test_water_fill_ranks_greedy():
+    """Test el reparto toma los componentes de mayor energía por parámetro."""
+    spectra = [np.array([10.0, 9.0, 8.0]), np.array([10.0, 1.0, 0.5])]
+    assert water_fill_ranks(spectra, [1, 1], 4) == [3, 1]
+    assert water_fill_ranks(spectra, [1, 1], 1) == [1, 1]
+    # Un canal más caro recibe menos componentes con la misma energía
+    assert water_fill_ranks([np.array([5.0, 4.0, 3.0])] * 2, [1, 4], 7) == [3, 1]
+
+
+def test_grayscale_and_errors(smooth_processor):
+    """Test escala de grises y objetivo ausente."""
+    processor = smooth_processor(channels=1)
+    k = processor.select_rank(energy=90.0)
+    assert processor.get_energy_retained(k) >= 90.0 - 1e-9
+    assert processor.select_rank(energy=90.0, per_channel=True) == [k]
+    with pytest.raises(ValueError):
+        processor.select_rank()
@@ -0,0 +1,64 @@
+"""
+Tests para la curva tasa-distorsión.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def saturated_processor(make_image, make_processor):
+    """Procesador de una imagen que satura en parte (para que haya recorte)."""
+    def make(channels=3, batched=True, engine='full'):
+        img_array = make_image(40, 56, channels, seed=4, offset=140, amplitude=140, periods=(4, 6), noise=12)
+        return make_processor(img_array, batched=batched, engine=engine, rank=20)
+    return make
+
+
+@pytest.mark.parametrize("channels,batched", [(3, True), (3, False), (1, True)])
+def test_curve_matches_per_k_metrics(channels, batched, saturated_processor):
+    """Test la curva coincide con las métricas por k y con el error sin recortar."""
+    processor = saturated_processor(channels, batched)
+    curve = processor.get_rate_distortion()
+    max_k = processor.get_max_k()
+    assert len(curve['k']) == max_k
+
+    U, s, VT = processor.svd_components
+    img = np.asarray(processor.image_array, dtype=np.float64).reshape(40, 56, -1)
+    for k in (1, 5, 17, max_k - 1):
+        assert curve['compression_ratio'][k - 1] == pytest.approx(processor.get_compression_ratio(k))
+        assert curve['energy_retained'][k - 1] == pytest.approx(processor.get_energy_retained(k))
+        approx = np.stack([(U[c][:, :k].astype(np.float64) * s[c][:k]) @ VT[c][:k, :]
+                           for c in range(channels)], axis=-1)
+        mse = np.mean((img - approx) ** 2)
+        assert curve['mse'][k - 1] == pytest.approx(mse, rel=1e-3, abs=1e-3)
+        assert curve['psnr'][k - 1] == pytest.approx(10 * np.log10(255 ** 2 / mse), abs=1e-2)
+    assert np.all(np.diff(curve['mse']) <= 1e-6)
+
+
+def test_clipping_correction_tracks_real_error(saturated_processor):
+    """Test la corrección por recorte se acerca al error de reconstruct_image."""
+    processor = saturated_processor()
+    curve = processor.get_rate_distortion(clip_samples=10, sample_rows=40)
+    img = np.asarray(processor.image_array, dtype=np.float64)
+    for k in curve['sampled_k']:
+        real = np.mean((img - processor.reconstruct_image(int(k))) ** 2)
+        # Con todas las filas muestreadas los rangos medidos son casi exactos
+        # (solo difieren por la precisión float32 de los factores)
+        assert curve['mse_corrected'][k - 1] == pytest.approx(real, rel=1e-3, abs=0.1)
+    for k in (3, 12, 25):
+        real = np.mean((img - processor.reconstruct_image(k)) ** 2)
+        assert abs(curve['mse_corrected'][k - 1] - real) < abs(curve['mse'][k - 1] - real) + 0.5
+
+
+def test_truncated_engine_uses_frobenius_total(saturated_processor):
+    """Test con SVD truncada el error incluye la energía no calculada."""
+    processor = saturated_processor(engine='randomized')
+    curve = processor.get_rate_distortion()
+    assert len(curve['k']) == 20
+    assert curve['mse'][-1] > 0
+    assert np.isfinite(curve['psnr']).all()
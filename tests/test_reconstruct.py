@@ -0,0 +1,215 @@
+"""
+Tests para los núcleos de reconstrucción.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from PIL import Image
+import tempfile
+import tracemalloc
+import pytest
+from proyecto_svd.core.reconstruct import (BLOCK_BYTES, IncrementalReconstructor, box_downsample,
+                                           preview_size, reconstruct_into,
+                                           reconstruct_stacked_into)
+from proyecto_svd.core.svd_processor import SVDImageProcessor
+
+
+def create_test_image(width=70, height=50, channels=3):
+    """Crea una imagen de prueba."""
+    shape = (height, width, channels) if channels > 1 else (height, width)
+    return Image.fromarray(np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8))
+
+
+def test_reconstruct_into_matches_matmul():
+    """Test la reconstrucción por bloques equivale al producto directo."""
+    rng = np.random.default_rng(1)
+    U = rng.random((90, 6), dtype=np.float32)
+    s = rng.random(6, dtype=np.float32) * 40
+    VT = rng.random((6, 30), dtype=np.float32)
+    out = np.empty((90, 30), dtype=np.uint8)
+
+    reconstruct_into(U, s, VT, out, block_rows=7)
+
+    expected = np.clip((U * s) @ VT, 0, 255).astype(np.uint8)
+    assert np.abs(out.astype(int) - expected.astype(int)).max() <= 1
+
+
+def test_reconstruct_stacked_into_matches_matmul():
+    """Test el núcleo apilado equivale al producto por canal, también con rangos distintos."""
+    rng = np.random.default_rng(2)
+    U = rng.random((3, 70, 8), dtype=np.float32)
+    s = rng.random((3, 8), dtype=np.float32) * 40
+    VT = rng.random((3, 8, 30), dtype=np.float32)
+    out = np.empty((70, 30, 3), dtype=np.uint8)
+
+    ranks = (8, 3, 5)
+    reconstruct_stacked_into(U, s, VT, ranks, out, block_rows=9)
+
+    for c, r in enumerate(ranks):
+        expected = np.clip((U[c, :, :r] * s[c, :r]) @ VT[c, :r], 0, 255).astype(np.uint8)
+        assert np.abs(out[:, :, c].astype(int) - expected.astype(int)).max() <= 1
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_block_buffer_respects_block_bytes(dtype):
+    """Test el buffer de un bloque ocupa como mucho BLOCK_BYTES también con factores float64."""
+    rng = np.random.default_rng(4)
+    U = rng.random((2000, 2)).astype(dtype)
+    s = np.full(2, 100.0, dtype=dtype)
+    VT = rng.random((2, 500)).astype(dtype)
+    out = np.empty((2000, 500), dtype=np.uint8)
+
+    tracemalloc.start()
+    reconstruct_into(U, s, VT, out)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # Además del bloque solo se crea U * s
+    assert peak <= BLOCK_BYTES + U.nbytes + 16 * 1024
+    assert np.abs(out.astype(int) - np.clip(np.rint((U * s) @ VT), 0, 255)).max() == 0
+
+
+def processor_with_factors(height, width, rank, batched):
+    """Procesador con factores aleatorios de rango dado (sin calcular la SVD)."""
+    rng = np.random.default_rng(3)
+    U = rng.random((3, height, rank), dtype=np.float32) / rank
+    s = np.full((3, rank), 200.0, dtype=np.float32)
+    VT = rng.random((3, rank, width), dtype=np.float32)
+    processor = SVDImageProcessor(batched=batched)
+    processor.image_array = np.zeros((height, width, 3), dtype=np.uint8)
+    processor.svd_components = (U, s, VT) if batched else (list(U), list(s), list(VT))
+    return processor
+
+
+@pytest.mark.parametrize('batched', [True, False])
+def test_reconstruct_into_buffer_and_peak_memory(batched):
+    """Test la reconstrucción escribe en el buffer dado y su pico de memoria es pequeño."""
+    processor = processor_with_factors(900, 1100, 30, batched)
+    out = np.empty((900, 1100, 3), dtype=np.uint8)
+
+    tracing = tracemalloc.is_tracing()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        result = processor.reconstruct_image(30, out=out)
+        _, peak_with_out = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        cached = processor.reconstruct_image(30)
+        _, peak_cached = tracemalloc.get_traced_memory()
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    assert result is out
+    assert np.array_equal(out, cached)
+    # Sin temporales float del tamaño de la imagen: solo bloques de filas
+    assert peak_with_out < 0.5 * out.nbytes
+    assert peak_cached < 1.5 * out.nbytes
+    # Con buffer propio no se usa la caché de imágenes
+    assert processor.get_frame_cache_stats()['entries'] == 1
+    with pytest.raises(ValueError):
+        processor.reconstruct_image(5, out=np.empty((900, 1100), dtype=np.uint8))
+
+
+@pytest.mark.parametrize('channels,batched', [(3, True), (3, False), (1, True)])
+def test_incremental_matches_full_reconstruction(channels, batched):
+    """Test una secuencia de movimientos del slider coincide con reconstruct_image."""
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+        create_test_image(channels=channels).save(f.name)
+        processor = SVDImageProcessor(f.name, batched=batched)
+
+        for k in (20, 21, 25, 24, 10, 50, 49, 3):
+            diff = processor.reconstruct_incremental(k).astype(int) - processor.reconstruct_image(k).astype(int)
+            assert np.abs(diff).max() <= 1
+
+        os.unlink(f.name)
+
+
+def test_incremental_uses_rank_deltas():
+    """Test pasos pequeños usan diferencias y saltos grandes recalculan."""
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+        create_test_image().save(f.name)
+        processor = SVDImageProcessor(f.name)
+        processor.compute_svd()
+        reconstructor = IncrementalReconstructor(processor.svd_components, processor.image_array.shape,
+                                                 refresh_after=3)
+
+        reconstructor.reconstruct(30)
+        reconstructor.reconstruct(31)
+        reconstructor.reconstruct(29)
+        assert (reconstructor.full_recomputes, reconstructor.incremental_updates) == (1, 2)
+
+        reconstructor.reconstruct(5)
+        assert reconstructor.full_recomputes == 2
+
+        for k in (6, 7, 8, 9):
+            reconstructor.reconstruct(k)
+        # Tras refresh_after actualizaciones se recalcula el acumulador
+        assert reconstructor.full_recomputes == 3
+        assert reconstructor.k == 9
+
+        os.unlink(f.name)
+
+
+def test_preview_size_and_box_downsample():
+    """Test tamaño de vista previa y promedio por bloques."""
+    assert preview_size(800, 1600, 400, 400) == (200, 400)
+    assert preview_size(100, 50, 400, 400) == (100, 50)
+
+    mat = np.arange(12, dtype=np.float32).reshape(6, 2)
+    assert np.allclose(box_downsample(mat, 3, axis=0), [[1, 2], [5, 6], [9, 10]])
+
+
+@pytest.mark.parametrize('batched', [True, False])
+def test_preview_matches_downsampled_reconstruction(batched):
+    """Test la vista previa equivale a promediar la reconstrucción completa."""
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+        create_test_image(120, 80).save(f.name)
+        processor = SVDImageProcessor(f.name, batched=batched)
+        processor.compute_svd()
+
+        preview = processor.reconstruct_preview(80, 60, 60)
+        U, s, VT = processor.svd_components[0][0], processor.svd_components[1][0], processor.svd_components[2][0]
+        full = (U * s) @ VT
+        expected = box_downsample(box_downsample(full, 40, axis=0), 60, axis=1)
+
+        assert preview.shape == (40, 60, 3)
+        assert preview.dtype == np.uint8
+        assert np.abs(preview[:, :, 0].astype(int) - np.clip(expected, 0, 255).astype(int)).max() <= 1
+        # Una imagen que ya cabe no se reduce
+        assert processor.reconstruct_preview(10, 400, 400).shape == (80, 120, 3)
+
+        os.unlink(f.name)
+
+
+@pytest.mark.parametrize('batched', [True, False])
+def test_per_channel_ranks(batched):
+    """Test con un rango por canal cada canal usa el suyo en todas las rutas."""
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+        create_test_image(60, 40).save(f.name)
+        processor = SVDImageProcessor(f.name, batched=batched)
+        processor.compute_svd()
+        ranks = [12, 3, 7]
+
+        frame = processor.reconstruct_image(ranks)
+        for c, k in enumerate(ranks):
+            assert np.array_equal(frame[:, :, c], processor.reconstruct_image(k)[:, :, c])
+        for step in ([13, 3, 7], [12, 4, 6], ranks):
+            diff = processor.reconstruct_incremental(step).astype(int) - processor.reconstruct_image(step).astype(int)
+            assert np.abs(diff).max() <= 1
+        assert processor.reconstruct_preview(ranks, 30, 30).shape == (20, 30, 3)
+
+        h, w, _ = processor.image_array.shape
+        assert processor.get_compression_ratio(ranks) == pytest.approx(3 * h * w / (22 * (h + w + 1)))
+        assert processor.get_compression_ratio([5, 5, 5]) == pytest.approx(processor.get_compression_ratio(5))
+        assert processor.get_energy_retained([5, 5, 5]) == pytest.approx(processor.get_energy_retained(5))
+        with pytest.raises(ValueError):
+            processor.reconstruct_image([3, 3])
+
+        os.unlink(f.name)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,178 @@
+"""
+Tests para el planificador de renderizado del slider.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import threading
+import time
+from proyecto_svd.ui.scheduler import RenderScheduler
+
+
+class FakeLoop:
+    """Bucle de eventos mínimo que imita root.after / root.after_cancel."""
+
+    def __init__(self):
+        self.jobs = []
+        self.next_id = 0
+
+    def after(self, ms, fn):
+        self.next_id += 1
+        self.jobs.append((self.next_id, fn))
+        return self.next_id
+
+    def after_cancel(self, job_id):
+        self.jobs = [job for job in self.jobs if job[0] != job_id]
+
+    def run(self, timeout=5.0):
+        deadline = time.time() + timeout
+        while self.jobs and time.time() < deadline:
+            _, fn = self.jobs.pop(0)
+            fn()
+            time.sleep(0.001)
+
+
+def make_scheduler(loop, render=None, **kwargs):
+    delivered = []
+    scheduler = RenderScheduler(
+        render=render or (lambda k: k * 10),
+        deliver=lambda k, result, latency: delivered.append((k, result)),
+        schedule=loop.after,
+        cancel=loop.after_cancel,
+        debounce_ms=0,
+        **kwargs
+    )
+    return scheduler, delivered
+
+
+def test_events_coalesce_to_last_k():
+    """Test los eventos dentro de la ventana se agrupan en un solo fotograma."""
+    loop = FakeLoop()
+    scheduler, delivered = make_scheduler(loop)
+    for k in (5, 6, 7, 8):
+        scheduler.request(k)
+    loop.run()
+
+    assert delivered == [(8, 80)]
+    stats = scheduler.stats()
+    assert stats['requested'] == 4
+    assert stats['coalesced'] == 3
+    assert stats['delivered'] == 1
+    scheduler.shutdown()
+
+
+def test_same_k_is_skipped():
+    """Test un k igual al último mostrado no se reconstruye."""
+    loop = FakeLoop()
+    calls = []
+    scheduler, delivered = make_scheduler(loop, render=lambda k: calls.append(k) or k)
+    scheduler.request(3)
+    loop.run()
+    scheduler.request(3)
+    loop.run()
+
+    assert calls == [3]
+    assert scheduler.stats()['skipped'] == 1
+
+    # Tras reset (p. ej. nueva imagen) el mismo k se vuelve a reconstruir
+    scheduler.reset()
+    scheduler.request(3)
+    loop.run()
+    assert calls == [3, 3]
+    scheduler.shutdown()
+
+
+def test_frames_keep_flowing_during_drag():
+    """Test durante un arrastre se muestra cada fotograma terminado y solo se lanza el último k."""
+    loop = FakeLoop()
+    release = threading.Event()
+    calls = []
+
+    def render(k):
+        calls.append(k)
+        if k == 1:
+            release.wait(5)
+        return k
+
+    scheduler, delivered = make_scheduler(loop, render=render)
+    scheduler.request(1)
+    # Lanza el primer fotograma y deja que el hilo de trabajo lo empiece
+    _, dispatch = loop.jobs.pop(0)
+    dispatch()
+    for k in (2, 3, 4):
+        scheduler.request(k)
+    release.set()
+    loop.run()
+
+    # El fotograma de k=1 se muestra aunque haya uno pendiente; 2 y 3 no se reconstruyen
+    assert delivered == [(1, 1), (4, 4)]
+    assert calls == [1, 4]
+    stats = scheduler.stats()
+    assert stats['dropped'] == 0
+    assert stats['coalesced'] == 2
+    scheduler.shutdown()
+
+
+def test_frame_of_previous_image_is_dropped():
+    """Test un fotograma en curso se descarta si cambia la imagen (reset)."""
+    loop = FakeLoop()
+    release = threading.Event()
+
+    def render(k):
+        if k == 1:
+            release.wait(5)
+        return k
+
+    scheduler, delivered = make_scheduler(loop, render=render)
+    scheduler.request(1)
+    _, dispatch = loop.jobs.pop(0)
+    dispatch()
+    scheduler.reset()
+    scheduler.request(2)
+    release.set()
+    loop.run()
+
+    assert delivered == [(2, 2)]
+    stats = scheduler.stats()
+    assert stats['dropped'] == 1
+    assert stats['delivered'] == 1
+    scheduler.shutdown()
+
+
+def test_render_error_is_reported():
+    """Test los errores de reconstrucción llegan a on_error y no bloquean."""
+    loop = FakeLoop()
+    errors = []
+
+    def render(k):
+        if k == 1:
+            raise ValueError("fallo")
+        return k
+
+    scheduler, delivered = make_scheduler(
+        loop, render=render, on_error=lambda k, e: errors.append((k, str(e))))
+    scheduler.request(1)
+    loop.run()
+    scheduler.request(2)
+    loop.run()
+
+    assert errors == [(1, "fallo")]
+    assert delivered == [(2, 2)]
+    scheduler.shutdown()
+
+
+def test_latency_stats():
+    """Test se registran latencias y fotogramas tardíos."""
+    loop = FakeLoop()
+    scheduler, _ = make_scheduler(loop, render=lambda k: time.sleep(0.02) or k,
+                                  frame_budget_ms=1.0)
+    scheduler.request(1)
+    loop.run()
+
+    stats = scheduler.stats()
+    assert stats['late'] == 1
+    assert stats['latency_max_ms'] >= 20
+    assert stats['latency_mean_ms'] <= stats['latency_max_ms']
+    scheduler.shutdown()
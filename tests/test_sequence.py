@@ -0,0 +1,103 @@
+"""
+Tests para el procesador de secuencias de fotogramas.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from PIL import Image
+import pytest
+from proyecto_svd.core.sequence import SequenceProcessor, iter_frames
+
+
+def make_clip(frames=8, height=60, width=80, cut=None):
+    """Escena suave que se desplaza despacio; con `cut` cambia de escena en ese fotograma."""
+    rng = np.random.default_rng(5)
+    y, x = np.mgrid[0:height, 0:width]
+    clip = []
+    for t in range(frames):
+        if cut is not None and t >= cut:
+            base = 128 + 100 * np.cos(y / 3 + x / 11) * np.sin(x / 2)
+        else:
+            base = 120 + 60 * np.sin((x + 2 * t) / 9) * np.cos(y / 7) + 30 * np.cos((y - t) / 5)
+        layers = [base * (0.8 + 0.1 * c) + rng.normal(0, 3, (height, width)) for c in range(3)]
+        clip.append(np.clip(np.stack(layers, axis=-1), 0, 255).astype(np.uint8))
+    return clip
+
+
+def truncated_energy(frame, rank):
+    """Energía retenida (%) por la SVD truncada exacta de cada canal."""
+    captured = total = 0.0
+    for c in range(frame.shape[2]):
+        s = np.linalg.svd(frame[:, :, c].astype(np.float64), compute_uv=False)
+        captured += np.sum(s[:rank] ** 2)
+        total += np.sum(s ** 2)
+    return 100 * captured / total
+
+
+def test_warm_start_matches_truncated_svd():
+    """Test el arranque en caliente captura casi lo mismo que la SVD truncada exacta."""
+    clip = make_clip()
+    processor = SequenceProcessor(rank=8, random_state=0)
+    results = list(processor.process(clip))
+
+    assert [r['method'] for r in results] == ['full'] + ['warm'] * 7
+    assert results[0]['reason'] == 'first'
+    for frame, result in zip(clip, results):
+        assert result['energy_retained'] == pytest.approx(truncated_energy(frame, 8), abs=0.05)
+        U, s, VT = result['components']
+        assert U.shape == (3, 60, 8) and s.shape == (3, 8) and VT.shape == (3, 8, 80)
+        assert result['frame'].shape == frame.shape and result['frame'].dtype == np.uint8
+        assert np.abs(result['frame'].astype(int) - frame).mean() < 6
+
+
+def test_scene_cut_forces_full_svd():
+    """Test un corte de escena y un cambio de tamaño provocan una SVD completa."""
+    clip = make_clip(cut=5)
+    processor = SequenceProcessor(rank=6, random_state=0)
+    results = [processor.process_frame(frame, reconstruct=False) for frame in clip]
+    assert [r['reason'] for r in results] == ['first', None, None, None, None, 'scene_cut', None, None]
+    assert results[5]['change'] > processor.scene_cut > results[4]['change']
+    assert results[5]['frame'] is None
+
+    result = processor.process_frame(clip[0][:40, :50, 0])
+    assert result['reason'] == 'shape' and result['frame'].shape == (40, 50)
+
+    stats = processor.stats()
+    assert stats['frames'] == 9
+    assert stats['full_svds'] == 3 and stats['warm_starts'] == 6
+    assert stats['fps'] > 0
+    assert 0 < stats['latency_mean_ms'] <= stats['latency_p95_ms'] <= stats['latency_max_ms']
+
+    processor.reset()
+    assert processor.stats()['frames'] == 0
+    assert processor.process_frame(clip[6])['reason'] == 'first'
+
+
+def test_file_sources(tmp_path):
+    """Test pilas .npy, GIF multifotograma y directorios de imágenes."""
+    clip = make_clip(frames=4)
+    np.save(tmp_path / 'clip.npy', np.stack(clip))
+    frames = list(iter_frames(str(tmp_path / 'clip.npy')))
+    assert len(frames) == 4 and np.array_equal(frames[2], clip[2])
+
+    images = [Image.fromarray(frame) for frame in clip]
+    images[0].save(tmp_path / 'clip.gif', save_all=True, append_images=images[1:])
+    frames = list(iter_frames(str(tmp_path / 'clip.gif')))
+    assert len(frames) == 4 and frames[0].shape == (60, 80, 3)
+
+    folder = tmp_path / 'frames'
+    folder.mkdir()
+    for i, image in enumerate(images):
+        image.save(folder / f'{i:03d}.png')
+    processor = SequenceProcessor(rank=5)
+    results = list(processor.process(str(folder)))
+    assert len(results) == 4 and np.array_equal(list(iter_frames(str(folder)))[1], clip[1])
+
+
+def test_unknown_backend():
+    """Test backend desconocido."""
+    with pytest.raises(ValueError):
+        SequenceProcessor(backend='lu')
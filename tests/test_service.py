@@ -0,0 +1,220 @@
+"""
+Tests para el servicio HTTP de compresión.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import asyncio
+import io
+import json
+import numpy as np
+from PIL import Image
+import pytest
+from proyecto_svd.core.container import decode_progressive, decode_svdz
+from proyecto_svd.core.svd_processor import SVDImageProcessor
+from proyecto_svd.utils.service import CompressionService, LatencyHistogram
+
+
+def make_png(seed=0, height=40, width=56):
+    """Imagen PNG aleatoria codificada en memoria."""
+    rng = np.random.default_rng(seed)
+    buffer = io.BytesIO()
+    Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+async def request(port, method, target, body=b''):
+    """Petición HTTP/1.1 mínima; devuelve (estado, cabeceras, cuerpo)."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n\r\n"
+                 .encode('latin-1') + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.lower().split(': ', 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, payload
+
+
+def run_service(scenario, tmp_path, **kwargs):
+    """Arranca el servicio en un puerto libre y ejecuta scenario(service)."""
+    async def main():
+        service = CompressionService(cache_dir=str(tmp_path), workers=kwargs.pop('workers', 1), **kwargs)
+        await service.start(port=0)
+        try:
+            return await scenario(service)
+        finally:
+            await service.close()
+    return asyncio.run(main())
+
+
+def test_decompose_reconstruct_and_metrics(tmp_path):
+    """Test las respuestas coinciden con el procesador local y la caché de factores se reutiliza."""
+    png = make_png()
+    local = SVDImageProcessor()
+    local.original_image = Image.open(io.BytesIO(png))
+    local.image_array = np.array(local.original_image)
+    local.compute_svd()
+
+    async def scenario(service):
+        status, _, body = await request(service.port, 'POST', '/decompose', png)
+        assert status == 200
+        result = json.loads(body)
+        assert result['shape'] == [40, 56, 3] and result['max_k'] == 40
+        assert result['source'] == 'computed'
+        key = result['key']
+
+        status, headers, body = await request(service.port, 'GET', f'/reconstruct?key={key}&k=7')
+        assert status == 200 and headers['content-type'] == 'image/png'
+        assert np.array_equal(np.array(Image.open(io.BytesIO(body))), local.reconstruct_image(7))
+
+        status, _, body = await request(service.port, 'GET', f'/reconstruct?key={key}&k=7&format=svdz')
+        assert status == 200 and decode_svdz(body).shape == (40, 56, 3)
+        _, _, stream = await request(service.port, 'GET', f'/reconstruct?key={key}&k=7&format=progressive')
+        frames = list(decode_progressive([stream[i:i + 500] for i in range(0, len(stream), 500)]))
+        assert frames[-1][0] == 7 and np.array_equal(frames[-1][1], decode_svdz(body))
+
+        status, _, body = await request(service.port, 'GET', f'/metrics?key={key}&k=10')
+        metrics = json.loads(body)
+        assert status == 200 and metrics['k'] == 10
+        assert metrics['energy_retained'] == pytest.approx(local.get_energy_retained(10), rel=1e-6)
+        assert metrics['psnr'] > 0 and metrics['svdz_bytes'] > 0
+
+        # Otro servicio (otros procesos) reutiliza los factores en disco
+        await service.close()
+        other = CompressionService(cache_dir=service.cache_dir, workers=1)
+        await other.start(port=0)
+        try:
+            status, _, body = await request(other.port, 'POST', '/decompose', png)
+            assert json.loads(body)['source'] == 'factor_cache'
+            status, _, body = await request(other.port, 'POST', '/metrics?k=3', png)
+            assert json.loads(body)['source'] == 'memory'
+            return await other.stats()
+        finally:
+            await other.close()
+
+    stats = run_service(scenario, tmp_path)
+    assert stats['sources'] == {'memory': 1, 'factor_cache': 1, 'computed': 0}
+    assert stats['responses'] == {'200': 2}
+    assert stats['uploads']['entries'] == 1 and stats['factor_cache']['bytes'] > 0
+    latency = stats['latency']['/decompose']
+    assert latency['count'] == 1 and sum(b['count'] for b in latency['buckets']) == 1
+
+
+def test_errors_and_stats(tmp_path):
+    """Test códigos de error y estadísticas expuestas en /stats."""
+    async def scenario(service):
+        assert (await request(service.port, 'GET', '/nada'))[0] == 404
+        assert (await request(service.port, 'GET', '/decompose'))[0] == 405
+        assert (await request(service.port, 'GET', '/reconstruct?key=abc&k=2'))[0] == 404
+        assert (await request(service.port, 'POST', '/decompose'))[0] == 400
+        assert (await request(service.port, 'POST', '/decompose', b'no es una imagen'))[0] == 400
+        assert (await request(service.port, 'POST', '/reconstruct?k=0', make_png()))[0] == 400
+        assert (await request(service.port, 'POST', '/reconstruct?k=2&format=gif', make_png()))[0] == 400
+        assert (await request(service.port, 'POST', '/decompose', b'x' * 20000))[0] == 413
+        for length in ('-5', '1e3', ''):
+            reader, writer = await asyncio.open_connection('127.0.0.1', service.port)
+            writer.write(f"POST /decompose HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode('latin-1'))
+            assert (await reader.read()).startswith(b'HTTP/1.1 400')
+            writer.close()
+        status, headers, body = await request(service.port, 'GET', '/stats')
+        assert status == 200 and headers['content-type'] == 'application/json'
+        return json.loads(body)
+
+    stats = run_service(scenario, tmp_path, max_body=10000)
+    assert stats['responses'] == {'400': 7, '404': 2, '405': 1, '413': 1}
+    # /nada y las tres cabeceras mal formadas
+    assert stats['latency']['other']['count'] == 4
+    assert stats['queue']['waiting'] == 0 and stats['queue']['running'] == 0
+
+
+def test_overload_returns_503(tmp_path):
+    """Test con la cola llena las peticiones se rechazan con Retry-After."""
+    async def scenario(service):
+        responses = await asyncio.gather(*[request(service.port, 'POST', '/decompose', make_png(seed))
+                                           for seed in range(6)])
+        return responses, await service.stats()
+
+    responses, stats = run_service(scenario, tmp_path, max_queue=1)
+    statuses = [status for status, _, _ in responses]
+    assert set(statuses) == {200, 503}
+    assert all(headers['retry-after'] == '1' for status, headers, _ in responses if status == 503)
+    assert stats['queue']['rejected'] == statuses.count(503)
+    assert stats['queue']['max_waiting'] <= 1
+    assert stats['queue']['admitted'] == 0 and stats['connections']['open'] == 0
+
+
+async def wait_until(condition, timeout=5.0):
+    """Espera a que el servicio alcance un estado."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+def test_overload_is_rejected_before_reading_body(tmp_path):
+    """Test sin hueco en la cola o sin conexiones libres se responde 503 sin leer ni guardar el cuerpo."""
+    async def full_queue(service):
+        # Una subida a medias ocupa el único hueco (workers=1, max_queue=0)
+        _, writer = await asyncio.open_connection('127.0.0.1', service.port)
+        writer.write(b"POST /decompose HTTP/1.1\r\nContent-Length: 100000\r\n\r\n")
+        await writer.drain()
+        await wait_until(lambda: service.admitted == 1)
+        status, headers, _ = await request(service.port, 'POST', '/decompose?k=2')
+        writer.close()
+        return status, headers, await service.stats()
+
+    status, headers, stats = run_service(full_queue, tmp_path, max_queue=0)
+    assert status == 503 and headers['retry-after'] == '1'
+    assert stats['queue']['rejected'] == 1 and stats['uploads']['entries'] == 0
+
+    async def no_connections(service):
+        _, writer = await asyncio.open_connection('127.0.0.1', service.port)
+        await wait_until(lambda: service.connections == 1)
+        status, _, _ = await request(service.port, 'GET', '/stats')
+        writer.close()
+        await wait_until(lambda: service.connections == 0)
+        return status, await service.stats()
+
+    status, stats = run_service(no_connections, tmp_path, max_connections=1)
+    assert status == 503 and stats['queue']['rejected'] == 1
+
+
+def test_uploads_survive_restart_within_byte_budget(tmp_path):
+    """Test las subidas de una ejecución anterior se reindexan y se expulsan por tamaño."""
+    first, second = make_png(1), make_png(2)
+
+    async def upload(service):
+        _, _, body = await request(service.port, 'POST', '/decompose', first)
+        return json.loads(body)['key']
+
+    key = run_service(upload, tmp_path)
+    upload_dir = os.path.join(str(tmp_path), 'uploads')
+    # Temporal de una escritura interrumpida
+    open(os.path.join(upload_dir, '.tmp-interrumpido'), 'wb').close()
+
+    async def restart(service):
+        assert (await request(service.port, 'GET', f'/metrics?key={key}&k=2'))[0] == 200
+        _, _, body = await request(service.port, 'POST', '/decompose', second)
+        assert (await request(service.port, 'GET', f'/metrics?key={key}&k=2'))[0] == 404
+        return json.loads(body)['key'], await service.stats()
+
+    budget = max(len(first), len(second)) + 100
+    other, stats = run_service(restart, tmp_path, upload_bytes=budget)
+    assert os.listdir(upload_dir) == [other]
+    assert stats['uploads'] == {'entries': 1, 'bytes': len(second), 'max_bytes': budget}
+
+
+def test_latency_histogram():
+    """Test cuantiles por cubeta del histograma de latencias."""
+    histogram = LatencyHistogram((1, 10, 100))
+    for ms in (0.5, 3, 4, 5, 50, 500):
+        histogram.observe(ms)
+    snapshot = histogram.snapshot()
+    assert [b['count'] for b in snapshot['buckets']] == [1, 3, 1, 1]
+    assert snapshot['p50_ms'] == 10 and snapshot['p99_ms'] == 500
+    assert snapshot['mean_ms'] == pytest.approx(562.5 / 6)
+    assert LatencyHistogram().snapshot()['p95_ms'] == 0.0
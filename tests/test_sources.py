@@ -0,0 +1,138 @@
+"""
+Tests para las fuentes de imagen mapeadas en memoria.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import json
+import threading
+import numpy as np
+from PIL import Image
+import tempfile
+import pytest
+from proyecto_svd.core.sources import open_mapped_source, open_raw, unlimited_pixels
+from proyecto_svd.core.svd_processor import SVDImageProcessor
+from proyecto_svd.core.tiled import TiledSVDProcessor
+
+
+def create_test_array(width=60, height=40, channels=3):
+    """Crea un array de imagen de prueba."""
+    shape = (height, width, channels) if channels > 1 else (height, width)
+    return np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+
+
+def test_npy_is_memory_mapped():
+    """Test los .npy se cargan mapeados y dan la misma SVD que un PNG."""
+    with tempfile.TemporaryDirectory() as tmp:
+        img_array = create_test_array()
+        np.save(os.path.join(tmp, 'img.npy'), img_array)
+        Image.fromarray(img_array).save(os.path.join(tmp, 'img.png'))
+
+        mapped = SVDImageProcessor(os.path.join(tmp, 'img.npy'))
+        decoded = SVDImageProcessor(os.path.join(tmp, 'img.png'))
+
+        assert isinstance(mapped.image_array, np.memmap)
+        assert np.allclose(mapped.compute_svd()[1], decoded.compute_svd()[1], rtol=1e-4)
+        assert np.array_equal(mapped.reconstruct_image(40), decoded.reconstruct_image(40))
+        assert mapped.get_energy_retained(5) == pytest.approx(decoded.get_energy_retained(5))
+        # La imagen PIL solo se construye cuando se pide
+        assert np.array_equal(np.array(mapped.original_image), img_array)
+        del mapped
+
+
+def test_raw_with_json_header():
+    """Test volcado raw descrito por una cabecera JSON."""
+    with tempfile.TemporaryDirectory() as tmp:
+        img_array = create_test_array(channels=1)
+        path = os.path.join(tmp, 'frame.raw')
+        with open(path, 'wb') as f:
+            f.write(b'\0' * 16)
+            f.write(img_array.tobytes())
+        with open(path + '.json', 'w') as f:
+            json.dump({'shape': [40, 60], 'dtype': 'uint8', 'offset': 16}, f)
+
+        mapped = open_raw(path)
+        processor = SVDImageProcessor(path)
+
+        assert np.array_equal(mapped, img_array)
+        assert processor.reconstruct_image(40).shape == (40, 60)
+        del mapped, processor
+
+
+def test_raw_without_header():
+    """Test un raw sin cabecera produce ValueError."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'frame.raw')
+        open(path, 'wb').close()
+        with pytest.raises(ValueError):
+            open_mapped_source(path)
+
+
+def test_uncompressed_tiff_mapped_compressed_decoded():
+    """Test los TIFF sin comprimir se mapean y los comprimidos no."""
+    with tempfile.TemporaryDirectory() as tmp:
+        img_array = create_test_array()
+        plain = os.path.join(tmp, 'plain.tif')
+        packed = os.path.join(tmp, 'packed.tif')
+        Image.fromarray(img_array).save(plain)
+        Image.fromarray(img_array).save(packed, compression='tiff_adobe_deflate')
+
+        mapped = open_mapped_source(plain)
+
+        assert isinstance(mapped, np.memmap)
+        assert np.array_equal(mapped, img_array)
+        assert open_mapped_source(packed) is None
+        assert isinstance(SVDImageProcessor(packed).image_array, np.ndarray)
+        del mapped
+
+
+def test_unlimited_pixels_is_scoped_and_serialized():
+    """Test el límite de PIL se restaura aunque falle el bloque y dos hilos no se pisan."""
+    limit = Image.MAX_IMAGE_PIXELS
+    with pytest.raises(RuntimeError):
+        with unlimited_pixels():
+            assert Image.MAX_IMAGE_PIXELS is None
+            raise RuntimeError
+    assert Image.MAX_IMAGE_PIXELS == limit
+
+    inside, release, entered = threading.Event(), threading.Event(), []
+
+    def hold():
+        with unlimited_pixels():
+            inside.set()
+            release.wait(5)
+
+    def enter():
+        with unlimited_pixels():
+            entered.append(Image.MAX_IMAGE_PIXELS)
+
+    threads = [threading.Thread(target=hold), threading.Thread(target=enter)]
+    threads[0].start()
+    inside.wait(5)
+    threads[1].start()
+    threads[1].join(0.1)
+    assert entered == []
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert entered == [None] and Image.MAX_IMAGE_PIXELS == limit
+
+
+def test_tiled_reads_mapped_source():
+    """Test el procesador por tiles lee las fuentes mapeadas tile a tile."""
+    with tempfile.TemporaryDirectory() as tmp:
+        img_array = create_test_array(70, 50)
+        path = os.path.join(tmp, 'img.npy')
+        np.save(path, img_array)
+
+        processor = TiledSVDProcessor(path, tile_size=32, factor_dir=os.path.join(tmp, 'factors'))
+
+        assert processor.shape == (50, 70, 3)
+        assert np.allclose(processor.reconstruct_image(32), img_array, atol=1)
+        del processor
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -10,7 +10,7 @@ import numpy as np
 from PIL import Image
 import tempfile
 import pytest
-from proyecto_svd.svd_image import SVDImageProcessor
+from proyecto_svd.core.svd_processor import SVDImageProcessor
 
 
 def create_test_image(width=100, height=100, channels=3):
@@ -0,0 +1,126 @@
+"""
+Tests para el procesador SVD por tiles.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+from PIL import Image
+import tempfile
+import pytest
+from proyecto_svd.core.svd_processor import SVDImageProcessor
+from proyecto_svd.core.tiled import TiledSVDProcessor, tile_size_for_memory
+
+
+def create_test_image(width=100, height=70, channels=3):
+    """Crea una imagen de prueba."""
+    if channels == 3:
+        img_array = np.random.randint(0, 256, (height, width, channels), dtype=np.uint8)
+    else:
+        img_array = np.random.randint(0, 256, (height, width), dtype=np.uint8)
+    return Image.fromarray(img_array)
+
+
+def test_tile_size_for_memory():
+    """Test el tamaño de tile crece con el límite de memoria."""
+    small = tile_size_for_memory(8 * 1024 ** 2, 3)
+    large = tile_size_for_memory(512 * 1024 ** 2, 3)
+
+    assert small % 64 == 0 and large % 64 == 0
+    assert small < large
+    assert large ** 2 * 3 * 4 * 6 <= 512 * 1024 ** 2
+    assert tile_size_for_memory(0, 3) == 64
+
+
+def test_tiled_full_rank_reconstruction():
+    """Test con todos los componentes se recupera la imagen original."""
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+        create_test_image().save(f.name)
+
+        processor = TiledSVDProcessor(f.name, tile_size=32)
+        tiles = processor.compute_svd()
+        original = np.array(Image.open(f.name))
+
+        assert len(tiles) == 4 * 3
+        assert processor.get_max_k() == 32
+        assert np.allclose(processor.reconstruct_image(32), original, atol=1)
+        assert processor.get_energy_retained(32) == pytest.approx(100, abs=1e-3)
+        assert processor.get_energy_retained(2) < 100
+
+        processor.cleanup()
+        assert not os.path.exists(processor.factor_dir)
+        os.unlink(f.name)
+
+
+def test_tiled_stream_writers_match_memory():
+    """Test los escritores en streaming producen la misma imagen."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'img.png')
+        create_test_image(90, 50).save(path)
+
+        processor = TiledSVDProcessor(path, tile_size=32, max_rank=10, factor_dir=os.path.join(tmp, 'factors'))
+        expected = processor.reconstruct_image(5)
+
+        npy_path = processor.reconstruct_to_file(5, os.path.join(tmp, 'out.npy'))
+        ppm_path = processor.reconstruct_to_file(5, os.path.join(tmp, 'out.ppm'))
+
+        assert np.array_equal(np.load(npy_path), expected)
+        assert np.array_equal(np.array(Image.open(ppm_path)), expected)
+        assert processor.get_max_k() == 10
+
+
+def test_tiled_grayscale_and_ratio():
+    """Test imagen en escala de grises y ratio de compresión por tiles."""
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+        create_test_image(64, 64, 1).save(f.name)
+
+        tiled = TiledSVDProcessor(f.name, tile_size=32)
+        whole = SVDImageProcessor(f.name)
+
+        assert tiled.reconstruct_image(4).shape == (64, 64)
+        # Cuatro tiles de 32x32 guardan k * (32 + 32 + 1) valores cada uno
+        assert tiled.get_compression_ratio(4) == pytest.approx(64 * 64 / (4 * 4 * 65))
+        assert tiled.get_compression_ratio(4) < whole.get_compression_ratio(4)
+
+        tiled.cleanup()
+        os.unlink(f.name)
+
+
+def test_tiled_compressed_source_must_fit_memory_limit():
+    """Test un PNG mayor que memory_limit se rechaza en lugar de decodificarse entero."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'img.png')
+        create_test_image(100, 70).save(path)
+        with pytest.raises(ValueError):
+            TiledSVDProcessor(path, memory_limit=100 * 70 * 3 - 1)
+
+        # Un .npy se lee tile a tile aunque sea mayor que el límite
+        npy_path = os.path.join(tmp, 'img.npy')
+        np.save(npy_path, np.array(Image.open(path)))
+        with TiledSVDProcessor(npy_path, memory_limit=1000, tile_size=32) as processor:
+            assert np.allclose(processor.reconstruct_image(32), np.load(npy_path), atol=1)
+
+
+def test_tiled_dtype_and_temporary_dir():
+    """Test los factores se guardan en el dtype pedido y el directorio temporal no se pierde."""
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as f:
+        create_test_image(64, 40).save(f.name)
+
+        with TiledSVDProcessor(f.name, tile_size=32, dtype='float64') as processor:
+            processor.compute_svd()
+            factor_dir = processor.factor_dir
+            assert np.load(processor._tile_path(0, 'VT')).dtype == np.float64
+        assert not os.path.exists(factor_dir)
+
+        processor = TiledSVDProcessor(f.name, tile_size=32)
+        processor.compute_svd()
+        factor_dir = processor.factor_dir
+        del processor
+        assert not os.path.exists(factor_dir)
+        os.unlink(f.name)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,112 @@
+"""
+Tests para la actualización incremental de factores SVD.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from proyecto_svd.core.svd_processor import SVDImageProcessor
+from proyecto_svd.core.updates import append_columns, orthogonality_error, region_update
+
+
+def test_brand_update_matches_exact_svd():
+    """Test la actualización de Brand reproduce la SVD de la matriz modificada."""
+    rng = np.random.default_rng(0)
+    A = rng.normal(size=(30, 20))
+    U, s, VT = np.linalg.svd(A, full_matrices=False)
+    columns = rng.normal(size=(30, 4))
+    U, s, VT = append_columns(U, s, VT, columns)
+    B = np.hstack([A, columns])
+    assert U.shape == (30, 24)
+    assert np.allclose((U * s) @ VT, B)
+    assert np.allclose(s, np.linalg.svd(B, compute_uv=False))
+
+    delta = rng.normal(size=(3, 7))
+    U, s, VT = region_update(U, s, VT, 10, 5, delta)
+    B[10:13, 5:12] += delta
+    assert np.allclose((U * s) @ VT, B)
+    assert orthogonality_error(U, s, VT) < 1e-12
+
+
+@pytest.mark.parametrize('batched', [True, False])
+def test_processor_updates_full_engine(batched, make_image, make_processor):
+    """Test filas, columnas y regiones nuevas mantienen factores, energía y cachés coherentes."""
+    img = make_image(seed=4)
+    processor = make_processor(img, batched=batched)
+    processor.reconstruct_image(5)
+
+    extra_rows = make_image(6, 40, seed=1)
+    report = processor.append_rows(extra_rows)
+    assert report['shape'] == (56, 40, 3) and report['rank'] == 40 and report['updates'] == 1
+    extra_cols = make_image(56, 9, seed=2)
+    assert processor.append_columns(extra_cols)['rank'] == 49
+    patch = make_image(10, 15, seed=3)[:, :, ::-1]
+    processor.update_region(20, 30, patch)
+
+    expected = np.concatenate([np.concatenate([img, extra_rows]), extra_cols], axis=1)
+    expected[20:30, 30:45] = patch
+    assert np.array_equal(processor.image_array, expected)
+    assert processor.original_image.size == (49, 56)
+
+    fresh = make_processor(expected, batched=batched)
+    for k in (5, 20, 49):
+        assert processor.get_energy_retained(k) == pytest.approx(fresh.get_energy_retained(k), abs=1e-3)
+        diff = processor.reconstruct_image(k).astype(int) - fresh.reconstruct_image(k).astype(int)
+        assert np.abs(diff).max() <= 1
+    assert processor.get_energy_retained(49) == pytest.approx(100)
+    for channel in processor.get_update_drift():
+        assert channel['updates'] == 3
+        assert channel['drift'] < 1e-5 and channel['max_singular_value_error'] < 1e-5
+        assert channel['orthogonality_error'] < processor.update_tolerance
+
+
+def test_truncated_engine_keeps_rank_and_exact_totals(make_image, make_processor):
+    """Test con el motor aleatorizado el rango es fijo y la energía total es la de la imagen."""
+    img = make_image(60, 60, seed=4)
+    processor = make_processor(img, engine='randomized', rank=12, random_state=0)
+    processor.update_region(5, 5, np.full((8, 20, 3), 200, dtype=np.uint8))
+    processor.append_columns(make_image(60, 5, seed=6))
+    assert processor.get_max_k() == 12
+
+    totals = [np.sum(processor.image_array[:, :, c].astype(np.float64) ** 2) for c in range(3)]
+    assert np.allclose(processor._energy_totals, totals)
+    fresh = make_processor(processor.image_array, engine='full')
+    assert processor.get_energy_retained(12) <= fresh.get_energy_retained(12) + 1e-6
+    drift = processor.get_update_drift()
+    # Truncar tras cada actualización pierde algo frente a la SVD truncada óptima
+    assert all(0 <= channel['drift'] < 0.02 for channel in drift)
+
+
+def test_reorthogonalization_and_mapped_sources(tmp_path, make_image):
+    """Test la reortogonalización por tolerancia y la edición de fuentes de solo lectura."""
+    img = make_image(seed=4)
+    np.save(tmp_path / 'img.npy', img)
+    processor = SVDImageProcessor(update_tolerance=0.0)
+    processor.load_image(str(tmp_path / 'img.npy'))
+    processor.compute_svd()
+
+    report = processor.update_region(0, 0, np.zeros((5, 5, 3), dtype=np.uint8))
+    assert report['reorthogonalized']
+    assert processor.get_update_drift()[0]['orthogonality_error'] < 1e-5
+    assert not isinstance(processor.image_array, np.memmap)
+    assert np.array_equal(np.load(tmp_path / 'img.npy'), img)
+    assert processor.reconstruct_image(40)[:5, :5].max() <= 1
+
+
+def test_invalid_updates(make_image, make_processor):
+    """Test formas incorrectas, regiones fuera de la imagen y factores no actualizables."""
+    img = make_image(seed=4)
+    processor = make_processor(img)
+    with pytest.raises(ValueError):
+        processor.append_rows(np.zeros((2, 39, 3)))
+    with pytest.raises(ValueError):
+        processor.append_columns(np.zeros((50, 2)))
+    with pytest.raises(ValueError):
+        processor.update_region(45, 0, np.zeros((10, 10, 3)))
+    with pytest.raises(ValueError):
+        make_processor(img, storage='int8').append_rows(np.zeros((2, 40, 3)))
+    with pytest.raises(ValueError):
+        make_processor(img, color_space='ycbcr').update_region(0, 0, np.zeros((2, 2, 3)))